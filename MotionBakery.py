@@ -5,15 +5,66 @@ __website_blog__ = 'https://www.cequina.com/post/motion-bakery'
 __version__ = '1.3.4'
 __release_date__ = 'February, 22 2026'
 
+import os
 import re
+import json
 import time
 import random
+import threading
 
 import nuke
+import numpy as np
 import _curvelib as cl
 import nuke.rotopaint as rp
 
-from MotionBakery_settings import COLOR_RANGE, STANDARD_ROTO_NODE, MARK_ALL_TRACKS
+from MotionBakery_settings import (COLOR_RANGE, STANDARD_ROTO_NODE, MARK_ALL_TRACKS, MARK_COLUMNS,
+                                   MARK_SETTLE_TIME, INVERSE_MODE, OUTPUT_MODE, REDUCE_KEYS, REDUCE_TOLERANCE,
+                                   HOMOGRAPHY_OUTPUT, TRANSFORM_SOLVER, SOLVER_WEIGHTED, SOLVER_OUTLIER_THRESHOLD,
+                                   ROTO_LAYER_MODE, COMPUTE_EXECUTOR, COMPUTE_WORKERS, APPLY_BATCH_SIZE,
+                                   BATCH_BACKGROUND, MOTION_CACHE_FOLDER, BAKE_ALL_MODES, PER_TRACK_GROUP,
+                                   SMOOTH_FILTER, SMOOTH_STRENGTH, BAKE_FRAME_RANGE, BAKE_FRAME_STEP, BAKE_FPS)
+from MotionBakery_tracks import (TrackTable, curve_value_at, enable_index_cache, invalidate_track_index, is_animated,
+                                 read_channels, set_track_columns, track_index)
+from MotionBakery_curves import reduce_channel, relative_to_frame, update_channels, write_channel, write_channels
+from MotionBakery_solvers import (apply_homographies, convex_corners, homography_matrix_channels,
+                                  invert_transform_matrix, invert_transform_simple, matrix_channel_homographies,
+                                  track_homographies)
+from MotionBakery_cache import TRACKER_KNOBS, CachedTracker, content_hash, load_cache, read_header, save_cache
+from MotionBakery_export import export_tables
+from MotionBakery_filters import FILTERS, smooth_table
+from MotionBakery_retime import retime_table
+from MotionBakery_layout import layout_grid, place_rows
+from MotionBakery_pool import compute_all, compute_bake, main_thread
+from MotionBakery_profile import annotate, count, count_api_calls, phase, profiled
+
+
+# Knobs keyed relative to tr_reference_frame in the 'baked' output mode, with their value at that frame.
+RELATIVE_KNOBS = {
+    'Transform': (('translate', 0.0), ('rotate', 0.0), ('scale', 1.0)),
+    'Roto': (('translate_curve', 0.0), ('rotate_curve', 0.0), ('scale_curve', 1.0)),
+    'RotoPaint': (('translate_curve', 0.0), ('rotate_curve', 0.0), ('scale_curve', 1.0)),
+}
+
+# Units of the baked knobs, to pick the key reduction tolerance.
+KNOB_UNITS = {
+    'translate': 'position', 'center': 'position', 'rotate': 'rotate', 'scale': 'scale', 'skewX': 'scale',
+    'translate_curve': 'position', 'center_curve': 'position', 'rotate_curve': 'rotate', 'scale_curve': 'scale',
+    'to1': 'position', 'to2': 'position', 'to3': 'position', 'to4': 'position',
+}
+
+# Hidden knobs of the Roto/ RotoPaint nodes, with the layer transform setter and channel indices they feed.
+LAYER_CURVES = (
+    ('translate_curve', 'setTranslationAnimCurve', (0, 1)),
+    ('rotate_curve', 'setRotationAnimCurve', (2,)),
+    ('scale_curve', 'setScaleAnimCurve', (0, 1)),
+    ('center_curve', 'setPivotPointAnimCurve', (0, 1)),
+)
+
+REBAKE_KNOB_CHANGED = """
+if nuke.thisKnob().name() == 'tr_reference_frame':
+    import MotionBakery
+    MotionBakery.rebake_reference_frame(nuke.thisNode())
+"""
 
 
 def generate_color():
@@ -30,9 +81,10 @@ def generate_color():
     return int('{:02x}{:02x}{:02x}ff'.format(int(red * 255), int(green * 255), int(blue * 255)), 16)
 
 
+@profiled
 def get_tracker_names(node):
     """
-    Extracts the names of the tracks from a Tracker node.
+    Extracts the names of the tracks from a Tracker node, through its cached track index.
 
     Args:
         node (nuke.Node): The Tracker node to extract track names from.
@@ -40,38 +92,117 @@ def get_tracker_names(node):
     Returns:
         list: A list of track names, or an Empty list.
     """
-    return re.findall(r'"([^"]+)"', node['tracks'].toScript())
+    return track_index(node).names
 
 
-def mark_all_trackers(node, mark_translate=True, mark_rotate=True, mark_scale=True) :
+def on_tracker_knob_changed():
+    """
+    knobChanged callback of every Tracker4 node, drops the cached track index when the tracks change.
+    A rename drops every index, as they are cached by node name.
+    """
+
+    knob_name = nuke.thisKnob().name()
+    if knob_name == 'tracks':
+        invalidate_track_index(nuke.thisNode())
+    elif knob_name == 'name':
+        invalidate_track_index()
+
+
+def on_tracker_destroyed():
+    """ onDestroy callback of every Tracker4 node, a new node with the same name mustn't get its index. """
+
+    invalidate_track_index(nuke.thisNode())
+
+
+# The track indices are only cached where Nuke runs the callbacks dropping them, see enable_index_cache().
+if nuke.GUI:
+    nuke.addKnobChanged(on_tracker_knob_changed, nodeClass='Tracker4')
+    nuke.addOnDestroy(on_tracker_destroyed, nodeClass='Tracker4')
+    nuke.addOnScriptLoad(invalidate_track_index)
+    nuke.addOnScriptClose(invalidate_track_index)
+    enable_index_cache()
+
+# With profiling on, this module's nuke calls are counted, through a proxy of the module.
+nuke = count_api_calls(nuke)
+
+
+@profiled
+def mark_all_trackers(node, mark_translate=True, mark_rotate=True, mark_scale=True):
     """
     All credits to Isaac Spiegel, I stole this code from him! www.isaacspiegel.com
     I've made some adjustments to fit it into the Bakery.
+
+    All the tracks are edited in the script and written back with a single fromScript() call,
+    then the Tracker gets one settle time to update its solve.
+    Set any mark to None to leave that column as it is.
+
+    Returns:
+        str: The updated 'tracks' script, or None if there's no node.
     """
     if not node:
         return
 
     knob = node['tracks']
-    num_columns = 31
-    column_translate = 6
-    column_rotate = 7
-    column_scale = 8
-    count = 0
+    script = knob.toScript()
+    count('knob.toScript')
+
+    values = {}
+    for column, mark in (('T', mark_translate), ('R', mark_rotate), ('S', mark_scale)):
+        if mark is not None:
+            values[column] = bool(mark)
+
+    new_script, changed, total_tracks = set_track_columns(script, values)
+
+    if total_tracks < 0:
+        # Unreadable script, fall back to one cell at a time.
+        num_columns = 31
+        column_index = {'T': 6, 'R': 7, 'S': 8}
+        total_tracks = len(track_index(node, script))
+        changed = 0
+        if total_tracks > 1:
+            for track in range(total_tracks):
+                for column, value in values.items():
+                    knob.setValue(value, num_columns * track + column_index[column])
+                    changed += 1
+            count('knob.setValue', changed)
+        new_script = None
+
+    elif total_tracks > 1 and changed:
+        knob.fromScript(new_script)
+        count('knob.fromScript')
+
+    else:
+        new_script = script
 
-    total_tracks = len(get_tracker_names(node))
+    if changed:
+        # Give the Tracker a single chance to update its transform from the new marks.
+        node.forceValidate()
+        time.sleep(MARK_SETTLE_TIME)
 
-    if total_tracks > 1:
-        while count <= int(total_tracks) - 1 :
-            knob.setValue(mark_translate, num_columns * count + column_translate)
-            knob.setValue(mark_rotate, num_columns * count + column_rotate)
-            knob.setValue(mark_scale, num_columns * count + column_scale)
+    return new_script
 
-            count += 1
 
-            time.sleep(0.01)
+@profiled
+def mark_tracks(tracker_node, mark_columns):
+    """
+    Checks the given columns ('T', 'R', 'S') on every track of the Tracker node.
+
+    Returns:
+        str: The 'tracks' script after marking, or None if it has to be read again from the knob.
+    """
 
+    if not mark_columns:
+        return None
 
-def customize_node(node_class, reference_frame, tracker_node):
+    return mark_all_trackers(tracker_node,
+                             mark_translate=True if 'T' in mark_columns else None,
+                             mark_rotate=True if 'R' in mark_columns else None,
+                             mark_scale=True if 'S' in mark_columns else None)
+
+
+@profiled
+def customize_node(node_class, reference_frame, tracker_node, output_mode=None, reduce_keys=None, smoothing=None,
+                   window=None, place=True):
     """
     Creates and customizes the new node (Transform, Roto, RotoPaint, or CornerPin2D) based on a Tracker node.
 
@@ -79,6 +210,16 @@ def customize_node(node_class, reference_frame, tracker_node):
         node_class (str): The class of the node to create ('Transform', 'Roto', 'RotoPaint', or 'CornerPin').
         reference_frame (int): The reference frame for the new node.
         tracker_node (nuke.Node): The Tracker node to derive settings from.
+        output_mode (str, optional): 'expression' or 'baked'. In 'baked' mode, changing the reference frame
+            re-bakes the keys instead of relying on expressions. Defaults to OUTPUT_MODE.
+        reduce_keys (bool, optional): Whether the baked curves are reduced. The tolerances are stored
+            on the node's 'Tracker settings' tab. Defaults to REDUCE_KEYS.
+        smoothing (tuple, optional): The (filter, strengths) the tracks were smoothed with, see smooth_tracker().
+            They're stored on the node's 'Tracker settings' tab. Defaults to None, not smoothed.
+        window (dict, optional): The frame range, step and frame rates the tracks were retimed with,
+            see window_tracker(). They're stored next to the reference frame. Defaults to None, every tracked frame.
+        place (bool, optional): Whether to place the node in the DAG now, see place_nodes(). Batch bakes place all
+            their nodes at the end instead. Defaults to True.
 
     Returns:
         nuke.Node: The newly created and customized node.
@@ -118,7 +259,8 @@ def customize_node(node_class, reference_frame, tracker_node):
 
     new_node.resetKnobsToDefault()
     new_node.setXYpos(int(dag_center_point + dag_width), int(y_position + dag_width / 2))
-    nuke.autoplace(new_node)
+    if place:
+        place_nodes([(tracker_node, [new_node])])
 
     # Add Tab group
     new_node.addKnob(nuke.Tab_Knob('tracker_knob', 'Tracker settings'))
@@ -128,10 +270,19 @@ def customize_node(node_class, reference_frame, tracker_node):
     new_node['tr_reference_frame'].setValue(reference_frame)
     new_node['label'].setValue('reference frame: {}'.format(str('[value tr_reference_frame]')))
 
+    if window:
+        add_window_knobs(new_node, window)
+
+    # Baked nodes are rebaked when their reference frame changes, from the knob or the button
+    if (output_mode or OUTPUT_MODE) == 'baked':
+        new_node['knobChanged'].setValue(REBAKE_KNOB_CHANGED)
+
     # Add Set Reference Frame button
+    set_reference_cmd = 'nuke.thisNode()["tr_reference_frame"].setValue(nuke.frame())'
+
     new_node.addKnob(nuke.PyScript_Knob('set_reference',
                                         'set to current frame',
-                                        'nuke.thisNode()["tr_reference_frame"].setValue(nuke.frame())'))
+                                        set_reference_cmd))
 
     cmd = """
 tkn = nuke.toNode('{0}')
@@ -144,6 +295,12 @@ else: nuke.message('{0} not found!')
                                         'find {}'.format(tracker_node.name()),
                                         cmd))
 
+    if REDUCE_KEYS if reduce_keys is None else reduce_keys:
+        add_reduction_knobs(new_node)
+
+    if smoothing:
+        add_smoothing_knobs(new_node, *smoothing)
+
     if roto_class:
         new_node['motionblur'].setValue(tracker_node['motionblur'].getValue())
         new_node['motionblur_shutter'].setValue(tracker_node['shutter'].getValue())
@@ -151,6 +308,7 @@ else: nuke.message('{0} not found!')
             tracker_node['shutteroffset'].enumName(int(tracker_node['shutteroffset'].getValue())))
 
         new_node['reference_frame'].setExpression('tr_reference_frame')
+        count('knob.setExpression')
 
         # Create additional knobs for Roto/ RotoPaint nodes
         space001 = nuke.Text_Knob('space001', ' ', '')
@@ -181,7 +339,345 @@ else: nuke.message('{0} not found!')
     return new_node
 
 
-def four_corners_of_a_convex_poly(tracker_node, ref_frame):
+def add_reduction_knobs(node, tolerance=None):
+    """
+    Adds the key reduction tolerances and report to the node's 'Tracker settings' tab.
+
+    Args:
+        node (nuke.Node): The new node.
+        tolerance (dict, optional): 'position', 'rotate' and 'scale' tolerances. Defaults to REDUCE_TOLERANCE.
+    """
+
+    if tolerance is None:
+        tolerance = REDUCE_TOLERANCE
+
+    labels = (('position', 'position tolerance'), ('rotate', 'rotate tolerance'), ('scale', 'scale tolerance'))
+    for unit, label in labels:
+        knob = nuke.Double_Knob('tr_tolerance_{}'.format(unit), label)
+        knob.setFlag(nuke.STARTLINE)
+        node.addKnob(knob)
+        node[knob.name()].setValue(tolerance[unit])
+
+    node.addKnob(nuke.Text_Knob('tr_keys_report', 'keys', ''))
+
+
+def reduction_tolerance(node):
+    """
+    Returns the key reduction tolerances stored on a node, or None if the node doesn't reduce its keys.
+    """
+
+    if not node.knob('tr_tolerance_position'):
+        return None
+
+    return dict((unit, node['tr_tolerance_{}'.format(unit)].value()) for unit in ('position', 'rotate', 'scale'))
+
+
+def reduce_knob_channels(knob_name, channels, tolerance, counts):
+    """
+    Reduces the channels of a knob with the tolerance of its unit.
+
+    Args:
+        knob_name (str): The destination knob, to pick the unit from KNOB_UNITS.
+        channels (list): The channels to write, None items are kept as None.
+        tolerance (dict): 'position', 'rotate' and 'scale' tolerances, or None to keep every key.
+        counts (list): [keys_before, keys_after], updated in place.
+
+    Returns:
+        list: The reduced channels.
+    """
+
+    if tolerance is None:
+        return channels
+
+    reduced = []
+    for channel in channels:
+        if channel is not None:
+            channel, before, after = reduce_channel(channel, tolerance[KNOB_UNITS.get(knob_name, 'position')])
+            counts[0] += before
+            counts[1] += after
+        reduced.append(channel)
+
+    return reduced
+
+
+def report_reduction(node, counts):
+    """
+    Shows how many keys the reduction saved on the node's 'Tracker settings' tab.
+    """
+
+    if not node.knob('tr_keys_report'):
+        return
+
+    text = '{} of {} keys saved'.format(counts[0] - counts[1], counts[0])
+    node['tr_keys_report'].setValue(text)
+    nuke.tprint('{}: {}'.format(node.name(), text))
+
+
+def smooth_tracker(table, smooth=None, strengths=None):
+    """
+    Smooths the tracker data before a bake, see MotionBakery_filters.
+
+    Args:
+        table (TrackTable): The tracker data, as returned by read_tracker().
+        smooth (str, optional): The filter, 'gaussian', 'savgol' or 'one_euro', or False for none.
+            Defaults to SMOOTH_FILTER.
+        strengths (dict, optional): 'position', 'rotate' and 'scale' strengths, in frames. Defaults to SMOOTH_STRENGTH.
+
+    Returns:
+        TrackTable: The smoothed copy of the table, or the table itself if it isn't smoothed or already was.
+    """
+
+    if smooth is None:
+        smooth = SMOOTH_FILTER
+
+    if not smooth or table.smoothing is not None:
+        return table
+
+    with phase('smooth'):
+        return smooth_table(table, smooth, SMOOTH_STRENGTH if strengths is None else strengths)
+
+
+def add_smoothing_knobs(node, smooth, strengths):
+    """
+    Adds the smoothing filter and strengths to the node's 'Tracker settings' tab, for re-bakes to use.
+
+    Args:
+        node (nuke.Node): The new node.
+        smooth (str): The filter, see smooth_tracker().
+        strengths (dict): 'position', 'rotate' and 'scale' strengths, in frames.
+    """
+
+    knob = nuke.Enumeration_Knob('tr_smooth_filter', 'smoothing', list(FILTERS))
+    knob.setFlag(nuke.STARTLINE)
+    node.addKnob(knob)
+    node['tr_smooth_filter'].setValue(smooth)
+
+    for unit in ('position', 'rotate', 'scale'):
+        knob = nuke.Double_Knob('tr_smooth_{}'.format(unit), '{} strength'.format(unit))
+        knob.setFlag(nuke.STARTLINE)
+        node.addKnob(knob)
+        node[knob.name()].setValue(strengths.get(unit, 0.0))
+
+
+def node_smoothing(node, options=None):
+    """
+    Returns the (filter, strengths) a node was baked with, from its 'Tracker settings' tab,
+    or from its registry options for the nodes without the tab. None if it wasn't smoothed.
+    """
+
+    if node.knob('tr_smooth_filter'):
+        return (node['tr_smooth_filter'].value(),
+                dict((unit, node['tr_smooth_{}'.format(unit)].value()) for unit in ('position', 'rotate', 'scale')))
+
+    smoothing = (options or {}).get('smoothing')
+    return tuple(smoothing) if smoothing else None
+
+
+def bake_window(tracker_node, frame_range=None, frame_step=None, fps=None):
+    """
+    Returns the frame window of a bake, see MotionBakery_retime.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        frame_range (str or tuple, optional): 'script' for the script range, 'input' for the range of the Tracker's
+            input, or (first, last) frames. Defaults to BAKE_FRAME_RANGE.
+        frame_step (int, optional): Key every n-th frame of the range. Defaults to BAKE_FRAME_STEP.
+        fps (float, optional): Conform the keys from the script frame rate to this one. Defaults to BAKE_FPS.
+
+    Returns:
+        dict: The 'range', 'first', 'last', 'step', 'source_fps' and 'target_fps' of the window, None for the first
+            and last frames means the tracked ones. The 'range' is 'script' or 'input' for the ranges found again
+            on re-bakes, 'custom' for given frames, and 'tracked'. None if the bake keeps every tracked frame.
+    """
+
+    if frame_range is None:
+        frame_range = BAKE_FRAME_RANGE
+    if frame_step is None:
+        frame_step = BAKE_FRAME_STEP
+    if fps is None:
+        fps = BAKE_FPS
+
+    if not frame_range and frame_step == 1 and not fps:
+        return None
+
+    first, last = window_range(tracker_node, frame_range)
+    if frame_range in ('script', 'input'):
+        range_name = frame_range
+    else:
+        range_name = 'tracked' if first is None else 'custom'
+
+    source_fps = float(nuke.root()['fps'].value())
+    target_fps = float(fps) if fps else source_fps
+    frame_step = max(int(frame_step), 1)
+
+    return {'range': range_name, 'first': first, 'last': last, 'step': frame_step, 'source_fps': source_fps,
+            'target_fps': target_fps}
+
+
+def window_range(tracker_node, frame_range):
+    """
+    Returns the (first, last) frames of a bake's frame range, see bake_window(). (None, None) for the tracked frames.
+    """
+
+    if frame_range == 'script':
+        root = nuke.root()
+        return int(root['first_frame'].value()), int(root['last_frame'].value())
+    if frame_range == 'input':
+        return tracker_node.firstFrame(), tracker_node.lastFrame()
+    if frame_range and frame_range not in ('tracked', 'custom'):
+        first, last = frame_range
+        return int(first), int(last)
+    return None, None
+
+
+def window_tracker(tracker_node, table, window):
+    """
+    Crops and resamples the tracker data to the frame window of a bake, see MotionBakery_retime.
+    The 'script' and 'input' ranges are found again, and every range is clipped to the frames tracked now,
+    so re-bakes follow the Tracker. The Tracker's reference frame stays keyed, on the retimed frames,
+    see tracker_reference().
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        table (TrackTable): The tracker data, as returned by read_tracker().
+        window (dict): The frame window, as returned by bake_window(), or None.
+
+    Returns:
+        TrackTable: The retimed copy of the table, or the table itself if there's no window or it's already retimed.
+            Its 'window' is the requested one, for the baked nodes to store, with the retimed 'reference_frame'.
+            None if no tracked frame is in the window.
+    """
+
+    if not window or table.window is not None:
+        return table
+
+    first, last = window.get('first'), window.get('last')
+    if window.get('range') in ('script', 'input'):
+        first, last = window_range(tracker_node, window['range'])
+
+    with phase('retime'):
+        try:
+            retimed = retime_table(table, first, last, window.get('step', 1), window.get('source_fps'),
+                                   window.get('target_fps'), int(tracker_node['reference_frame'].value()))
+        except ValueError as error:
+            nuke.tprint('{}: {}'.format(tracker_node.name(), error))
+            return None
+
+    retimed.window = dict(window, reference_frame=retimed.window['reference_frame'])
+    return retimed
+
+
+def tracker_reference(tracker_node, table):
+    """ Returns the Tracker's reference frame, on the frames of a retimed table. """
+
+    reference_frame = int(tracker_node['reference_frame'].value())
+    if table.window is None:
+        return reference_frame
+
+    return table.window['reference_frame']
+
+
+def add_window_knobs(node, window):
+    """
+    Adds the frame range, step and frame rate conform of a bake next to the node's reference frame,
+    for re-bakes to use. The first and last frames are the ones of a 'custom' range, the 'script' and 'input'
+    ranges show the frames they had at bake time.
+
+    Args:
+        node (nuke.Node): The new node.
+        window (dict): The window the tracks were retimed with, see window_tracker().
+    """
+
+    knob = nuke.Enumeration_Knob('tr_frame_range', 'frame range', ['tracked', 'script', 'input', 'custom'])
+    knob.setFlag(nuke.STARTLINE)
+    node.addKnob(knob)
+    node['tr_frame_range'].setValue(window.get('range') or 'custom')
+
+    knobs = ((nuke.Int_Knob, 'tr_first_frame', 'frames', window['first'], False),
+             (nuke.Int_Knob, 'tr_last_frame', 'to', window['last'], False),
+             (nuke.Int_Knob, 'tr_frame_step', 'step', window['step'], False),
+             (nuke.Double_Knob, 'tr_source_fps', 'fps conform', window['source_fps'], True),
+             (nuke.Double_Knob, 'tr_target_fps', 'to', window['target_fps'], False))
+
+    for knob_class, name, label, value, new_line in knobs:
+        knob = knob_class(name, label)
+        if new_line:
+            knob.setFlag(nuke.STARTLINE)
+        else:
+            knob.clearFlag(nuke.STARTLINE)
+        node.addKnob(knob)
+        if value is not None:
+            node[name].setValue(value)
+
+
+def node_window(node, options=None):
+    """
+    Returns the frame window a node was baked with, from its 'Tracker settings' tab,
+    or from its registry options for the nodes without the tab. None if it has every tracked frame.
+    """
+
+    if node.knob('tr_first_frame'):
+        range_name = node['tr_frame_range'].value() if node.knob('tr_frame_range') else 'custom'
+        first = last = None
+        if range_name != 'tracked':
+            first, last = int(node['tr_first_frame'].value()), int(node['tr_last_frame'].value())
+        return {'range': range_name, 'first': first, 'last': last, 'step': int(node['tr_frame_step'].value()),
+                'source_fps': node['tr_source_fps'].value(), 'target_fps': node['tr_target_fps'].value()}
+
+    window = (options or {}).get('window')
+    if window:
+        window = dict((key, value) for key, value in window.items() if key != 'reference_frame')
+    return window
+
+
+def write_knob(knob, channels, changes=None):
+    """
+    Writes the channels of a knob, or updates them in place when re-baking.
+
+    Args:
+        knob (nuke.Knob): The destination knob.
+        channels (list): The channels, see write_channels().
+        changes (list, optional): When given, only the changed frames of the knob are rewritten,
+            see update_channels(), and the change is appended as (knob name, first frame, last frame).
+    """
+
+    if changes is None:
+        write_channels(knob, channels)
+        return
+
+    changed = update_channels(knob, channels)
+    if changed is not None:
+        changes.append((knob.name(),) + changed)
+
+
+def corner_tracks(tracker_node, total_tracks):
+    """
+    Returns the four tracks a CornerPin is made of: the 4 selected tracks of the Tracker,
+    or the first 4 tracks if there isn't exactly 4 selected.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        total_tracks (int): The number of tracks of the Tracker.
+
+    Returns:
+        list: The indices of the four tracks, or an empty list if the Tracker has less than four tracks.
+    """
+
+    # Check if there are 4 tracks selected.
+    sa = tracker_node['selected_tracks'].getText().split(',')
+    if len(sa) == 4:
+        return [int(sa[0]), int(sa[1]), int(sa[2]), int(sa[3])]
+
+    if total_tracks >= 4:
+        # It will get the first 4 tracks, if nothing is selected.
+        return [0, 1, 2, 3]
+
+    # It's not possible to create a CornerPin with less than 4 tracks.
+    # It will return an empty list, to lead to an error message.
+    return []
+
+
+def four_corners_of_a_convex_poly(tracker_node, ref_frame, table=None):
     """
     Determines the order of four selected tracks in a Tracker node
     to ensure they form a convex quadrilateral.
@@ -193,86 +689,145 @@ def four_corners_of_a_convex_poly(tracker_node, ref_frame):
     Args:
         tracker_node (nuke.Node): The Tracker4 node.
         ref_frame (int): The reference frame to evaluate track positions.
+        table (TrackTable, optional): The extracted tracks. Read from the node if not given.
 
     Returns:
         list: A list of the indices of the four tracks, ordered to form a convex quadrilateral.
               Returns an empty list if less than four tracks.
     """
 
-    selected_tracks = tracker_node['selected_tracks']
-    all_tracks = tracker_node['tracks']
-    total_tracks = len(get_tracker_names(tracker_node))
+    if table is None:
+        table = TrackTable.from_node(tracker_node, transform=False)
 
-    # Check if there are 4 tracks selected, Return if not.
-    sa = selected_tracks.getText().split(',')
-    if len(sa) == 4:
-        i = [int(sa[0]), int(sa[1]), int(sa[2]), int(sa[3])]
+    tracks = corner_tracks(tracker_node, len(table))
+    if not tracks:
+        return []
 
-    elif total_tracks >= 4:
-        # It will get the first 4 tracks, if nothing is selected.
-        i = [0, 1, 2, 3]
+    return convex_corners(table, ref_frame, tracks)
 
-    else:
-        # It's not possible to create a CornerPin with less than 4 tracks.
-        # It will return an empty list, to lead to an error message.
-        return []
 
-    n_cols = 31
-    x_col = 2
-    y_col = 3
+def anim_curve(channel):
+    """
+    Creates a _curvelib.AnimCurve holding the keys of a channel.
+
+    Args:
+        channel (float or tuple): A constant value, or a (frames, values) tuple of keys.
+            Curves flagged 'L' by the key reduction get linear keys.
+
+    Returns:
+        _curvelib.AnimCurve: The keyed curve.
+    """
+
+    curve = cl.AnimCurve()
+
+    if not isinstance(channel, tuple):
+        curve.addKey(cl.AnimCurveKey(0, channel))
+        return curve
 
-    x = [all_tracks.getValueAt(ref_frame, i[0] * n_cols + x_col),
-         all_tracks.getValueAt(ref_frame, i[1] * n_cols + x_col),
-         all_tracks.getValueAt(ref_frame, i[2] * n_cols + x_col),
-         all_tracks.getValueAt(ref_frame, i[3] * n_cols + x_col)]
+    count('keys', len(channel[0]))
 
-    y = [all_tracks.getValueAt(ref_frame, i[0] * n_cols + y_col),
-         all_tracks.getValueAt(ref_frame, i[1] * n_cols + y_col),
-         all_tracks.getValueAt(ref_frame, i[2] * n_cols + y_col),
-         all_tracks.getValueAt(ref_frame, i[3] * n_cols + y_col)]
+    linear = len(channel) > 2 and channel[2] == 'L'
+    for frame, value in zip(np.asarray(channel[0]).tolist(), np.asarray(channel[1]).tolist()):
+        key = cl.AnimCurveKey(frame, value)
+        if linear:
+            key.interpolationType = cl.kLinearInterpolation
+        curve.addKey(key)
 
-    import math
-    mx = sum(x) / 4
-    my = sum(y) / 4
+    return curve
 
-    x = [x[0] - mx, x[1] - mx, x[2] - mx, x[3] - mx]
-    y = [y[0] - my, y[1] - my, y[2] - my, y[3] - my]
 
-    a = [math.pi + math.atan2(y[0], x[0]), math.pi + math.atan2(y[1], x[1]),
-         math.pi + math.atan2(y[2], x[2]), math.pi + math.atan2(y[3], x[3])]
+@profiled
+def key_layer_transform(layer, channels):
+    """
+    Fills a Roto/ RotoPaint layer transform with keyed AnimCurves, so shapes don't evaluate any expression.
+
+    Args:
+        layer (nuke.rotopaint.Layer): The layer to key.
+        channels (dict): The channels of each hidden knob ('translate_curve', 'rotate_curve', 'scale_curve'
+            and 'center_curve'), as read by read_channels(). Missing knobs are left as they are.
+    """
+
+    transform_attr = layer.getTransform()
 
-    idx = sorted(range(len(i)), key=a.__getitem__)
-    idx = [i[idx[0]], i[idx[1]], i[idx[2]], i[idx[3]]]
+    for knob_name, setter, indices in LAYER_CURVES:
+        if knob_name not in channels:
+            continue
 
-    return idx
+        for channel, index in zip(channels[knob_name], indices):
+            getattr(transform_attr, setter)(index, anim_curve(channel))
 
 
-def copy_animation_to_rotopaint_layer(tracker_node, roto_node):
+@profiled
+def copy_animation_to_rotopaint_layer(tracker_node, roto_node, table=None, output_mode=None, layer_mode=None,
+                                      changes=None):
     """
     Creates a layer in a RotoPaint node linked to a Tracker node's animation.
 
     Args:
         tracker_node (nuke.Node): The Tracker node to copy animation from.
         roto_node (nuke.Node): The new Roto/RotoPaint node.
+        table (TrackTable, optional): The extracted tracker data. Read from the node if not given.
+        output_mode (str, optional): 'expression' or 'baked'. Defaults to OUTPUT_MODE.
+        layer_mode (str, optional): 'linked' drives the layer with expressions on the hidden knobs,
+            'keyed' keys the layer's curves directly, reference-relative like the 'baked' output mode.
+            Defaults to ROTO_LAYER_MODE.
     """
 
-    grid_x = int(nuke.toNode('preferences').knob('GridWidth').value())
-    grid_y = int(nuke.toNode('preferences').knob('GridHeight').value())
+    if table is None:
+        table = TrackTable.from_node(tracker_node)
 
-    tracker_name = tracker_node.name()
-    tracker_node.setSelected(False)
+    keyed = (layer_mode or ROTO_LAYER_MODE) == 'keyed'
+    baked = keyed or (output_mode or OUTPUT_MODE) == 'baked'
+    if baked:
+        reference_frame = int(roto_node['tr_reference_frame'].value())
+        identities = dict(RELATIVE_KNOBS['Roto'])
 
-    roto_node['translate_curve'].copyAnimations(tracker_node['translate'].animations())
-    roto_node['rotate_curve'].copyAnimations(tracker_node['rotate'].animations())
-    roto_node['scale_curve'].copyAnimations(tracker_node['scale'].animations())
-    roto_node['center_curve'].copyAnimations(tracker_node['center'].animations())
+    tolerance = reduction_tolerance(roto_node)
+    counts = [0, 0]
 
-    roto_node['translate_curve'].setExpression('curve - curve(tr_reference_frame)')
-    roto_node['rotate_curve'].setExpression('curve - curve(tr_reference_frame)')
-    roto_node['scale_curve'].setExpression('curve - curve(tr_reference_frame) + 1')
+    tracker_name = tracker_node.name()
+    tracker_node.setSelected(False)
 
-    roto_node.setXYpos(tracker_node.xpos() - grid_x * 0,
-                       tracker_node.ypos() + grid_y * 2)
+    layer_channels = {}
+    for knob in ('translate', 'rotate', 'scale', 'center'):
+        channels = table.transform[knob]
+        knob_name = '{}_curve'.format(knob)
+        if is_animated(channels):
+            animated = [isinstance(channel, tuple) for channel in channels]
+            channels = reduce_knob_channels(knob_name, channels, tolerance, counts)
+            if baked and knob_name in identities:
+                channels = [relative_to_frame(channel, reference_frame, identities[knob_name]) if is_anim else channel
+                            for channel, is_anim in zip(channels, animated)]
+
+            # Constant channels are left as they are on the knob, only the animation is copied.
+            write_knob(roto_node[knob_name], [channel if is_anim else None
+                                              for channel, is_anim in zip(channels, animated)], changes)
+            layer_channels[knob_name] = channels
+
+        elif knob == 'center':
+            # The pivot is needed by a keyed layer even when it doesn't move.
+            layer_channels[knob_name] = channels
+
+    report_reduction(roto_node, counts)
+
+    if keyed and changes is None:
+        roto_node.addKnob(nuke.String_Knob('tr_layer', 'layer', tracker_name))
+        roto_node['tr_layer'].setVisible(False)
+
+    if not baked:
+        with phase('expressions'):
+            roto_node['translate_curve'].setExpression('curve - curve(tr_reference_frame)')
+            roto_node['rotate_curve'].setExpression('curve - curve(tr_reference_frame)')
+            roto_node['scale_curve'].setExpression('curve - curve(tr_reference_frame) + 1')
+            count('knob.setExpression', 3)
+
+    if changes is not None:
+        # The layer is already linked to the hidden knobs, a keyed layer is keyed again if they changed.
+        layer = roto_node['curves'].toElement(roto_node['tr_layer'].value()) if keyed else None
+        if layer is not None and changes:
+            key_layer_transform(layer, layer_channels)
+            roto_node['curves'].changed()
+        return
 
     roto_node.setSelected(True)
 
@@ -281,6 +836,12 @@ def copy_animation_to_rotopaint_layer(tracker_node, roto_node):
     stab_layer = rp.Layer(curves_knob)
     stab_layer.name = tracker_name
 
+    if keyed:
+        key_layer_transform(stab_layer, layer_channels)
+        curves_knob.rootLayer.append(stab_layer)
+        curves_knob.changed()
+        return
+
     # Define variable for accessing the getTransform()
     transform_attr = stab_layer.getTransform()
 
@@ -295,14 +856,14 @@ def copy_animation_to_rotopaint_layer(tracker_node, roto_node):
     transform_attr.setTranslationAnimCurve(0, trans_curve_x)
     transform_attr.setTranslationAnimCurve(1, trans_curve_y)
 
-    if tracker_node['rotate'].isAnimated():
+    if is_animated(table.transform['rotate']):
         rot_curve = cl.AnimCurve()
         rot_curve.expressionString = "rotate_curve"
         rot_curve.useExpression = True
 
         transform_attr.setRotationAnimCurve(2, rot_curve)
 
-    if tracker_node['scale'].isAnimated():
+    if is_animated(table.transform['scale']):
         scale_curve = cl.AnimCurve()
         scale_curve.expressionString = "scale_curve"
         scale_curve.useExpression = True
@@ -333,239 +894,1456 @@ def copy_knob_values_at_keys(src, dst, chan):
         chan (int): The channel index to copy (0 for X, 1 for Y, etc.).
     """
 
-    if src.isAnimated():
-        dst.setAnimated(chan)
-
-        for Idx in range(src.getNumKeys(chan)):
-            t = src.getKeyTime(Idx, chan)
-            dst.setValueAt(src.getValueAt(t, chan), t, chan)
-
-    else:
-        dst.setValue(src.getValue(chan), chan)
+    write_channel(dst, chan, read_channels(src.toScript())[chan])
+    count('knob.toScript')
 
 
-def copy_animation_to_transform(tracker_node, custom_node, stabilize=False):
+@profiled
+def copy_animation_to_transform(tracker_node, custom_node, stabilize=False, table=None, inverse_mode=None,
+                                output_mode=None, transform=None, changes=None):
     """
     Copies animation data from a Tracker node to a Transform node.
+    When an inversion is needed it's computed on the extracted curves, so each knob is written once.
 
     Args:
         tracker_node (nuke.Node): The Tracker4 node.
         custom_node (nuke.Node) : The new Transform node.
         stabilize (bool, optional): Whether to invert the transform for stabilization. Defaults to False.
+        table (TrackTable, optional): The extracted tracker data. Read from the node if not given.
+        inverse_mode (str, optional): How to invert, 'simple' like the Tracker export does, or 'matrix'
+            for an exact inverse when rotate and non-uniform scale are both animated. Defaults to INVERSE_MODE.
+        output_mode (str, optional): 'expression' or 'baked'. Defaults to OUTPUT_MODE.
+        transform (dict, optional): Match-move channels solved from the tracks, as returned by track_transform().
+            Defaults to the Tracker's own solve, in the direction of its 'transform' knob.
+        changes (list, optional): Re-bake the node in place, see write_knob().
     """
 
-    animated_knobs = []
-    for knob in ('translate', 'rotate', 'scale', 'center'):
-        if tracker_node[knob].isAnimated():
-            animated_knobs.append(knob)
-            if knob == 'rotate':
-                copy_knob_values_at_keys(tracker_node[knob], custom_node[knob], 0)
-            else:
-                copy_knob_values_at_keys(tracker_node[knob], custom_node[knob], 0)
-                copy_knob_values_at_keys(tracker_node[knob], custom_node[knob], 1)
+    if transform is None and table is None:
+        table = TrackTable.from_node(tracker_node)
+
+    if inverse_mode is None:
+        inverse_mode = INVERSE_MODE
+
+    baked = (output_mode or OUTPUT_MODE) == 'baked'
+    reference_frame = int(custom_node['tr_reference_frame'].value())
 
-    src_transform_knob = tracker_node['transform']
-    src_transform_name = src_transform_knob.enumName(int(src_transform_knob.getValue()))
+    src_transform_is_stabilize = False
+    if transform is None:
+        transform = table.transform
+
+        src_transform_knob = tracker_node['transform']
+        src_transform_name = src_transform_knob.enumName(int(src_transform_knob.getValue()))
+        src_transform_is_stabilize = (src_transform_name.find('stabilize') == 0)
+
+    animated_knobs = [knob for knob in ('translate', 'rotate', 'scale', 'center', 'skewX')
+                      if is_animated(transform.get(knob, ()))]
 
-    src_transform_is_stabilize = (src_transform_name.find('stabilize') == 0)
     invert_due_to_dest_stabilize = (stabilize and not src_transform_is_stabilize)
     invert_due_to_src_stabilize = ((not stabilize) and src_transform_is_stabilize)
     need_to_invert = (invert_due_to_dest_stabilize or invert_due_to_src_stabilize)
 
-    if need_to_invert:
-        trans_knob = custom_node['translate']
-        rotate_knob = custom_node['rotate']
-        scale_knob = custom_node['scale']
-        center_knob = custom_node['center']
+    # The simple inversion can't undo a skew.
+    if need_to_invert and (inverse_mode == 'matrix' or 'skewX' in animated_knobs):
+        transform = invert_transform_matrix(transform, reference_frame)
 
-        for chan in range(2):
-            for Idx in range(center_knob.getNumKeys(chan)):
-                t = center_knob.getKeyTime(Idx, chan)
-                center_knob.setValueAt(center_knob.getValueAt(t, chan) + trans_knob.getValueAt(t, chan), t, chan)
+        # The exact inverse may need knobs the tracker doesn't animate, like skew.
+        identity = {'translate': 0.0, 'rotate': 0.0, 'scale': 1.0, 'center': None, 'skewX': 0.0}
+        for knob in ('rotate', 'scale', 'skewX'):
+            if knob not in animated_knobs and not all(np.allclose(c[1], identity[knob]) for c in transform[knob]):
+                animated_knobs.append(knob)
 
-            for Idx in range(scale_knob.getNumKeys(chan)):
-                t = scale_knob.getKeyTime(Idx, chan)
-                scale_knob.setValueAt(1 / scale_knob.getValueAt(t, chan), t, chan)
+    elif need_to_invert:
+        transform = invert_transform_simple(transform)
 
-            for Idx in range(trans_knob.getNumKeys(chan)):
-                t = trans_knob.getKeyTime(Idx, chan)
-                trans_knob.setValueAt(-trans_knob.getValueAt(t, chan), t, chan)
+    tolerance = reduction_tolerance(custom_node)
+    counts = [0, 0]
 
-        for Idx in range(rotate_knob.getNumKeys(0)):
-            t = rotate_knob.getKeyTime(Idx, 0)
-            rotate_knob.setValueAt(-rotate_knob.getValueAt(t, 0), t, 0)
+    identities = dict(RELATIVE_KNOBS['Transform'])
+    for knob in animated_knobs:
+        channels = transform[knob][:1 if knob in ('rotate', 'skewX') else 2]
+        channels = reduce_knob_channels(knob, channels, tolerance, counts)
+        if baked and knob in identities:
+            channels = [relative_to_frame(channel, reference_frame, identities[knob]) for channel in channels]
 
-    custom_node['translate'].setExpression('curve - curve(tr_reference_frame)')
-    if 'rotate' in animated_knobs:
-        custom_node['rotate'].setExpression('curve - curve(tr_reference_frame)')
+        write_knob(custom_node[knob], channels, changes)
 
-    if 'scale' in animated_knobs:
-        custom_node['scale'].setExpression('curve - curve(tr_reference_frame) + 1')
+    report_reduction(custom_node, counts)
 
+    if baked:
+        return
 
-def check_color_group(tracker_node):
+    with phase('expressions'):
+        custom_node['translate'].setExpression('curve - curve(tr_reference_frame)')
+        if 'rotate' in animated_knobs:
+            custom_node['rotate'].setExpression('curve - curve(tr_reference_frame)')
+
+        if 'scale' in animated_knobs:
+            custom_node['scale'].setExpression('curve - curve(tr_reference_frame) + 1')
+
+        count('knob.setExpression', 1 + ('rotate' in animated_knobs) + ('scale' in animated_knobs))
+
+
+@profiled
+def copy_homography_to_cornerpin(custom_cpin, frames, matrices, points, homography_output=None, output_mode=None,
+                                 changes=None):
     """
-    Checks if a 'color_group' knob exists on the Tracker node; creates it if it doesn't.
-    Ensures that the node has a color associated with it for organizational purposes.
+    Writes per-frame homographies to a CornerPin2D node.
 
     Args:
-        tracker_node (nuke.Node): The selected Tracker4 node.
+        custom_cpin (nuke.Node): The CornerPin2D node.
+        frames (np.ndarray): The solved frames.
+        matrices (np.ndarray): The (frames, 3, 3) homographies, identity at the reference frame.
+        points (np.ndarray): The (tracks, 2) positions of the solved tracks at the reference frame.
+        homography_output (str, optional): 'corners' keys to1..to4 on the corners of the tracks' bounding box,
+            'matrix' keys the 'transform_matrix' (extra matrix) and leaves the corners alone.
+            Defaults to HOMOGRAPHY_OUTPUT.
+        output_mode (str, optional): 'expression' or 'baked'. Defaults to OUTPUT_MODE.
+        changes (list, optional): Re-bake the node in place, see write_knob().
     """
 
-    color = generate_color()
+    if (homography_output or HOMOGRAPHY_OUTPUT) == 'matrix':
+        write_knob(custom_cpin['transform_matrix'], homography_matrix_channels(frames, matrices), changes)
+        return
 
-    if tracker_node.knobs().get('color_group'):
-        color = int(tracker_node['color_group'].value())
+    baked = (output_mode or OUTPUT_MODE) == 'baked'
 
-    else:
-        tracker_node.addKnob(nuke.Tab_Knob('tracker_knob', 'Tracker Group'))
-        tracker_node.addKnob(nuke.String_Knob('color_group', 'color group', str(color)))
+    (x0, y0), (x1, y1) = points.min(0), points.max(0)
+    corners = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+    mapped = apply_homographies(matrices, corners)
 
-        tracker_node['color_group'].setEnabled(False)
-        tracker_node['tile_color'].setValue(color)
+    tolerance = reduction_tolerance(custom_cpin)
+    counts = [0, 0]
 
-    return color
+    for i in range(4):
+        to_knob = 'to{}'.format(i + 1)
+        write_knob(custom_cpin[to_knob], reduce_knob_channels(to_knob,
+                                                              [(frames, mapped[:, i, 0]), (frames, mapped[:, i, 1])],
+                                                              tolerance, counts), changes)
+
+        # Re-baked 'from' knobs driven by expressions already follow the new corners.
+        if changes is None or baked:
+            write_knob(custom_cpin['from{}'.format(i + 1)], corners[i].tolist(), changes)
+
+    report_reduction(custom_cpin, counts)
+
+    if not baked:
+        with phase('expressions'):
+            for i in range(1, 5):
+                custom_cpin['from{}'.format(i)].setExpression('to{}(tr_reference_frame)'.format(i))
+            count('knob.setExpression', 4)
 
 
-def bakery(tracker_node, mode='matchmove'):
+@profiled
+def copy_tracks_to_cornerpin(custom_cpin, table, tracks_index, output_mode=None, changes=None):
     """
-    Main function to process a Tracker node and create new nodes based on the specified mode.
+    Copies four tracks to the 'to' corners of a CornerPin2D node, and their position at the node's
+    reference frame to the 'from' corners.
 
     Args:
-        tracker_node (nuke.Node): The selected Tracker node - Tracker4 only.
-        mode (str, optional): The mode of operation.
-            'matchmove' (default)   : Creates a Transform node for match moving.
-            'stabilize'             : Creates a Transform node for stabilization.
-            'roto'                  : Creates a Roto/ RotoPaint node with a tracked layer.
-            'cpin'                  : Creates a MatchMove CornerPin2D node.
+        custom_cpin (nuke.Node): The CornerPin2D node.
+        table (TrackTable): The extracted tracks.
+        tracks_index (list): The four tracks, in corner order, see four_corners_of_a_convex_poly().
+        output_mode (str, optional): 'expression' or 'baked'. Defaults to OUTPUT_MODE.
+        changes (list, optional): Re-bake the node in place, see write_knob().
     """
 
-    tracker_name = tracker_node.name()
-    tracker_reference_frame = int(tracker_node['reference_frame'].value())
+    baked = (output_mode or OUTPUT_MODE) == 'baked'
+    reference_frame = int(custom_cpin['tr_reference_frame'].value())
 
-    stabilize_mode = mode == 'stabilize'
+    to_knobs = ["to1", "to2", "to3", "to4"]
+    from_knobs = ["from1", "from2", "from3", "from4"]
 
-    color = check_color_group(tracker_node)
+    ref_x = table.value_at(reference_frame, 'track_x', tracks_index).tolist()
+    ref_y = table.value_at(reference_frame, 'track_y', tracks_index).tolist()
 
-    if tracker_node['label'].value() == '':
-        tracker_node['label'].setValue('Operation: [value transform]\n'
-                                       'Reference frame: [value reference frame]')
+    tolerance = reduction_tolerance(custom_cpin)
+    counts = [0, 0]
 
-    if mode in ('matchmove', 'stabilize'):
-        if MARK_ALL_TRACKS:
-            mark_all_trackers(tracker_node)
+    for i in range(len(tracks_index)):
+        p = custom_cpin[to_knobs[i]]
+        write_knob(p, reduce_knob_channels(to_knobs[i],
+                                           [table.key_curve(tracks_index[i], 'track_x'),
+                                            table.key_curve(tracks_index[i], 'track_y')],
+                                           tolerance, counts), changes)
 
-        proposed_name = '{}_{}_'.format(tracker_name, 'stabilize' if stabilize_mode else 'matchmove')
-        custom_node = customize_node(node_class='Transform',
-                                     reference_frame=tracker_reference_frame,
-                                     tracker_node=tracker_node)
+        p = custom_cpin[from_knobs[i]]
+        if changes is None:
+            p.setValue(ref_x[i], 0)
+            p.setValue(ref_y[i], 1)
+            count('knob.setValue', 2)
+        elif baked:
+            # Re-baked 'from' knobs driven by expressions already follow the new tracks.
+            write_knob(p, [ref_x[i], ref_y[i]], changes)
 
-        custom_node.setName(proposed_name, uncollide=True)
-        custom_node['tile_color'].setValue(color)
+    report_reduction(custom_cpin, counts)
 
-        copy_animation_to_transform(tracker_node, custom_node, stabilize_mode)
-        custom_node.setSelected(False)
+    if not baked:
+        with phase('expressions'):
+            custom_cpin['from1'].setExpression('to1(tr_reference_frame)')
+            custom_cpin['from2'].setExpression('to2(tr_reference_frame)')
+            custom_cpin['from3'].setExpression('to3(tr_reference_frame)')
+            custom_cpin['from4'].setExpression('to4(tr_reference_frame)')
+            count('knob.setExpression', 4)
 
-    elif mode == 'roto':
-        if MARK_ALL_TRACKS:
-            mark_all_trackers(tracker_node)
 
-        proposed_name = '{}_{}_'.format(STANDARD_ROTO_NODE, tracker_name)
+def copy_track_to_transform(node, table, track, reference_frame, tolerance=None, counts=None, changes=None):
+    """
+    Keys a Transform with a single track: 'center' is the track position at the reference frame,
+    and 'translate' the track's offset from it, so anything at the track follows it.
 
-        custom_roto = customize_node(node_class=STANDARD_ROTO_NODE,
-                                     reference_frame=tracker_reference_frame,
-                                     tracker_node=tracker_node)
+    Args:
+        node (nuke.Node): The Transform node.
+        table (TrackTable): The extracted tracks.
+        track (int): The track index.
+        reference_frame (int): The frame the node doesn't move at.
+        tolerance (dict, optional): The key reduction tolerances, see reduce_knob_channels(). None keeps every key.
+        counts (list, optional): [keys_before, keys_after] of the reduction, updated in place.
+        changes (list, optional): Re-bake the node in place, see write_knob().
+    """
 
-        custom_roto.setName(proposed_name, uncollide=True)
-        custom_roto['tile_color'].setValue(color)
+    channels = [table.key_curve(track, 'track_x'), table.key_curve(track, 'track_y')]
+    center = [float(curve_value_at(channel, reference_frame)) for channel in channels]
 
-        copy_animation_to_rotopaint_layer(tracker_node, custom_roto)
+    channels = reduce_knob_channels('translate', [relative_to_frame(channel, reference_frame) for channel in channels],
+                                    tolerance, counts if counts is not None else [0, 0])
+    write_knob(node['translate'], channels, changes)
+    write_knob(node['center'], center, changes)
 
-        custom_roto.setSelected(False)
 
-    else:  # mode == 'cpin'
-        tracks_index = four_corners_of_a_convex_poly(tracker_node, tracker_reference_frame)
+@profiled
+def rebake_reference_frame(node):
+    """
+    Re-bakes the reference-relative keys of a node created in the 'baked' output mode,
+    after its tr_reference_frame changed. Each keyed knob is read and written once,
+    and a directly keyed Roto/ RotoPaint layer gets new curves.
 
-        if len(tracks_index) == 4:
-            proposed_name = '{}_CPin_matchmove_'.format(tracker_name)
+    Args:
+        node (nuke.Node): A Transform, Roto, RotoPaint or CornerPin2D node created by MotionBakery.
+    """
+
+    reference_frame = int(node['tr_reference_frame'].value())
+
+    if node.Class() == 'CornerPin2D':
+        matrix_channels = read_channels(node['transform_matrix'].toScript())
+        count('knob.toScript')
+        if is_animated(matrix_channels):
+            frames, matrices = matrix_channel_homographies(matrix_channels)
+            matrices = np.matmul(matrices, np.linalg.inv(matrices[np.abs(frames - reference_frame).argmin()]))
+            write_channels(node['transform_matrix'],
+                           homography_matrix_channels(frames, matrices / matrices[:, 2:3, 2:3]))
+            return
+
+        for i in range(1, 5):
+            to_channels = read_channels(node['to{}'.format(i)].toScript())
+            count('knob.toScript')
+            write_channels(node['from{}'.format(i)], [curve_value_at(c, reference_frame) for c in to_channels])
+        return
+
+    layer_channels = {}
+    for knob_name, identity in RELATIVE_KNOBS.get(node.Class(), ()):
+        knob = node.knob(knob_name)
+        if knob is None:
+            continue
+
+        channels = read_channels(knob.toScript())
+        count('knob.toScript')
+        if is_animated(channels):
+            channels = [relative_to_frame(c, reference_frame, identity) if isinstance(c, tuple) else c
+                        for c in channels]
+            write_channels(knob, [c if isinstance(c, tuple) else None for c in channels])
+            layer_channels[knob_name] = channels
+
+    # Layers keyed directly are keyed again from the re-baked knobs.
+    layer = node['curves'].toElement(node['tr_layer'].value()) if node.knob('tr_layer') else None
+    if layer is not None:
+        key_layer_transform(layer, layer_channels)
+        node['curves'].changed()
+
+
+def check_color_group(tracker_node):
+    """
+    Checks if a 'color_group' knob exists on the Tracker node; creates it if it doesn't.
+    Ensures that the node has a color associated with it for organizational purposes.
+
+    Args:
+        tracker_node (nuke.Node): The selected Tracker4 node.
+    """
+
+    color = generate_color()
+
+    if tracker_node.knobs().get('color_group'):
+        color = int(tracker_node['color_group'].value())
+
+    else:
+        tracker_node.addKnob(nuke.Tab_Knob('tracker_knob', 'Tracker Group'))
+        tracker_node.addKnob(nuke.String_Knob('color_group', 'color group', str(color)))
+
+        tracker_node['color_group'].setEnabled(False)
+        tracker_node['tile_color'].setValue(color)
+
+    return color
+
+
+def bake_modes(mode):
+    """ Returns the list of modes of a bake: BAKE_ALL_MODES for 'all', the modes of a list, or the single mode. """
+
+    if mode == 'all':
+        return list(BAKE_ALL_MODES)
+    if isinstance(mode, (list, tuple)):
+        return list(mode)
+    return [mode]
+
+
+def read_mode(modes, solver=None):
+    """
+    Returns the mode whose read_tracker() reads everything a bake of several modes needs,
+    so a Tracker is marked and extracted once for all of them.
+    """
+
+    transform_modes = [mode for mode in modes if mode in ('matchmove', 'stabilize')]
+    if 'roto' in modes or (transform_modes and (solver or TRANSFORM_SOLVER) == 'tracker'
+                           and len(transform_modes) < len(modes)):
+        return 'roto'
+    if transform_modes:
+        return transform_modes[0]
+    return modes[0]
+
+
+def needs_tracks(smooth=None, window=None):
+    """
+    Returns whether a bake smooths or retimes the tracks, so even a copy of the Tracker's own solve
+    needs them read, see read_tracker().
+
+    Args:
+        smooth (str, optional): The smoothing filter, see smooth_tracker(). Defaults to SMOOTH_FILTER.
+        window (dict, optional): The frame window, as returned by bake_window().
+    """
+
+    return bool(window) or bool(SMOOTH_FILTER if smooth is None else smooth)
+
+
+@profiled
+def read_tracker(tracker_node, mode='matchmove', mark_columns=None, solver=None, tracks=True):
+    """
+    Reads everything a bake needs from a Tracker4 node: marks its tracks if asked, then extracts the tracks,
+    with the Tracker's solved transform for the modes that copy it.
+    A 'matchmove' or 'stabilize' bake with the 'tracker' solver copies the transform alone: without tracks,
+    only the transform curves are read, and the track curves aren't parsed at all.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        mode (str, optional): The bake mode, see bakery(). Defaults to 'matchmove'.
+        mark_columns (tuple, optional): The track columns to check before reading ('T', 'R', 'S').
+            Defaults to MARK_COLUMNS if MARK_ALL_TRACKS is on, or none otherwise.
+        solver (str, optional): 'tracker', 'similarity' or 'affine'. Defaults to TRANSFORM_SOLVER.
+        tracks (bool, optional): Whether the tracks are needed even for a copy of the Tracker's solve,
+            see needs_tracks(). Defaults to True.
+
+    Returns:
+        TrackTable: The extracted tracker data.
+    """
+
+    if mode in ('cpin', 'homography', 'per_track'):
+        return TrackTable.from_node(tracker_node, transform=False)
+
+    if mark_columns is None:
+        mark_columns = MARK_COLUMNS if MARK_ALL_TRACKS else ()
+
+    if solver is None:
+        solver = TRANSFORM_SOLVER
+
+    script = mark_tracks(tracker_node, mark_columns)
+    if mode in ('matchmove', 'stabilize') and solver == 'tracker' and not tracks:
+        return TrackTable.from_transform(tracker_node, script=script)
+
+    return TrackTable.from_node(tracker_node, transform=mode == 'roto' or solver == 'tracker', script=script)
+
+
+def bake_job(tracker_node, table, mode='matchmove', solver=None, reference_frame=None):
+    """
+    Gathers, on the main thread, everything the math of a bake needs from the Tracker,
+    as the arguments of MotionBakery_pool.compute_bake().
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        table (TrackTable): The tracker data, as returned by read_tracker().
+        mode (str or list, optional): The bake mode, or modes, see bakery(). Defaults to 'matchmove'.
+        solver (str, optional): 'tracker', 'similarity' or 'affine'. Defaults to TRANSFORM_SOLVER.
+        reference_frame (int, optional): The Tracker's reference frame. Read from the node if not given,
+            see tracker_reference().
+
+    Returns:
+        dict: The compute_bake() arguments.
+    """
+
+    if reference_frame is None:
+        reference_frame = tracker_reference(tracker_node, table)
+
+    modes = bake_modes(mode)
+    mode = modes if len(modes) > 1 or mode == 'all' else modes[0]
+
+    return dict(table=table, mode=mode, reference_frame=reference_frame, solver=solver or TRANSFORM_SOLVER,
+                weighted=SOLVER_WEIGHTED, outlier_threshold=SOLVER_OUTLIER_THRESHOLD,
+                corner_tracks=corner_tracks(tracker_node, len(table)) if 'cpin' in modes else None)
+
+
+def unique_name(name, taken):
+    """
+    Returns a node name that isn't taken: the name, or the name with the first free number,
+    and adds it to the taken names. Checks a set instead of asking nuke for every new node.
+    """
+
+    base = name
+    index = 1
+    while name in taken:
+        index += 1
+        name = '{}_{}'.format(base, index)
+
+    taken.add(name)
+    return name
+
+
+@profiled
+def bake_per_track(tracker_node, table, reduce_keys=None, group=None, place=True):
+    """
+    The 'per_track' bake mode: a light Transform per enabled track, keyed from that track alone,
+    for cards and particles attached to single tracks. Each node has the track position at the Tracker's
+    reference frame as its center, and doesn't move at that frame.
+    Made for hundreds of tracks: the node names are made unique against a single read of the names in the Group,
+    each node is created named and written with one call per knob, and it has no 'Tracker settings' tab.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        table (TrackTable): The extracted tracks, see read_tracker().
+        reduce_keys (bool, optional): Whether to reduce the keys within REDUCE_TOLERANCE. Defaults to REDUCE_KEYS.
+        group (bool, optional): Create the nodes in a single Group node. Defaults to PER_TRACK_GROUP.
+        place (bool, optional): Whether to place the new nodes in the DAG, see place_nodes(). Defaults to True.
+
+    Returns:
+        list: The new nodes, or the new Group alone, with a hidden 'tr_mode' knob.
+            Empty if the tracker has no enabled, keyed track.
+    """
+
+    if reduce_keys is None:
+        reduce_keys = REDUCE_KEYS
+
+    if group is None:
+        group = PER_TRACK_GROUP
+
+    column_x = table.column_index['track_x']
+    enabled = table.flags.get('enable')
+    tracks = [track for track in range(len(table))
+              if (enabled is None or enabled[track]) and table.keys[track, column_x].any()]
+
+    if not tracks:
+        nuke.critical('The per track bake requires at least one enabled track with keys.')
+        return []
+
+    tracker_name = tracker_node.name()
+    reference_frame = tracker_reference(tracker_node, table)
+    color = check_color_group(tracker_node)
+    tolerance = REDUCE_TOLERANCE if reduce_keys else None
+    counts = [0, 0]
+
+    # The names are unique in the Tracker's Group, where the nodes are created, whatever the current Group is.
+    parent = parent_group(tracker_node)
+    taken = set(node.name() for node in nuke.allNodes(group=parent))
+
+    container = None
+    names = []
+    nodes = []
+    with parent:
+        if group:
+            container_name = unique_name('{}_tracks'.format(tracker_name), taken)
+            container = nuke.nodes.Group(name=container_name, tile_color=color,
+                                         label='{} tracks'.format(len(tracks)))
+            # Its mode, like the baked nodes, but no 'tr_source': the nodes inside are the ones re-baked.
+            mode_knob = nuke.String_Knob('tr_mode', 'mode', 'per_track')
+            mode_knob.setVisible(False)
+            container.addKnob(mode_knob)
+            taken = set()
+            container.begin()
+
+        try:
+            for track in tracks:
+                name = unique_name(re.sub(r'\W+', '_', '{}_{}'.format(tracker_name, table.names[track])), taken)
+                node = nuke.nodes.Transform(name=name, label=table.names[track], tile_color=color)
+                copy_track_to_transform(node, table, track, reference_frame, tolerance, counts)
+                mark_derived(node, tracker_name, 'per_track',
+                             {'track': table.names[track], 'reference_frame': reference_frame,
+                              'reduce_keys': reduce_keys, 'smoothing': table.smoothing, 'window': table.window})
+                names.append(name)
+                nodes.append(node)
+
+            if container is not None:
+                with phase('layout'):
+                    layout_grid(nodes)
+        finally:
+            if container is not None:
+                container.end()
+
+    if container is not None:
+        names = ['{}.{}'.format(container_name, name) for name in names]
+        nodes = [container]
+    add_derived(tracker_node, names)
+
+    if reduce_keys:
+        nuke.tprint('{} per track: {} of {} keys saved'.format(tracker_name, counts[0] - counts[1], counts[0]))
+
+    if place:
+        place_nodes([(tracker_node, nodes)])
+
+    return nodes
+
+
+@profiled
+def bakery(tracker_node, mode='matchmove', mark_columns=None, output_mode=None, reduce_keys=None,
+           homography_output=None, solver=None, layer_mode=None, smooth=None, frame_range=None, frame_step=None,
+           fps=None, table=None, solved=None, place=True):
+    """
+    Main function to process a Tracker node and create new nodes based on the specified mode.
+
+    Args:
+        tracker_node (nuke.Node): The selected Tracker node - Tracker4 only.
+        mode (str, optional): The mode of operation.
+            'matchmove' (default)   : Creates a Transform node for match moving.
+            'stabilize'             : Creates a Transform node for stabilization.
+            'roto'                  : Creates a Roto/ RotoPaint node with a tracked layer.
+            'cpin'                  : Creates a MatchMove CornerPin2D node.
+            'homography'            : Creates a MatchMove CornerPin2D node from a homography solved with every track.
+            'per_track'             : Creates a light Transform per enabled track, see bake_per_track().
+            'all'                   : Creates a node in each of BAKE_ALL_MODES.
+            A list of modes creates a node in each of them. The tracker is read once for all of them,
+            and their nodes are laid out as one row.
+        mark_columns (tuple, optional): The track columns to check before baking ('T', 'R', 'S').
+            Defaults to MARK_COLUMNS if MARK_ALL_TRACKS is on, or none otherwise.
+        output_mode (str, optional): 'expression' links the keys to the reference frame with expressions,
+            'baked' writes reference-relative keys and re-bakes them when the reference frame changes.
+            Defaults to OUTPUT_MODE.
+        reduce_keys (bool, optional): Whether to reduce the baked keys within the REDUCE_TOLERANCE.
+            Defaults to REDUCE_KEYS.
+        homography_output (str, optional): 'corners' or 'matrix', how the 'homography' mode keys the CornerPin2D.
+            Defaults to HOMOGRAPHY_OUTPUT.
+        solver (str, optional): Where the 'matchmove' and 'stabilize' transforms come from: 'tracker' copies
+            the Tracker's own solve, 'similarity' or 'affine' fit it again from every enabled track.
+            Defaults to TRANSFORM_SOLVER.
+        layer_mode (str, optional): 'linked' or 'keyed', how the 'roto' mode drives its layer.
+            Defaults to ROTO_LAYER_MODE.
+        smooth (str, optional): 'gaussian', 'savgol' or 'one_euro' smooths the tracks with the SMOOTH_STRENGTH
+            before baking, see smooth_tracker(). False bakes them as tracked. Defaults to SMOOTH_FILTER.
+        frame_range (str or tuple, optional): Only bake the keys of the 'script' range, the 'input' range,
+            or (first, last) frames, see bake_window(). Defaults to BAKE_FRAME_RANGE.
+        frame_step (int, optional): Key every n-th frame of the range. Defaults to BAKE_FRAME_STEP.
+        fps (float, optional): Conform the keys from the script frame rate to this one. Defaults to BAKE_FPS.
+        table (TrackTable, optional): The tracker data, as returned by read_tracker(). Read from the node if not given.
+        solved (dict, optional): The math of the bake, as returned by compute_bake(). Computed here if not given.
+        place (bool, optional): Whether to place the new node in the DAG, see place_nodes(). Defaults to True.
+
+    Returns:
+        nuke.Node: The new node, or None if the tracker can't be baked in this mode.
+            For several modes, or the 'per_track' mode, the list of the new nodes.
+    """
+
+    if output_mode is None:
+        output_mode = OUTPUT_MODE
+
+    if solver is None:
+        solver = TRANSFORM_SOLVER
+
+    modes = bake_modes(mode)
+    if len(modes) == 1 and mode != 'all':
+        # A list of one mode, like the CLI passes, is that mode.
+        mode = modes[0]
+        if isinstance(solved, dict) and mode in solved:
+            solved = solved[mode]
+
+    window = bake_window(tracker_node, frame_range, frame_step, fps)
+    if len(modes) > 1 or mode == 'all':
+        if table is None:
+            table = read_tracker(tracker_node, read_mode(modes, solver), mark_columns, solver,
+                                 needs_tracks(smooth, window))
+        table = smooth_tracker(table, smooth)
+        table = window_tracker(tracker_node, table, window)
+        if table is None:
+            nuke.critical('{} has no tracked frame in the frame range.'.format(tracker_node.name()))
+            return []
+
+        if solved is None:
+            with phase('compute'):
+                solved = compute_bake(**bake_job(tracker_node, table, modes, solver))
+
+        nodes = []
+        for mode in modes:
+            node = bakery(tracker_node, mode, output_mode=output_mode, reduce_keys=reduce_keys,
+                          homography_output=homography_output, solver=solver, layer_mode=layer_mode,
+                          smooth=smooth, frame_range=frame_range, frame_step=frame_step, fps=fps, table=table,
+                          solved=solved[mode], place=False)
+            if isinstance(node, list):
+                nodes.extend(node)
+            elif node is not None:
+                nodes.append(node)
+
+        if place and nodes:
+            place_nodes([(tracker_node, nodes)])
+        return nodes
+
+    if table is None:
+        table = read_tracker(tracker_node, mode, mark_columns, solver, needs_tracks(smooth, window))
+    table = smooth_tracker(table, smooth)
+    table = window_tracker(tracker_node, table, window)
+    if table is None:
+        nuke.critical('{} has no tracked frame in the frame range.'.format(tracker_node.name()))
+        return
+
+    tracker_name = tracker_node.name()
+    tracker_reference_frame = tracker_reference(tracker_node, table)
+
+    annotate(tracker=tracker_name, mode=mode, tracks=len(table), frames=len(table.frames))
+
+    if solved is None:
+        with phase('compute'):
+            solved = compute_bake(**bake_job(tracker_node, table, mode, solver, tracker_reference_frame))
+
+    stabilize_mode = mode == 'stabilize'
+
+    color = check_color_group(tracker_node)
+
+    if tracker_node['label'].value() == '':
+        tracker_node['label'].setValue('Operation: [value transform]\n'
+                                       'Reference frame: [value reference frame]')
+
+    if mode == 'per_track':
+        return bake_per_track(tracker_node, table, reduce_keys=reduce_keys, place=place)
+
+    if mode in ('matchmove', 'stabilize'):
+        transform = solved.get('transform')
+        if solver != 'tracker' and not transform:
+            nuke.critical('The {} solve requires at least {} enabled tracks keyed at the reference frame.'.format(
+                solver, 3 if solver == 'affine' else 2))
+            return
+
+        proposed_name = '{}_{}_'.format(tracker_name, 'stabilize' if stabilize_mode else 'matchmove')
+        custom_node = customize_node(node_class='Transform',
+                                     reference_frame=tracker_reference_frame,
+                                     tracker_node=tracker_node,
+                                     output_mode=output_mode,
+                                     reduce_keys=reduce_keys,
+                                     smoothing=table.smoothing,
+                                     window=table.window,
+                                     place=place)
+
+        custom_node.setName(proposed_name, uncollide=True)
+        custom_node['tile_color'].setValue(color)
+
+        copy_animation_to_transform(tracker_node, custom_node, stabilize_mode, table=table, output_mode=output_mode,
+                                    transform=transform)
+        register_derived(tracker_node, custom_node, mode, {'output_mode': output_mode, 'solver': solver})
+        custom_node.setSelected(False)
+        return custom_node
+
+    elif mode == 'roto':
+        if layer_mode is None:
+            layer_mode = ROTO_LAYER_MODE
+
+        proposed_name = '{}_{}_'.format(STANDARD_ROTO_NODE, tracker_name)
+
+        # A keyed layer has no expressions to follow the reference frame, it's always re-baked.
+        custom_roto = customize_node(node_class=STANDARD_ROTO_NODE,
+                                     reference_frame=tracker_reference_frame,
+                                     tracker_node=tracker_node,
+                                     output_mode='baked' if layer_mode == 'keyed' else output_mode,
+                                     reduce_keys=reduce_keys,
+                                     smoothing=table.smoothing,
+                                     window=table.window,
+                                     place=place)
+
+        custom_roto.setName(proposed_name, uncollide=True)
+        custom_roto['tile_color'].setValue(color)
+
+        copy_animation_to_rotopaint_layer(tracker_node, custom_roto, table=table, output_mode=output_mode,
+                                          layer_mode=layer_mode)
+        register_derived(tracker_node, custom_roto, mode, {'output_mode': output_mode, 'layer_mode': layer_mode})
+
+        custom_roto.setSelected(False)
+        return custom_roto
+
+    elif mode == 'homography':
+        frames, matrices, points = solved['homography']
+
+        if len(points) < 4 or not len(frames):
+            nuke.critical('The homography CornerPin2D requires at least 4 enabled tracks keyed at the reference frame.')
+            return
+
+        if homography_output is None:
+            homography_output = HOMOGRAPHY_OUTPUT
+
+        # The extra matrix can't be linked to the reference frame with expressions, it's always re-baked.
+        matrix_output = homography_output == 'matrix'
+
+        proposed_name = '{}_CPin_homography_'.format(tracker_name)
+
+        custom_cpin = customize_node(node_class='CornerPin',
+                                     reference_frame=tracker_reference_frame,
+                                     tracker_node=tracker_node,
+                                     output_mode='baked' if matrix_output else output_mode,
+                                     reduce_keys=False if matrix_output else reduce_keys,
+                                     smoothing=table.smoothing,
+                                     window=table.window,
+                                     place=place)
+
+        custom_cpin.setName(proposed_name, uncollide=True)
+        custom_cpin['tile_color'].setValue(color)
+
+        copy_homography_to_cornerpin(custom_cpin, frames, matrices, points,
+                                     homography_output=homography_output, output_mode=output_mode)
+        register_derived(tracker_node, custom_cpin, mode,
+                         {'output_mode': output_mode, 'homography_output': homography_output})
+
+        custom_cpin.setSelected(False)
+        return custom_cpin
+
+    else:  # mode == 'cpin'
+        tracks_index = solved['corners']
+
+        if len(tracks_index) == 4:
+            proposed_name = '{}_CPin_matchmove_'.format(tracker_name)
 
             custom_cpin = customize_node(node_class='CornerPin',
                                  reference_frame=tracker_reference_frame,
-                                 tracker_node=tracker_node)
+                                 tracker_node=tracker_node,
+                                 output_mode=output_mode,
+                                 reduce_keys=reduce_keys,
+                                 smoothing=table.smoothing,
+                                 window=table.window,
+                                 place=place)
 
             custom_cpin.setName(proposed_name, uncollide=True)
             custom_cpin['tile_color'].setValue(color)
 
-            to_knobs = ["to1", "to2", "to3", "to4"]
-            from_knobs = ["from1", "from2", "from3", "from4"]
+            copy_tracks_to_cornerpin(custom_cpin, table, tracks_index, output_mode=output_mode)
+            register_derived(tracker_node, custom_cpin, mode,
+                             {'output_mode': output_mode, 'corners': [table.names[i] for i in tracks_index]})
 
-            for i in range(len(tracks_index)):
-                k = tracker_node['tracks']
+            custom_cpin.setSelected(False)
+            return custom_cpin
 
-                track_x_index = tracks_index[i] * 31 + 2
-                track_y_index = tracks_index[i] * 31 + 3
+        else:
+            nuke.critical('CornerPin2D export requires at least 4 tracks, either selected or not.')
+            return
 
-                p = custom_cpin[to_knobs[i]]
-                p.setAnimated(0)
-                p.setAnimated(1)
 
-                for Idx in range(k.getNumKeys(track_x_index)):
-                    t = k.getKeyTime(Idx, track_x_index)
-                    p.setValueAt(k.getValueAt(t, track_x_index), t, 0)
+def tracker_settings(tracker_node):
+    """
+    Returns the Tracker settings saved in a motion cache: its name, color, input frame range and TRACKER_KNOBS.
+    Enumeration knobs are saved by name. It only reads the Tracker: the color is None if it has no color group yet,
+    see check_color_group().
+    """
 
-                for Idx in range(k.getNumKeys(track_y_index)):
-                    t = k.getKeyTime(Idx, track_y_index)
-                    p.setValueAt(k.getValueAt(t, track_y_index), t, 1)
+    color_group = tracker_node.knob('color_group')
+    settings = {'name': tracker_node.name(), 'color': int(color_group.value()) if color_group is not None else None,
+                'input_range': [tracker_node.firstFrame(), tracker_node.lastFrame()]}
+    for knob_name in TRACKER_KNOBS:
+        knob = tracker_node[knob_name]
+        if knob_name in ('transform', 'filter', 'shutteroffset'):
+            settings[knob_name] = knob.enumName(int(knob.getValue()))
+        elif knob_name == 'selected_tracks':
+            settings[knob_name] = knob.getText()
+        else:
+            settings[knob_name] = knob.value()
 
-                p = custom_cpin[from_knobs[i]]
-                p.setValue(k.getValueAt(tracker_reference_frame, track_x_index), 0)
-                p.setValue(k.getValueAt(tracker_reference_frame, track_y_index), 1)
+    return settings
 
-            custom_cpin['from1'].setExpression('to1(tr_reference_frame)')
-            custom_cpin['from2'].setExpression('to2(tr_reference_frame)')
-            custom_cpin['from3'].setExpression('to3(tr_reference_frame)')
-            custom_cpin['from4'].setExpression('to4(tr_reference_frame)')
 
-            custom_cpin.setSelected(False)
+def motion_cache_folder():
+    """ Returns MOTION_CACHE_FOLDER, or a 'motion_cache' folder next to the script. """
+
+    if MOTION_CACHE_FOLDER:
+        return MOTION_CACHE_FOLDER
+
+    script = nuke.root()['name'].value()
+    if not script:
+        return os.path.join(os.path.expanduser('~'), '.nuke', 'motion_cache')
+    return os.path.join(os.path.dirname(script), 'motion_cache')
+
+
+@profiled
+def export_motion_cache(tracker_node, folder=None, mark_columns=None):
+    """
+    Saves the tracks and the solved transform of a Tracker4 node to a motion cache file,
+    so it can be baked in other scripts with bake_from_cache(), without the Tracker.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        folder (str, optional): The cache folder. Defaults to motion_cache_folder().
+        mark_columns (tuple, optional): The track columns to check before reading, see read_tracker().
+
+    Returns:
+        str: The path of the cache file, named after the tracker and a hash of its content.
+    """
+
+    table = read_tracker(tracker_node, 'roto', mark_columns)
+    return save_cache(folder or motion_cache_folder(), table, tracker_settings(tracker_node))
+
+
+def is_cache_stale(path, tracker_node):
+    """
+    Checks a motion cache against a Tracker4 node.
+
+    Returns:
+        bool: True if the tracks, the solve or the reference frame of the Tracker changed since the cache was saved.
+    """
+
+    header = read_header(path)[0]
+    table = read_tracker(tracker_node, 'roto', ())
+    return content_hash(table, tracker_settings(tracker_node)) != header['hash']
+
+
+@profiled
+def bake_from_cache(path, mode='matchmove', position=(0, 0), check_stale=True, **options):
+    """
+    Bakes a motion cache file, in any bakery() mode. The cache is mapped in memory, not read.
+
+    Args:
+        path (str): The cache file, as saved by export_motion_cache().
+        mode (str or list, optional): The bake mode, or modes, see bakery(). Defaults to 'matchmove'.
+        position (tuple, optional): Where the new node goes in the DAG. Defaults to (0, 0).
+        check_stale (bool, optional): If the script has the cached Tracker, warn when the cache doesn't match it.
+            Defaults to True.
+        **options: Any other bakery() argument, like output_mode or solver.
+
+    Returns:
+        nuke.Node: The new node, or None if the cache can't be baked in this mode. For several modes, a list.
+    """
+
+    table, header = load_cache(path)
+    tracker = CachedTracker(header['tracker'], position)
+
+    if check_stale:
+        live_tracker = nuke.toNode(tracker.name())
+        if live_tracker is not None and live_tracker.Class() == 'Tracker4' and is_cache_stale(path, live_tracker):
+            nuke.message('{} changed since this cache was saved:\n{}'.format(tracker.name(), path))
+
+    return bakery(tracker, mode=mode, table=table, **options)
+
+
+def export_sources(sources, what='tracks', mark_columns=None):
+    """
+    Reads the Trackers of an export one at a time, as the exporter asks for them.
+
+    Args:
+        sources (list): Tracker4 nodes, or motion cache files.
+        what (str, optional): 'tracks' or 'transform', the transform is only read when it's exported.
+        mark_columns (tuple, optional): See read_tracker().
+
+    Yields:
+        tuple: (tracker name, TrackTable).
+    """
+
+    for source in sources:
+        if isinstance(source, str):
+            table, header = load_cache(source)
+            yield header['tracker']['name'], table
+
+        elif what == 'transform':
+            # Read like a 'roto' bake: the tracks marked, and the Tracker's solve.
+            yield source.name(), read_tracker(source, 'roto', mark_columns)
 
         else:
-            nuke.critical('CornerPin2D export requires at least 4 tracks, either selected or not.')
-            return
+            yield source.name(), read_tracker(source, 'cpin')
+
+
+@profiled
+def export_tracks(sources, path, fmt=None, what='tracks', compress=None, keyed_only=False, mark_columns=None):
+    """
+    Exports the per-frame tracks, or the solved transform, of many Trackers to a CSV, JSON-lines
+    or Nuke ASCII file. The rows are streamed, one Tracker and a chunk of frames at a time,
+    see MotionBakery_export.
+
+    Args:
+        sources (nuke.Node or list): Tracker4 nodes, or motion cache files.
+        path (str): The file, or the folder of the ASCII files. A '.gz' file is gzip compressed.
+        fmt (str, optional): 'csv', 'jsonl' or 'ascii'. Defaults to the format of the path extension.
+        what (str, optional): 'tracks' or 'transform'. Defaults to 'tracks'.
+        compress (bool, optional): Gzip the output. Defaults to True for paths ending with '.gz'.
+        keyed_only (bool, optional): Only export the keyed frames of the tracks. Defaults to False.
+        mark_columns (tuple, optional): The track columns checked before reading the transform, see read_tracker().
+
+    Returns:
+        list: The paths of the files written.
+    """
+
+    if not isinstance(sources, (list, tuple)):
+        sources = [sources]
+
+    return export_tables(export_sources(sources, what, mark_columns), path, fmt, what, compress, keyed_only)
+
+
+def register_derived(tracker_node, node, mode, options):
+    """
+    Records that a node was baked from a Tracker, so it can be re-baked in place later.
+    The node gets hidden 'tr_source', 'tr_mode' and 'tr_options' knobs, and the Tracker a hidden 'tr_derived' list
+    of its baked nodes. Either link is enough to find the node again, so renaming one side doesn't lose it.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        node (nuke.Node): The baked node.
+        mode (str): The bake mode.
+        options (dict): The bakery() arguments needed to bake the node again the same way.
+    """
+
+    mark_derived(node, tracker_node.name(), mode, options)
+    add_derived(tracker_node, [node.name()])
+
+
+def mark_derived(node, tracker_name, mode, options):
+    """ Adds the hidden 'tr_source', 'tr_mode' and 'tr_options' knobs of a baked node, see register_derived(). """
+
+    for knob_name, label, value in (('tr_source', 'source', tracker_name),
+                                    ('tr_mode', 'mode', mode),
+                                    ('tr_options', 'options', json.dumps(options, sort_keys=True))):
+        knob = nuke.String_Knob(knob_name, label, value)
+        knob.setVisible(False)
+        node.addKnob(knob)
+
+
+def add_derived(tracker_node, names):
+    """
+    Adds baked nodes to the 'tr_derived' list of a Tracker, see register_derived().
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        names (list): The names of the nodes, relative to the Group of the Tracker, like 'Group1.Transform1'.
+    """
+
+    derived = tracker_node.knob('tr_derived')
+    if derived is None:
+        derived = nuke.String_Knob('tr_derived', 'baked nodes', '[]')
+        derived.setVisible(False)
+        tracker_node.addKnob(derived)
+
+    derived.setValue(json.dumps(json.loads(derived.value() or '[]') + list(names)))
+
+
+def sibling_node(node, name):
+    """ Returns the node with the given name, or relative path, in the same Group as node, or None. """
+
+    path = node.fullName().rpartition('.')[0]
+    with nuke.root():
+        return nuke.toNode('{}.{}'.format(path, name) if path else name)
+
+
+def source_tracker(node):
+    """ Returns the Tracker a node was baked from, in the Group of the node or in a Group above it, or None. """
+
+    if node.knob('tr_source') is None:
+        return None
+
+    name = node['tr_source'].value()
+    path = node.fullName().rpartition('.')[0]
+    while True:
+        with nuke.root():
+            tracker = nuke.toNode('{}.{}'.format(path, name) if path else name)
+        if tracker is not None and tracker.Class() == 'Tracker4':
+            return tracker
+        if not path:
+            return None
+        path = path.rpartition('.')[0]
+
+
+def derived_nodes(tracker_node):
+    """
+    Returns the nodes baked from a Tracker, from its 'tr_derived' list and from the 'tr_source' of the nodes
+    in its Group. The list on the Tracker is updated with the current names.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+
+    Returns:
+        list: The baked nodes.
+    """
+
+    derived = tracker_node.knob('tr_derived')
+    names = json.loads(derived.value() or '[]') if derived is not None else []
+
+    nodes = []
+    current = []
+    for name in names:
+        node = sibling_node(tracker_node, name)
+        if node is not None and node.knob('tr_mode') is not None and node not in nodes:
+            nodes.append(node)
+            current.append(name)
+
+    tracker_name = tracker_node.name()
+    for node in nuke.allNodes(group=parent_group(tracker_node)):
+        source = node.knob('tr_source')
+        if source is not None and source.value() == tracker_name and node not in nodes:
+            nodes.append(node)
+            current.append(node.name())
+
+    if derived is not None and current != names:
+        derived.setValue(json.dumps(current))
+
+    return nodes
+
+
+@profiled
+def rebake(tracker_node, nodes=None):
+    """
+    Re-bakes the nodes baked from a Tracker in place, after the Tracker changed.
+    The nodes keep their names, connections, reference frames, smoothing and frame windows.
+    The tracks are read once, and only the knobs and frames that changed are rewritten.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        nodes (list, optional): The nodes to re-bake. Defaults to every node baked from the Tracker.
+
+    Returns:
+        dict: The name of each re-baked node, with its (knob, first frame, last frame) changes.
+            Nodes that can't be baked from the Tracker anymore are left out.
+    """
+
+    if nodes is None:
+        nodes = derived_nodes(tracker_node)
+    if not nodes:
+        return {}
+
+    tracked = read_tracker(tracker_node, 'roto')
+
+    # The nodes are smoothed and retimed with the settings on their own tab, each setting once.
+    tables = {}
+
+    report = {}
+    for node in nodes:
+        mode = node['tr_mode'].value()
+        options = json.loads(node['tr_options'].value() or '{}')
+        output_mode = options.get('output_mode')
+        changes = []
+
+        smoothing = node_smoothing(node, options)
+        window = node_window(node, options)
+        key = json.dumps([smoothing, window], sort_keys=True)
+        if key not in tables:
+            table = smooth_tracker(tracked, *smoothing) if smoothing else tracked
+            tables[key] = window_tracker(tracker_node, table, window)
+        table = tables[key]
+        if table is None:
+            continue
+        reference_frame = tracker_reference(tracker_node, table)
+
+        if mode in ('matchmove', 'stabilize'):
+            solver = options.get('solver') or 'tracker'
+            transform = None
+            if solver != 'tracker':
+                transform = compute_bake(**bake_job(tracker_node, table, mode, solver, reference_frame))['transform']
+                if not transform:
+                    continue
+
+            copy_animation_to_transform(tracker_node, node, mode == 'stabilize', table=table,
+                                        output_mode=output_mode, transform=transform, changes=changes)
+
+        elif mode == 'roto':
+            copy_animation_to_rotopaint_layer(tracker_node, node, table=table, output_mode=output_mode,
+                                              layer_mode=options.get('layer_mode'), changes=changes)
+
+        elif mode == 'homography':
+            frames, matrices, points = track_homographies(table, reference_frame)
+            if len(points) < 4 or not len(frames):
+                continue
+
+            copy_homography_to_cornerpin(node, frames, matrices, points,
+                                         homography_output=options.get('homography_output'),
+                                         output_mode=output_mode, changes=changes)
+
+        elif mode == 'per_track':
+            track = table.name_index.get(options.get('track'))
+            if track is None:
+                continue
+
+            copy_track_to_transform(node, table, track, options['reference_frame'],
+                                    REDUCE_TOLERANCE if options.get('reduce_keys') else None, changes=changes)
+
+        else:  # mode == 'cpin'
+            tracks_index = [table.name_index.get(name) for name in options.get('corners', ())]
+            if len(tracks_index) != 4 or None in tracks_index:
+                continue
+
+            copy_tracks_to_cornerpin(node, table, tracks_index, output_mode=output_mode, changes=changes)
+
+        report[node.name()] = changes
+
+    return report
+
+
+@profiled
+def rebake_selection():
+    """
+    Re-bakes in place the nodes baked from the selected Trackers, or the selected baked nodes,
+    as a single undo step, and reports what changed.
+    """
+
+    sources = []
+    for node in nuke.selectedNodes():
+        if node.Class() == 'Tracker4':
+            sources.append((node, None))
+        else:
+            tracker = source_tracker(node)
+            if tracker is not None:
+                sources.append((tracker, [node]))
+
+    if not sources:
+        nuke.message('Select a Tracker, or a node baked from a Tracker!')
+        return
+
+    report = {}
+    undo = nuke.Undo()
+    undo.begin('MotionBakery: re-bake')
+    try:
+        for tracker, nodes in sources:
+            report.update(rebake(tracker, nodes))
+    finally:
+        undo.end()
+
+    if not report:
+        nuke.message('Nothing to re-bake, no node baked from the selected Trackers was found.')
+        return
+
+    lines = []
+    for name, changes in sorted(report.items()):
+        if not changes:
+            lines.append('{}: up to date'.format(name))
+            continue
+
+        first = min(change[1] for change in changes)
+        last = max(change[2] for change in changes)
+        frames = 'all frames' if first == float('-inf') else 'frames {:g}-{:g}'.format(first, last)
+        lines.append('{}: {} ({})'.format(name, ', '.join(sorted(set(change[0] for change in changes))), frames))
+
+    nuke.message('Re-baked:\n' + '\n'.join(lines))
+
+
+def parent_group(node):
+    """ Returns the Group (or Root) a node lives in. """
+
+    path = node.fullName().rpartition('.')[0]
+    if not path:
+        return nuke.root()
+
+    with nuke.root():
+        return nuke.toNode(path)
+
+
+def find_trackers(group=None):
+    """
+    Returns every Tracker4 node of the script, or of a Group, including the ones in nested Groups.
+
+    Args:
+        group (nuke.Node, optional): The Group to search. Defaults to the whole script.
+
+    Returns:
+        list: The Tracker4 nodes.
+    """
+
+    return nuke.allNodes('Tracker4', group=group or nuke.root(), recurseGroups=True)
+
+
+@profiled
+def read_batch(tracker_nodes, mode, task, mark_columns=None, solver=None, smooth=None, frame_range=None,
+               frame_step=None, fps=None):
+    """
+    First stage of a batch bake, on the main thread: reads every tracker.
+
+    Args:
+        tracker_nodes (list): The nodes to bake, the ones that aren't Tracker4 are ignored.
+        mode (str or list): The bake mode, or modes, see bakery().
+        task (nuke.ProgressTask): The batch progress.
+        mark_columns (tuple, optional): See read_tracker().
+        solver (str, optional): See read_tracker().
+        smooth (str, optional): See smooth_tracker().
+        frame_range (str or tuple, optional): See bake_window().
+        frame_step (int, optional): See bake_window().
+        fps (float, optional): See bake_window().
+
+    Returns:
+        tuple: (jobs, skipped), one (tracker, bake_job()) per Tracker with tracks in the frame range,
+            and the names of the others.
+            None if the batch was cancelled.
+    """
+
+    trackers = [node for node in tracker_nodes if node.Class() == 'Tracker4']
+    jobs = []
+    skipped = []
+
+    for position, tracker in enumerate(trackers):
+        if task.isCancelled():
+            return None
+
+        task.setMessage('Reading {}'.format(tracker.name()))
+        task.setProgress(int(30 * position / len(trackers)))
+
+        table = None
+        if len(track_index(tracker)):
+            window = bake_window(tracker, frame_range, frame_step, fps)
+            table = read_tracker(tracker, read_mode(bake_modes(mode), solver), mark_columns, solver,
+                                 needs_tracks(smooth, window))
+            table = smooth_tracker(table, smooth)
+            table = window_tracker(tracker, table, window)
+
+        if table is not None:
+            jobs.append((tracker, bake_job(tracker, table, mode, solver)))
+        else:
+            skipped.append(tracker.name())
+
+    return jobs, skipped
+
+
+@profiled
+def apply_batch(items, mode, options, placed=None, undo=None):
+    """
+    Last stage of a batch bake, on the main thread: creates the nodes of some trackers.
+    The last call of a batch also finishes it, see finish_batch(), in the same main thread call,
+    even if one of its bakes fails.
+
+    Args:
+        items (list): (tracker, table, solved) tuples, see bakery().
+        mode (str or list): The bake mode, or modes.
+        options (dict): The other bakery() arguments.
+        placed (list, optional): The rows of the earlier calls of the batch, placed with the new ones
+            by its last call.
+        undo (nuke.Undo, optional): The undo step of the batch, for its last call to end.
+
+    Returns:
+        list: (tracker, new nodes) of each tracker that was baked.
+    """
+
+    rows = []
+    try:
+        for tracker, table, solved in items:
+            with parent_group(tracker):
+                nodes = bakery(tracker, mode=mode, table=table, solved=solved, place=False, **options)
+
+            if isinstance(nodes, list):
+                if nodes:
+                    rows.append((tracker, nodes))
+            elif nodes is not None:
+                rows.append((tracker, [nodes]))
+    finally:
+        if undo is not None:
+            finish_batch((placed or []) + rows, undo)
+
+    return rows
+
+
+def finish_batch(rows, undo):
+    """
+    Places the nodes of a batch bake in the DAG and ends its undo step, on the main thread.
+
+    Args:
+        rows (list): (tracker, new nodes) tuples, see place_nodes().
+        undo (nuke.Undo): The undo step of the batch.
+    """
+
+    try:
+        place_nodes(rows)
+    finally:
+        undo.end()
 
 
-def bake_selection(mode='matchmove'):
+@profiled
+def place_nodes(rows):
+    """
+    Places new nodes in the DAG, the nodes of each Tracker as a row below it, without overlapping any node.
+    Each Group is read once for all of its rows, see MotionBakery_layout.
+
+    Args:
+        rows (list): (tracker, new nodes) tuples.
+    """
+
+    groups = {}
+    for tracker, nodes in rows:
+        groups.setdefault(tracker.fullName().rpartition('.')[0], []).append((tracker, nodes))
+
+    for group_rows in groups.values():
+        with phase('layout'):
+            place_rows(group_rows, parent_group(group_rows[0][0]))
+
+
+@profiled
+def bake_batch(tracker_nodes, mode='matchmove', background=None, **options):
+    """
+    Bakes many Tracker4 nodes in one command, as a single undo step.
+    All the trackers are read first, on the main thread. The math of each tracker runs in a pool
+    (COMPUTE_EXECUTOR, COMPUTE_WORKERS), and the new nodes are written back on the main thread,
+    APPLY_BATCH_SIZE trackers at a time, then placed in the DAG at the end.
+    A progress bar shows the progress, cancelling it stops before the next batch of nodes.
+
+    Args:
+        tracker_nodes (list): The Tracker4 nodes.
+        mode (str or list, optional): The bake mode, or modes, see bakery(). Defaults to 'matchmove'.
+        background (bool, optional): Run the batch in a background thread, so Nuke stays responsive.
+            The progress bar and the undo step are still made and ended on the main thread, the undo step
+            by the call creating the last nodes. Defaults to BATCH_BACKGROUND.
+        **options: Any other bakery() argument, like output_mode or solver.
+
+    Returns:
+        list: The new nodes, or the running threading.Thread of a background batch.
+    """
+
+    if background is None:
+        background = BATCH_BACKGROUND
+
+    if background:
+        thread = threading.Thread(target=bake_batch, args=(list(tracker_nodes), mode, False), kwargs=options,
+                                  name='MotionBakery batch')
+        thread.start()
+        return thread
+
+    rows = []
+    progress = [main_thread(nuke.ProgressTask, 'MotionBakery')]
+    task = progress[0]
+    undo = main_thread(nuke.Undo)
+    main_thread(undo.begin, 'MotionBakery: bake {} trackers'.format(len(tracker_nodes)))
+    ended = False
+
+    try:
+        read = main_thread(read_batch, tracker_nodes, mode, task, options.get('mark_columns'), options.get('solver'),
+                           options.get('smooth'), options.get('frame_range'), options.get('frame_step'),
+                           options.get('fps'))
+        if read is None:
+            return []
+
+        jobs, skipped = read
+        results = compute_all([job for tracker, job in jobs], COMPUTE_EXECUTOR, COMPUTE_WORKERS)
+        pending = []
+
+        try:
+            for index, solved in results:
+                if task.isCancelled():
+                    break
+
+                tracker, job = jobs[index]
+                pending.append((tracker, job['table'], solved))
+
+                task.setMessage('Baking {} of {}'.format(index + 1, len(jobs)))
+                task.setProgress(30 + int(70 * index / len(jobs)))
+
+                if index == len(jobs) - 1:
+                    ended = True
+                    rows.extend(main_thread(apply_batch, pending, mode, options, rows, undo))
+                elif len(pending) == APPLY_BATCH_SIZE:
+                    rows.extend(main_thread(apply_batch, pending, mode, options))
+                    pending = []
+        finally:
+            results.close()
+
+    finally:
+        if not ended:
+            # Cancelled, failed, or nothing to bake.
+            main_thread(finish_batch, rows, undo)
+
+        # The progress bar closes with its last reference, dropped on the main thread.
+        del task
+        main_thread(progress.clear)
+
+    created = [node for tracker, nodes in rows for node in nodes]
+
+    if skipped:
+        main_thread(nuke.message,
+                    'No tracks to bake on these Trackers, they were skipped:\n{}'.format('\n'.join(skipped)))
+
+    return created
+
+
+def bake_all_trackers(mode='matchmove', group=None, **options):
+    """
+    Bakes every Tracker4 node of the script, or of a Group, see bake_batch().
+
+    Returns:
+        list: The new nodes.
+    """
+
+    return bake_batch(find_trackers(group), mode=mode, **options)
+
+
+def bake_script_trackers(mode='matchmove'):
+    """
+    Menu command: bakes every Tracker4 node of the script in one batch, once the user agrees, see bake_all_trackers().
+
+    Returns:
+        list: The new nodes, empty if there's no Tracker4 or the user said no.
+    """
+
+    trackers = find_trackers()
+    if not trackers:
+        nuke.message('No Tracker4 node in the script!')
+        return []
+
+    if not nuke.ask('Bake the {} Tracker4 nodes of the script?'.format(len(trackers))):
+        return []
+
+    return bake_batch(trackers, mode=mode)
+
+
+@profiled
+def bake_selection(mode='matchmove', mark_columns=None, output_mode=None, reduce_keys=None, homography_output=None,
+                   solver=None, layer_mode=None, smooth=None, frame_range=None, frame_step=None, fps=None):
     """
     Bakes animation from a selected Tracker4 node to new nodes based on the specified mode.
     This is the main entry point for the user interaction.
+    With several Tracker4 nodes selected, or a single Group, all of their trackers are baked in one batch.
+    Every Tracker4 node of the script is baked by its own menu command, see bake_script_trackers().
 
     Args:
-        mode (str, optional): The mode of operation ('matchmove', 'stabilize', 'roto', or 'cpin').
+        mode (str or list, optional): The mode of operation ('matchmove', 'stabilize', 'roto', 'cpin', 'homography',
+            'per_track' or 'all'), or a list of modes baked from a single read of the Tracker.
             Defaults to 'matchmove'.
+        mark_columns (tuple, optional): The track columns to check before baking ('T', 'R', 'S').
+            Defaults to the settings.
+        output_mode (str, optional): 'expression' or 'baked'. Defaults to OUTPUT_MODE.
+        reduce_keys (bool, optional): Whether to reduce the baked keys. Defaults to REDUCE_KEYS.
+        homography_output (str, optional): 'corners' or 'matrix'. Defaults to HOMOGRAPHY_OUTPUT.
+        solver (str, optional): 'tracker', 'similarity' or 'affine'. Defaults to TRANSFORM_SOLVER.
+        layer_mode (str, optional): 'linked' or 'keyed'. Defaults to ROTO_LAYER_MODE.
+        smooth (str, optional): 'gaussian', 'savgol', 'one_euro', or False. Defaults to SMOOTH_FILTER.
+        frame_range (str or tuple, optional): 'script', 'input' or (first, last). Defaults to BAKE_FRAME_RANGE.
+        frame_step (int, optional): Key every n-th frame of the range. Defaults to BAKE_FRAME_STEP.
+        fps (float, optional): Conform the keys to this frame rate. Defaults to BAKE_FPS.
     """
 
     node = nuke.selectedNodes()
+    options = dict(mark_columns=mark_columns, output_mode=output_mode, reduce_keys=reduce_keys,
+                   homography_output=homography_output, solver=solver, layer_mode=layer_mode, smooth=smooth,
+                   frame_range=frame_range, frame_step=frame_step, fps=fps)
 
     if len(node) == 1:
-        tracker = nuke.selectedNode()
+        tracker = node[0]
+        node_class = tracker.Class()
 
-        if tracker.Class() == 'Tracker4':
+        if node_class == 'Tracker4':
 
-            if not get_tracker_names(tracker):
+            if not len(track_index(tracker)):
                 nuke.message('No tracks on this Tracker!\nYou must track something before baking.')
                 return
 
             tracker.setSelected(False)
 
-            bakery(tracker, mode=mode)
+            bakery(tracker, mode=mode, **options)
 
             tracker.setSelected(True)
 
+        elif node_class == 'Group':
+            trackers = find_trackers(tracker)
+            if trackers:
+                bake_batch(trackers, mode=mode, **options)
+            else:
+                nuke.message('No Tracker4 inside {}!'.format(tracker.name()))
+
         else:
             nuke.message('Select a Tracker Node!\nOnly Tracker4 allowed!')
 
     else:
-        if len(node) > 1:
-            nuke.message('Select only one node!')
+        trackers = [n for n in node if n.Class() == 'Tracker4']
+        if trackers:
+            bake_batch(trackers, mode=mode, **options)
         else:
             nuke.message('Select a Tracker node!')
 
@@ -0,0 +1,304 @@
+"""
+Motion caches: the extracted tracks and solved transform of a Tracker4, saved to a compact binary file,
+so any bake mode can build its nodes in other scripts without the Tracker.
+
+A cache file is an 8 byte magic, the length of a JSON header, the header, then the raw arrays,
+each one aligned to 64 bytes. Loading maps the file in memory, so the arrays are read lazily and not copied.
+Files are named after the tracker and a hash of their content, '<tracker>_<hash>.mbcache',
+and the same hash of a live Tracker tells if a cache is stale.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from MotionBakery_tracks import TrackTable
+
+MAGIC = b'MBCACHE1'
+EXTENSION = '.mbcache'
+ALIGNMENT = 64
+
+# The Tracker knobs a bake reads, saved with the tracks. Enumeration knobs are saved by name.
+TRACKER_KNOBS = ('reference_frame', 'transform', 'filter', 'motionblur', 'shutter', 'shutteroffset',
+                 'selected_tracks', 'label')
+
+# The tracker settings that change what a bake creates, part of the content hash.
+HASHED_KNOBS = ('reference_frame', 'transform', 'selected_tracks')
+
+
+def _table_arrays(table):
+    """ Returns the arrays of a TrackTable and the layout of its transform, as stored in a cache. """
+
+    arrays = [('frames', table.frames), ('values', table.values), ('keys', table.keys)]
+    for column in sorted(table.flags):
+        arrays.append(('flags/' + column, table.flags[column]))
+
+    transform = {}
+    for knob in sorted(table.transform):
+        channels = []
+        for chan, channel in enumerate(table.transform[knob]):
+            if isinstance(channel, tuple):
+                name = 'transform/{}/{}'.format(knob, chan)
+                arrays.append((name + '/frames', np.asarray(channel[0], dtype=np.float64)))
+                arrays.append((name + '/values', np.asarray(channel[1], dtype=np.float64)))
+                channels.append({'curve': name, 'interpolation': channel[2] if len(channel) > 2 else None})
+            else:
+                channels.append(float(channel))
+        transform[knob] = channels
+
+    return arrays, transform
+
+
+def content_hash(table, tracker):
+    """
+    Hashes the content of a TrackTable and the tracker settings that change a bake.
+
+    Args:
+        table (TrackTable): The extracted tracks, with the solved transform.
+        tracker (dict): The tracker settings, as saved in a cache.
+
+    Returns:
+        str: The hex digest.
+    """
+
+    arrays, transform = _table_arrays(table)
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps([table.names, table.columns, transform,
+                              [tracker.get(knob) for knob in HASHED_KNOBS]], sort_keys=True).encode('utf-8'))
+    for name, array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update('{}:{}:{}'.format(name, array.dtype.str, array.shape).encode('utf-8'))
+        digest.update(array.tobytes())
+
+    return digest.hexdigest()
+
+
+def cache_name(tracker_name, digest):
+    return '{}_{}{}'.format(tracker_name, digest[:12], EXTENSION)
+
+
+def save_cache(folder, table, tracker):
+    """
+    Saves a TrackTable and its tracker settings to a cache file.
+
+    Args:
+        folder (str): The folder of the cache, created if needed.
+        table (TrackTable): The extracted tracks, with the solved transform.
+        tracker (dict): The tracker 'name' and the values of its TRACKER_KNOBS.
+
+    Returns:
+        str: The path of the cache file.
+    """
+
+    digest = content_hash(table, tracker)
+    path = os.path.join(folder, cache_name(tracker['name'], digest))
+
+    arrays, transform = _table_arrays(table)
+    layout = {}
+    offset = 0
+    for name, array in arrays:
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+
+    header = {
+        'version': 1,
+        'hash': digest,
+        'tracker': tracker,
+        'names': table.names,
+        'columns': table.columns,
+        'transform': transform,
+        'arrays': layout,
+    }
+    header = json.dumps(header, sort_keys=True).encode('utf-8')
+
+    # The data starts on an aligned offset, so every array can be viewed in place.
+    start = len(MAGIC) + 8 + len(header)
+    header += b' ' * (-start % ALIGNMENT)
+    start += -start % ALIGNMENT
+
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays:
+            f.seek(start + layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(start + offset)
+    os.replace(temp_path, path)
+
+    return path
+
+
+def read_header(path):
+    """
+    Reads the JSON header of a cache file, without its arrays.
+
+    Returns:
+        tuple: (header dict, offset of the array data in the file).
+    """
+
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a MotionBakery cache.'.format(path))
+        size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(size).decode('utf-8'))
+
+    return header, len(MAGIC) + 8 + size
+
+
+def load_cache(path, mmap=True):
+    """
+    Loads a cache file.
+
+    Args:
+        path (str): The cache file.
+        mmap (bool, optional): Map the file in memory, the arrays are then read-only views of the file.
+            Otherwise the whole file is read. Defaults to True.
+
+    Returns:
+        tuple: (TrackTable, header dict). The header has the 'tracker' settings and the 'hash'.
+    """
+
+    header, start = read_header(path)
+    if mmap:
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        raw = np.fromfile(path, dtype=np.uint8)
+
+    def array(name):
+        spec = header['arrays'][name]
+        dtype = np.dtype(spec['dtype'])
+        first = start + spec['offset']
+        size = int(np.prod(spec['shape'], dtype=np.int64)) * dtype.itemsize
+        return raw[first:first + size].view(dtype).reshape(spec['shape'])
+
+    flags = dict((name.split('/', 1)[1], array(name)) for name in header['arrays'] if name.startswith('flags/'))
+
+    transform = {}
+    for knob, channels in header['transform'].items():
+        transform[knob] = []
+        for channel in channels:
+            if isinstance(channel, dict):
+                curve = (array(channel['curve'] + '/frames'), array(channel['curve'] + '/values'))
+                if channel['interpolation']:
+                    curve += (channel['interpolation'],)
+                transform[knob].append(curve)
+            else:
+                transform[knob].append(channel)
+
+    table = TrackTable(header['names'], header['columns'], array('frames'), array('values'), array('keys'), flags,
+                       transform=transform)
+
+    return table, header
+
+
+def find_cache(folder, tracker_name):
+    """
+    Returns the newest cache of a tracker in a folder, or None.
+    """
+
+    if not os.path.isdir(folder):
+        return None
+
+    prefix = tracker_name + '_'
+    paths = [os.path.join(folder, name) for name in os.listdir(folder)
+             if name.startswith(prefix) and name.endswith(EXTENSION)
+             and len(name) == len(prefix) + 12 + len(EXTENSION)]
+
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+class CachedKnob(object):
+    """ A read-only knob of a CachedTracker, with the few knob methods the bakes use. """
+
+    def __init__(self, value):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+    def getValue(self):
+        # Enumeration knobs are saved by name, enumName(getValue()) gives it back.
+        return 0 if isinstance(self._value, str) else self._value
+
+    def enumName(self, index):
+        return self._value
+
+    def getText(self):
+        return str(self._value)
+
+    def setValue(self, value, *args):
+        self._value = value
+
+
+class CachedTracker(object):
+    """
+    Stands in for the Tracker4 node of a cache in bakery(): it has the Tracker's name, knobs, color and input range,
+    and sits where the new nodes should be created.
+
+    Args:
+        tracker (dict): The tracker settings of a cache header.
+        position (tuple, optional): The (x, y) position in the DAG. Defaults to (0, 0).
+    """
+
+    def __init__(self, tracker, position=(0, 0)):
+        self._name = tracker['name']
+        self._knobs = dict((knob, CachedKnob(tracker.get(knob))) for knob in TRACKER_KNOBS)
+        # A Tracker with no color group yet gets one on its first bake, like check_color_group() does on a node.
+        self._knobs['tile_color'] = CachedKnob(tracker.get('color') or 0)
+        if tracker.get('color') is not None:
+            self._knobs['color_group'] = CachedKnob(str(tracker['color']))
+        self._position = position
+        # Caches saved before the input range was, bake their 'input' frame range on every tracked frame.
+        self._input_range = tracker.get('input_range') or (None, None)
+
+    def __getitem__(self, name):
+        return self._knobs[name]
+
+    def knob(self, name):
+        return self._knobs.get(name)
+
+    def knobs(self):
+        return self._knobs
+
+    def name(self):
+        return self._name
+
+    def fullName(self):
+        return self._name
+
+    def Class(self):
+        return 'Tracker4'
+
+    def xpos(self):
+        return self._position[0]
+
+    def ypos(self):
+        return self._position[1]
+
+    def screenWidth(self):
+        return 80
+
+    def screenHeight(self):
+        return 18
+
+    def firstFrame(self):
+        return self._input_range[0]
+
+    def lastFrame(self):
+        return self._input_range[1]
+
+    def setSelected(self, selected):
+        pass
+
+    def addKnob(self, knob):
+        self._knobs[knob.name()] = knob
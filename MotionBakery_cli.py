@@ -0,0 +1,274 @@
+"""
+Command line batch baking for MotionBakery, for the farm.
+
+Bakes every Tracker4 of many Nuke scripts and saves them, each script in its own interpreter,
+a few scripts at a time:
+
+    nuke -t MotionBakery_cli.py --modes matchmove cpin --workers 8 "/shows/abc/sq010/*/comp/*.nk"
+    python MotionBakery_cli.py --nuke-path benchmarks/standin --modes roto shots/*.nk
+
+Each script is saved next to the original with a '_baked' suffix, in --output-dir, or in place with --in-place.
+The nodes created and the time of each script are printed as a summary, and saved as JSON with --report.
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import json
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODES = ('matchmove', 'stabilize', 'roto', 'cpin', 'homography', 'per_track')
+
+# The line a worker prints its result on, the only output of the worker the summary reads.
+RESULT_PREFIX = 'MOTIONBAKERY_RESULT '
+
+
+def expand_scripts(patterns):
+    """ Returns the scripts matching a list of paths or glob patterns, sorted and without duplicates. """
+
+    scripts = []
+    for pattern in patterns:
+        matches = glob.glob(pattern) or ([pattern] if os.path.isfile(pattern) else [])
+        scripts.extend(os.path.abspath(path) for path in matches)
+
+    return sorted(set(scripts))
+
+
+def output_path(script, output_dir=None, suffix='_baked', in_place=False):
+    """ Returns where a baked script is saved. """
+
+    if in_place:
+        return script
+
+    name, extension = os.path.splitext(os.path.basename(script))
+    return os.path.join(output_dir or os.path.dirname(script), name + suffix + extension)
+
+
+def bake_script(script, output, modes, options):
+    """
+    Opens a script, bakes every Tracker4 in it in every mode, and saves it. Runs inside a worker interpreter.
+    Each Tracker is read once for all the modes.
+
+    Args:
+        script (str): The script to bake.
+        output (str): Where to save the baked script.
+        modes (list): The bakery() modes.
+        options (dict): The other bakery() arguments.
+
+    Returns:
+        dict: The 'script', its 'output', the 'trackers' found, the 'nodes' created per mode and the 'seconds'.
+    """
+
+    import nuke
+    import MotionBakery
+
+    start = time.time()
+    nuke.scriptOpen(script)
+
+    trackers = MotionBakery.find_trackers()
+    nodes = dict((mode, []) for mode in modes)
+    for node in MotionBakery.bake_batch(trackers, mode=list(modes), background=False, **options):
+        nodes[node['tr_mode'].value()].append(node.fullName())
+
+    output_dir = os.path.dirname(output)
+    if output_dir and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    nuke.scriptSaveAs(output, overwrite=1)
+    nuke.scriptClose()
+
+    return {
+        'script': script,
+        'output': output,
+        'trackers': [tracker.fullName() for tracker in trackers],
+        'nodes': nodes,
+        'seconds': round(time.time() - start, 3),
+    }
+
+
+def interpreter_command(interpreter=None):
+    """
+    Returns the command that starts a worker interpreter: the given one,
+    'nuke -t' when running under Nuke, or this Python otherwise.
+    """
+
+    if interpreter:
+        return shlex.split(interpreter)
+
+    nuke = sys.modules.get('nuke')
+    if nuke is not None and hasattr(nuke, 'env'):
+        return [sys.executable, '-t']
+
+    return [sys.executable]
+
+
+def run_worker(command, script, output, args):
+    """
+    Bakes one script in a new interpreter.
+
+    Returns:
+        dict: The bake_script() result, or the 'script', 'error' and 'seconds' of a failed worker.
+    """
+
+    worker = command + [os.path.abspath(__file__), script, '--worker', '--output', output]
+    worker += option_arguments(args) + ['--modes'] + list(args.modes)
+
+    env = dict(os.environ)
+    nuke_path = os.path.abspath(args.nuke_path) if args.nuke_path else None
+    env['PYTHONPATH'] = os.pathsep.join([path for path in (nuke_path, HERE, env.get('PYTHONPATH')) if path])
+
+    start = time.time()
+    process = subprocess.run(worker, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    stdout = process.stdout.decode('utf-8', 'replace')
+
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+
+    error = (process.stderr.decode('utf-8', 'replace') or stdout).strip().splitlines()
+    return {
+        'script': script,
+        'output': None,
+        'error': '\n'.join(error[-5:]) or 'exit code {}'.format(process.returncode),
+        'seconds': round(time.time() - start, 3),
+    }
+
+
+def bake_options(args):
+    """ Returns the bakery() arguments set on the command line. """
+
+    options = {}
+    for name in ('output_mode', 'reduce_keys', 'homography_output', 'solver', 'layer_mode', 'smooth', 'frame_range',
+                 'frame_step', 'fps'):
+        value = getattr(args, name)
+        if value is not None:
+            options[name] = value
+    return options
+
+
+def option_arguments(args):
+    """ Returns the command line of the bakery() arguments, for a worker. """
+
+    arguments = []
+    for name, value in sorted(bake_options(args).items()):
+        flag = '--' + name.replace('_', '-')
+        if value is True:
+            arguments.append(flag)
+        elif isinstance(value, tuple):
+            # Joined to the flag, so a negative first frame isn't taken for an option.
+            arguments.append('{}={}'.format(flag, ','.join(str(item) for item in value)))
+        else:
+            arguments.extend([flag, str(value)])
+    return arguments
+
+
+def frame_range_argument(text):
+    """ Parses a --frame-range: 'script', 'input', or 'FIRST,LAST' frames. """
+
+    if text in ('script', 'input'):
+        return text
+
+    try:
+        first, last = (int(frame) for frame in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("use 'script', 'input' or FIRST,LAST, not {!r}".format(text))
+    return first, last
+
+
+def summary(results, wall):
+    """ Returns the printed summary of a run. """
+
+    lines = []
+    for result in results:
+        if 'error' in result:
+            lines.append('FAILED  {:>8.2f}s  {}\n        {}'.format(result['seconds'], result['script'],
+                                                                    result['error'].replace('\n', '\n        ')))
+        else:
+            created = sum(len(nodes) for nodes in result['nodes'].values())
+            lines.append('OK      {:>8.2f}s  {}  {} trackers, {} nodes'.format(
+                result['seconds'], result['script'], len(result['trackers']), created))
+
+    failed = sum(1 for result in results if 'error' in result)
+    created = sum(len(nodes) for result in results for nodes in result.get('nodes', {}).values())
+    lines.append('{} scripts, {} failed, {} nodes created in {:.2f}s'.format(len(results), failed, created, wall))
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scripts', nargs='+', help='Nuke scripts, or glob patterns')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=['matchmove'],
+                        help='bake modes (default matchmove)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='scripts baked at the same time (default one per CPU core)')
+    parser.add_argument('--output-dir', help='save the baked scripts in this folder')
+    parser.add_argument('--suffix', default='_baked', help="suffix of the baked scripts (default '_baked')")
+    parser.add_argument('--in-place', action='store_true', help='overwrite the scripts')
+    parser.add_argument('--report', help='save the summary of every script to this JSON file')
+    parser.add_argument('--interpreter', help="command of the worker interpreters (default 'nuke -t' under Nuke)")
+    parser.add_argument('--nuke-path', help='folder added to the workers PYTHONPATH, like a nuke stand-in')
+
+    bake = parser.add_argument_group('bake options, the settings by default')
+    bake.add_argument('--output-mode', choices=('expression', 'baked'))
+    bake.add_argument('--reduce-keys', action='store_true', default=None)
+    bake.add_argument('--homography-output', choices=('corners', 'matrix'))
+    bake.add_argument('--solver', choices=('tracker', 'similarity', 'affine'))
+    bake.add_argument('--layer-mode', choices=('linked', 'keyed'))
+    bake.add_argument('--smooth', choices=('gaussian', 'savgol', 'one_euro'))
+    bake.add_argument('--frame-range', type=frame_range_argument,
+                      help="'script', 'input' or FIRST,LAST. Join it with = for a negative first frame: =-10,50")
+    bake.add_argument('--frame-step', type=int, help='key every n-th frame of the range')
+    bake.add_argument('--fps', type=float, help='conform the keys from the script frame rate to this one')
+
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.worker:
+        result = bake_script(os.path.abspath(args.scripts[0]), args.output, args.modes, bake_options(args))
+        print(RESULT_PREFIX + json.dumps(result))
+        return 0
+
+    scripts = expand_scripts(args.scripts)
+    if not scripts:
+        print('No script found.')
+        return 1
+
+    command = interpreter_command(args.interpreter)
+    start = time.time()
+    results = []
+
+    with concurrent.futures.ThreadPoolExecutor(max(1, min(args.workers, len(scripts)))) as pool:
+        futures = [pool.submit(run_worker, command, script,
+                               output_path(script, args.output_dir, args.suffix, args.in_place), args)
+                   for script in scripts]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print('[{}/{}] {} {}'.format(len(results), len(scripts), 'FAILED' if 'error' in result else 'baked',
+                                         result['script']))
+            sys.stdout.flush()
+
+    results.sort(key=lambda result: scripts.index(result['script']))
+    wall = time.time() - start
+    print(summary(results, wall))
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'wall': round(wall, 3), 'modes': args.modes, 'scripts': results}, f, indent=1, sort_keys=True)
+
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Bulk curve writing for MotionBakery.
+
+Builds whole Nuke curve scripts, like '{curve x1 10 11 12}', from arrays of frames and values,
+and applies every channel of a knob with a single fromScript() call, instead of one setValueAt()
+call (and one knobChanged and undo entry) per key.
+"""
+
+import numpy as np
+
+from MotionBakery_profile import ENABLED as PROFILE_ENABLED, count
+from MotionBakery_tracks import curve_value_at, parse_script, read_channels
+
+
+def _format_frame(frame):
+    return str(int(frame)) if frame == int(frame) else repr(frame)
+
+
+def curve_script(frames, values, interpolation=None):
+    """
+    Builds a curve script from key frames and values.
+    Consecutive frames are written as a plain list of values, Nuke's compact form.
+
+    Args:
+        frames (array-like): The key frames, in increasing order.
+        values (array-like): The key values, one per frame.
+        interpolation (str, optional): A flag for all the keys, like 'L' for linear. Nuke's default if None.
+
+    Returns:
+        str: The curve script, e.g. '{curve x1 10 11 x5 12}'.
+    """
+
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    parts = [repr(value) for value in values.tolist()]
+    if not parts:
+        return '{curve}'
+
+    jumps = np.flatnonzero(np.diff(frames) != 1) + 1
+    for index in reversed(jumps.tolist()):
+        parts.insert(index, 'x' + _format_frame(float(frames[index])))
+    parts.insert(0, 'x' + _format_frame(float(frames[0])))
+    if interpolation:
+        parts.insert(0, interpolation)
+
+    return '{curve ' + ' '.join(parts) + '}'
+
+
+def channel_script(channel):
+    """
+    Builds the script of one channel, a constant value or a (frames, values) tuple of keys.
+    """
+
+    if isinstance(channel, tuple):
+        return curve_script(*channel)
+    return repr(float(channel))
+
+
+def relative_to_frame(channel, frame, identity=0.0):
+    """
+    Offsets a channel so it equals identity at the given frame,
+    the baked equivalent of the 'curve - curve(tr_reference_frame)' expression.
+
+    Args:
+        channel (float or tuple): A constant value, or a (frames, values) tuple of keys.
+        frame (float): The reference frame.
+        identity (float, optional): The value at the reference frame, 0 for translate and rotate, 1 for scale.
+
+    Returns:
+        float or tuple: The relative channel.
+    """
+
+    if isinstance(channel, tuple):
+        return (channel[0], channel[1] - curve_value_at(channel, frame) + identity) + channel[2:]
+    return identity
+
+
+def _linear_keys(frames, values, epsilon):
+    """ Mask of the keys that are not on the straight line between their neighbours. """
+
+    keep = np.ones(len(frames), dtype=bool)
+    if len(frames) > 2:
+        t = (frames[1:-1] - frames[:-2]) / (frames[2:] - frames[:-2])
+        line = values[:-2] + t * (values[2:] - values[:-2])
+        keep[1:-1] = np.abs(values[1:-1] - line) > epsilon
+    return keep
+
+
+def _simplify(frames, values, tolerance):
+    """
+    Ramer-Douglas-Peucker on a curve, measuring the error along the value axis,
+    so the tolerance is in the channel's own units (pixels, degrees).
+
+    Returns:
+        np.ndarray: Mask of the keys to keep.
+    """
+
+    keep = np.zeros(len(frames), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(frames) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        t = (frames[first + 1:last] - frames[first]) / (frames[last] - frames[first])
+        error = np.abs(values[first + 1:last] - (values[first] + t * (values[last] - values[first])))
+        worst = int(error.argmax())
+        if error[worst] > tolerance:
+            middle = first + 1 + worst
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+
+    return keep
+
+
+def reduce_channel(channel, tolerance=0.0):
+    """
+    Reduces the keys of a channel: a channel that doesn't move more than the tolerance becomes a constant,
+    keys on a straight line are removed, and the rest is simplified within the tolerance.
+    Reduced curves are written with linear interpolation, so the tolerance holds between the keys too.
+
+    Args:
+        channel (float or tuple): A constant value, or a (frames, values) tuple of keys.
+        tolerance (float, optional): The largest error allowed, in the channel units. Defaults to 0 (lossless).
+
+    Returns:
+        tuple: (channel, keys_before, keys_after).
+    """
+
+    if not isinstance(channel, tuple) or not len(channel[0]):
+        return channel, 0, 0
+
+    frames = np.asarray(channel[0], dtype=np.float64)
+    values = np.asarray(channel[1], dtype=np.float64)
+    total = len(frames)
+
+    if values.max() - values.min() <= 2 * tolerance:
+        return float((values.max() + values.min()) / 2), total, 0
+
+    epsilon = 1e-9 * max(1.0, float(np.abs(values).max()))
+    keep = _linear_keys(frames, values, epsilon)
+    index = np.flatnonzero(keep)
+
+    if tolerance > 0:
+        index = index[_simplify(frames[index], values[index], tolerance)]
+
+    if len(index) == total:
+        return channel, total, total
+
+    return (frames[index], values[index], 'L'), total, len(index)
+
+
+def _item_script(item):
+    if isinstance(item, list):
+        return '{' + ' '.join(_item_script(i) for i in item) + '}'
+    return item
+
+
+def write_channels(knob, channels):
+    """
+    Writes every channel of a knob in one operation.
+
+    Args:
+        knob (nuke.Knob): The destination knob.
+        channels (list): One item per channel: a constant value, a (frames, values) tuple of keys,
+            or None to keep what the channel already has.
+    """
+
+    current = None
+    if any(channel is None for channel in channels):
+        current = parse_script(knob.toScript())
+        count('knob.toScript')
+        while len(current) == 1 and isinstance(current[0], list):
+            current = current[0]
+
+    parts = []
+    for chan, channel in enumerate(channels):
+        if channel is None:
+            parts.append(_item_script(current[chan]) if chan < len(current) else '0')
+        else:
+            parts.append(channel_script(channel))
+
+    knob.fromScript(' '.join(parts))
+
+    if PROFILE_ENABLED:
+        count('knob.fromScript')
+        count('knob_writes')
+        count('keys', sum(len(channel[0]) for channel in channels if isinstance(channel, tuple)))
+
+
+def write_channel(knob, chan, channel, n_channels=None):
+    """
+    Writes a single channel of a knob, keeping the other channels as they are.
+
+    Args:
+        knob (nuke.Knob): The destination knob.
+        chan (int): The channel index to write (0 for X, 1 for Y, etc.).
+        channel (float or tuple): A constant value, or a (frames, values) tuple of keys.
+        n_channels (int, optional): The number of channels of the knob. Defaults to knob.arraySize().
+    """
+
+    if n_channels is None:
+        n_channels = knob.arraySize()
+
+    channels = [None] * n_channels
+    channels[chan] = channel
+    write_channels(knob, channels)
+
+
+def splice_channel(current, channel, epsilon=1e-9):
+    """
+    Splices the changed frames of a new channel into the current one: the keys of the current channel
+    outside the changed range are kept, the keys of the new channel inside it replace the rest.
+    Both channels are compared on the union of their key frames.
+
+    Args:
+        current (float or tuple): The channel on the knob, a constant or a (frames, values) tuple of keys.
+        channel (float or tuple): The new channel.
+        epsilon (float, optional): Differences up to epsilon are not changes. Defaults to 1e-9.
+
+    Returns:
+        tuple: (channel, changed range). The range is (first, last) frames, or None if nothing changed.
+            A channel that changed from or to a constant is replaced whole, with the range of its keys.
+    """
+
+    current_anim = isinstance(current, tuple) and len(current[0])
+    channel_anim = isinstance(channel, tuple) and len(channel[0])
+
+    if not current_anim and not channel_anim:
+        current_value = float(current[1][0]) if isinstance(current, tuple) and len(current[1]) else current
+        channel_value = float(channel[1][0]) if isinstance(channel, tuple) and len(channel[1]) else channel
+        if current_value is not None and abs(float(current_value) - float(channel_value)) <= epsilon:
+            return channel, None
+        return channel, (float('-inf'), float('inf'))
+
+    if not current_anim or not channel_anim:
+        keys = channel[0] if channel_anim else current[0]
+        return channel, (float(keys[0]), float(keys[-1]))
+
+    frames = np.union1d(current[0], channel[0])
+    changed = frames[np.abs(curve_value_at(current, frames) - curve_value_at(channel, frames)) > epsilon]
+    if not len(changed):
+        return current, None
+
+    first, last = float(changed[0]), float(changed[-1])
+    current_frames = np.asarray(current[0], dtype=np.float64)
+    channel_frames = np.asarray(channel[0], dtype=np.float64)
+    keep = (current_frames < first) | (current_frames > last)
+    inside = (channel_frames >= first) & (channel_frames <= last)
+
+    spliced_frames = np.concatenate([current_frames[keep], channel_frames[inside]])
+    spliced_values = np.concatenate([np.asarray(current[1], dtype=np.float64)[keep],
+                                     np.asarray(channel[1], dtype=np.float64)[inside]])
+    order = np.argsort(spliced_frames, kind='stable')
+
+    return (spliced_frames[order], spliced_values[order]) + tuple(channel[2:]), (first, last)
+
+
+def knob_channels(knob):
+    """
+    Reads the channels of a knob like read_channels(). The keys of a knob driven by an expression
+    are read from its animation curves, its script is the expression.
+    """
+
+    if not knob.hasExpression():
+        count('knob.toScript')
+        return read_channels(knob.toScript())
+
+    channels = []
+    for chan in range(knob.arraySize()):
+        animation = knob.animation(chan)
+        keys = animation.keys() if animation is not None else []
+        if keys:
+            channels.append((np.array([key.x for key in keys]), np.array([key.y for key in keys])))
+        else:
+            channels.append(float(knob.getValue(chan)))
+    return channels
+
+
+def update_channels(knob, channels, epsilon=1e-9):
+    """
+    Updates the channels of a knob in place: channels that didn't change are left alone, and only
+    the changed frames of the others are rewritten, see splice_channel(). The knob is written once, if at all.
+
+    Args:
+        knob (nuke.Knob): The knob to update.
+        channels (list): The new channels, like write_channels(). None keeps a channel as it is.
+        epsilon (float, optional): Differences up to epsilon are not changes. Defaults to 1e-9.
+
+    Returns:
+        tuple: The (first, last) frames changed on the knob, or None if nothing changed.
+    """
+
+    current = knob_channels(knob)
+    merged = []
+    first = last = None
+
+    for chan, channel in enumerate(channels):
+        if channel is None:
+            merged.append(None)
+            continue
+
+        spliced, changed = splice_channel(current[chan] if chan < len(current) else None, channel, epsilon)
+        if changed is None:
+            merged.append(None)
+            continue
+
+        merged.append(spliced)
+        first = changed[0] if first is None else min(first, changed[0])
+        last = changed[1] if last is None else max(last, changed[1])
+
+    if first is None:
+        return None
+
+    write_channels(knob, merged)
+    return first, last
@@ -0,0 +1,277 @@
+"""
+Streaming export of the tracks and the solved transform of Trackers, for the matchmove and 3D departments.
+
+The rows come from the same TrackTable extraction the bakes use, and are generated a chunk of frames at a time,
+straight from its arrays, so a 1000 tracks by 10000 frames Tracker is never held as Python objects.
+With a memory-mapped motion cache as the source, the tracks aren't even read in memory at once.
+
+Formats:
+    'csv'   : one row per track and frame, or per tracker and frame for the transform, with a header.
+    'jsonl' : the same rows, one JSON object per line.
+    'ascii' : the classic Nuke ASCII curve files, one per track (frame x y) or per tracker (frame and T/R/S),
+              written to a folder.
+Any output can be gzip compressed.
+"""
+
+import csv
+import gzip
+import json
+import os
+import re
+from itertools import repeat
+
+import numpy as np
+
+from MotionBakery_tracks import curve_value_at
+
+FORMATS = ('csv', 'jsonl', 'ascii')
+
+TRACK_FIELDS = ('tracker', 'track', 'frame', 'track_x', 'track_y', 'error', 'keyed')
+
+TRANSFORM_FIELDS = ('tracker', 'frame', 'translate_x', 'translate_y', 'rotate', 'scale_x', 'scale_y',
+                    'center_x', 'center_y')
+
+# The transform fields, as (knob, channel).
+TRANSFORM_CHANNELS = (('translate', 0), ('translate', 1), ('rotate', 0), ('scale', 0), ('scale', 1),
+                      ('center', 0), ('center', 1))
+
+# The frames generated at once, which bounds the memory of an export.
+CHUNK_FRAMES = 4096
+
+# zlib's default level: much faster than gzip's 9, for files barely bigger.
+GZIP_LEVEL = 6
+
+_UNSAFE_RE = re.compile(r'[^\w.-]+')
+
+
+def track_rows(table, tracker_name, keyed_only=False, chunk_frames=CHUNK_FRAMES, tracks=None):
+    """
+    Generates the rows of the tracks of a TrackTable, one per track and frame, as TRACK_FIELDS tuples.
+    Each track covers its own keyed range, the frames between keys are interpolated.
+
+    Args:
+        table (TrackTable): The extracted tracks.
+        tracker_name (str): The name of the Tracker, the first field of every row.
+        keyed_only (bool, optional): Only the keyed frames. Defaults to False.
+        chunk_frames (int, optional): The frames generated at once. Defaults to CHUNK_FRAMES.
+        tracks (list, optional): The indices of the tracks to generate. Defaults to every track.
+
+    Yields:
+        tuple: (tracker, track, frame, track_x, track_y, error, keyed). The error is None if it wasn't extracted.
+    """
+
+    column_x = table.column_index['track_x']
+    column_y = table.column_index['track_y']
+    column_error = table.column_index.get('error')
+
+    for track in range(len(table)) if tracks is None else tracks:
+        name = table.names[track]
+        keyed = table.keys[track, column_x] | table.keys[track, column_y]
+        keyed_frames = np.flatnonzero(keyed)
+        if not len(keyed_frames):
+            continue
+
+        for start in range(int(keyed_frames[0]), int(keyed_frames[-1]) + 1, chunk_frames):
+            stop = min(start + chunk_frames, int(keyed_frames[-1]) + 1)
+
+            frames = table.frames[start:stop].tolist()
+            xs = table.values[track, column_x, start:stop].tolist()
+            ys = table.values[track, column_y, start:stop].tolist()
+            errors = table.values[track, column_error, start:stop].tolist() if column_error is not None \
+                else repeat(None)
+            keys = keyed[start:stop].tolist()
+
+            for row in zip(repeat(tracker_name), repeat(name), frames, xs, ys, errors, keys):
+                if row[-1] or not keyed_only:
+                    yield row
+
+
+def transform_rows(table, tracker_name, chunk_frames=CHUNK_FRAMES):
+    """
+    Generates the rows of the solved transform of a TrackTable, one per frame, as TRANSFORM_FIELDS tuples.
+
+    Args:
+        table (TrackTable): The extracted tracks, with the solved transform.
+        tracker_name (str): The name of the Tracker, the first field of every row.
+        chunk_frames (int, optional): The frames generated at once. Defaults to CHUNK_FRAMES.
+
+    Yields:
+        tuple: (tracker, frame, translate_x, translate_y, rotate, scale_x, scale_y, center_x, center_y).
+    """
+
+    if not table.transform:
+        raise ValueError('{} has no solved transform to export.'.format(tracker_name))
+
+    channels = []
+    for knob, chan in TRANSFORM_CHANNELS:
+        knob_channels = table.transform.get(knob) or [1.0 if knob == 'scale' else 0.0]
+        # A single channel knob, like a uniform scale, is the same on both axes.
+        channels.append(knob_channels[min(chan, len(knob_channels) - 1)])
+
+    for start in range(0, len(table.frames), chunk_frames):
+        frames = table.frames[start:start + chunk_frames]
+        at = np.asarray(frames, dtype=np.float64)
+        columns = [np.asarray(curve_value_at(channel, at), dtype=np.float64).tolist() for channel in channels]
+
+        for row in zip(repeat(tracker_name), frames.tolist(), *columns):
+            yield row
+
+
+def open_output(path, compress=None):
+    """
+    Opens an export file for writing text, creating its folder if needed.
+
+    Args:
+        path (str): The file.
+        compress (bool, optional): Gzip the file. Defaults to True for paths ending with '.gz'.
+
+    Returns:
+        file: The open file.
+    """
+
+    if compress is None:
+        compress = path.endswith('.gz')
+
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+
+    if compress:
+        return gzip.open(path, 'wt', compresslevel=GZIP_LEVEL, newline='')
+    return open(path, 'w', newline='')
+
+
+def export_format(path):
+    """ Returns the format of an export path from its extension: 'csv', 'jsonl', or 'ascii' for a folder. """
+
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.json'):
+        return 'jsonl'
+    if not extension:
+        return 'ascii'
+    raise ValueError('Unknown export format for {}, use .csv, .jsonl or a folder.'.format(path))
+
+
+def _rows(tables, what, keyed_only):
+    for tracker_name, table in tables:
+        if what == 'transform':
+            for row in transform_rows(table, tracker_name):
+                yield row
+        else:
+            for row in track_rows(table, tracker_name, keyed_only):
+                yield row
+
+
+def _ascii_name(*parts):
+    return '_'.join(_UNSAFE_RE.sub('_', part).strip('_') or 'unnamed' for part in parts)
+
+
+def _unique_name(name, index, taken):
+    """ Returns a file name no other file of the export has: tracks with the same name get their track index. """
+
+    unique = name
+    if unique in taken:
+        unique = '{}_{}'.format(name, index)
+
+    copy = 1
+    while unique in taken:
+        copy += 1
+        unique = '{}_{}_{}'.format(name, index, copy)
+
+    taken.add(unique)
+    return unique
+
+
+def _json_value(value):
+    # NaN isn't valid JSON, a missing value is null.
+    return None if value != value else value
+
+
+def _ascii_line(values):
+    return ' '.join('{:.10g}'.format(value) for value in values) + '\n'
+
+
+def write_ascii(tables, folder, what='tracks', compress=False, keyed_only=False):
+    """
+    Writes Nuke ASCII curve files: '<tracker>_<track>.txt' with 'frame x y' lines for the tracks,
+    or '<tracker>_transform.txt' with the frame and the TRANSFORM_FIELDS values for the transform.
+    A track named like one already written gets its track index, '<tracker>_<track>_<index>.txt',
+    so no file is overwritten.
+
+    Returns:
+        list: The paths of the files written.
+    """
+
+    extension = '.txt.gz' if compress else '.txt'
+    paths = []
+    taken = set()
+
+    for position, (tracker_name, table) in enumerate(tables):
+        if what == 'tracks':
+            files = [((tracker_name, name), track, track_rows(table, tracker_name, keyed_only, tracks=[track]))
+                     for track, name in enumerate(table.names)]
+        else:
+            files = [((tracker_name, 'transform'), position, transform_rows(table, tracker_name))]
+
+        for key, index, rows in files:
+            output = None
+            try:
+                for row in rows:
+                    if output is None:
+                        name = _unique_name(_ascii_name(*key), index, taken)
+                        paths.append(os.path.join(folder, name + extension))
+                        output = open_output(paths[-1], compress)
+
+                    output.write(_ascii_line(row[2:5] if what == 'tracks' else row[1:]))
+            finally:
+                if output is not None:
+                    output.close()
+
+    return paths
+
+
+def export_tables(tables, path, fmt=None, what='tracks', compress=None, keyed_only=False):
+    """
+    Streams the tracks, or the solved transforms, of some TrackTables to a file.
+
+    Args:
+        tables (iterable): (tracker name, TrackTable) tuples. It can be a generator, so only one table
+            has to be extracted at a time.
+        path (str): The file, or the folder for the 'ascii' format.
+        fmt (str, optional): 'csv', 'jsonl' or 'ascii'. Defaults to the format of the path extension.
+        what (str, optional): 'tracks' or 'transform'. Defaults to 'tracks'.
+        compress (bool, optional): Gzip the output. Defaults to True for paths ending with '.gz'.
+        keyed_only (bool, optional): Only export the keyed frames of the tracks. Defaults to False.
+
+    Returns:
+        list: The paths of the files written.
+    """
+
+    if fmt is None:
+        fmt = export_format(path)
+    if fmt not in FORMATS:
+        raise ValueError('Unknown export format {!r}, use one of {}.'.format(fmt, ', '.join(FORMATS)))
+    if what not in ('tracks', 'transform'):
+        raise ValueError("Unknown export data {!r}, use 'tracks' or 'transform'.".format(what))
+
+    if fmt == 'ascii':
+        return write_ascii(tables, path, what, bool(compress), keyed_only)
+
+    fields = TRACK_FIELDS if what == 'tracks' else TRANSFORM_FIELDS
+    rows = _rows(tables, what, keyed_only)
+
+    temp_path = path + '.tmp'
+    with open_output(temp_path, path.endswith('.gz') if compress is None else compress) as output:
+        if fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(fields)
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                output.write(json.dumps(dict(zip(fields, map(_json_value, row)))) + '\n')
+    os.replace(temp_path, path)
+
+    return [path]
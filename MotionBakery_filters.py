@@ -0,0 +1,237 @@
+"""
+Smoothing filters for the tracks, applied once at bake time.
+
+Smoothing the keys before they are baked replaces the smooth() expressions artists add to the knobs,
+which Nuke evaluates over a window of frames on every render. The filters are NumPy array operations
+over the last axis, the frames, so the x/y columns of every track are filtered at once,
+and the smoothing is paid once, at bake time, instead of on every frame of every render.
+
+    'gaussian' : Gaussian blur, the strength is the sigma in frames.
+    'savgol'   : Savitzky-Golay, a local quadratic fit, keeps peaks better. The strength is the half window in frames.
+    'one_euro' : One-euro filter, adaptive: it smooths slow motion strongly and follows fast motion closely.
+                 The strength is the period of its lowest cutoff in frames.
+
+The strengths are per kind of channel, 'position', 'rotate' and 'scale', see SMOOTH_STRENGTH in the settings.
+"""
+
+import numpy as np
+
+from MotionBakery_tracks import TrackTable
+
+FILTERS = ('gaussian', 'savgol', 'one_euro')
+
+# The kind of each smoothed column and transform knob.
+KINDS = {'track_x': 'position', 'track_y': 'position', 'translate': 'position', 'center': 'position',
+         'rotate': 'rotate', 'scale': 'scale'}
+
+# How much the cutoff of the one-euro filter rises with the speed, per unit per frame.
+ONE_EURO_BETA = 0.05
+
+
+def _pad(values, size):
+    """ Pads the last axis by point reflection, so a straight motion stays straight up to the ends. """
+
+    size = min(size, values.shape[-1] - 1)
+    if size < 1:
+        return values, 0
+
+    first = values[..., :1]
+    last = values[..., -1:]
+    before = 2 * first - values[..., size:0:-1]
+    after = 2 * last - values[..., -2:-size - 2:-1]
+    return np.concatenate([before, values, after], axis=-1), size
+
+
+def _convolve(values, kernel):
+    """ Convolves the last axis with a centered kernel, one array operation per tap. """
+
+    half = len(kernel) // 2
+    padded, size = _pad(values, half)
+    if size < half:
+        # Shorter than the kernel, it's cropped to the reflected frames.
+        kernel = kernel[half - size:half + size + 1]
+        kernel = kernel / kernel.sum()
+        half = size
+
+    count = values.shape[-1]
+    result = np.zeros(values.shape, dtype=np.float64)
+    product = np.empty(values.shape, dtype=np.float64)
+    for tap, weight in enumerate(kernel):
+        np.multiply(padded[..., tap:tap + count], weight, out=product)
+        result += product
+    return result
+
+
+def gaussian(values, strength):
+    """
+    Gaussian smoothing of the last axis.
+
+    Args:
+        values (np.ndarray): The values, frames on the last axis.
+        strength (float): The sigma, in frames.
+
+    Returns:
+        np.ndarray: The smoothed values.
+    """
+
+    half = int(np.ceil(3 * strength))
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+    kernel = np.exp(-0.5 * (offsets / strength) ** 2)
+    return _convolve(values, kernel / kernel.sum())
+
+
+def savitzky_golay(values, strength, order=2):
+    """
+    Savitzky-Golay smoothing of the last axis: every frame is the value of a polynomial fitted over its window.
+
+    Args:
+        values (np.ndarray): The values, frames on the last axis.
+        strength (float): The half window, in frames.
+        order (int, optional): The polynomial order. Defaults to 2.
+
+    Returns:
+        np.ndarray: The smoothed values.
+    """
+
+    half = max(int(round(strength)), 1)
+    order = min(order, 2 * half)
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+    vandermonde = offsets[:, None] ** np.arange(order + 1)
+    # The fitted value at the window center, as weights of the window values.
+    kernel = np.linalg.pinv(vandermonde)[0]
+    return _convolve(values, kernel)
+
+
+def one_euro(values, strength, beta=ONE_EURO_BETA):
+    """
+    One-euro filtering of the last axis: a low-pass filter whose cutoff rises with the speed.
+    The frames are filtered in order, each one for every track and channel at once.
+
+    Args:
+        values (np.ndarray): The values, frames on the last axis.
+        strength (float): The period of the lowest cutoff, in frames.
+        beta (float, optional): How much the cutoff rises with the speed. Defaults to ONE_EURO_BETA.
+
+    Returns:
+        np.ndarray: The filtered values.
+    """
+
+    def alpha(cutoff):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau)
+
+    min_cutoff = 1.0 / strength
+    derivative_alpha = alpha(1.0)
+
+    result = np.empty(values.shape, dtype=np.float64)
+    if not values.shape[-1]:
+        return result
+
+    previous = result[..., 0] = values[..., 0]
+    speed = np.zeros(values.shape[:-1], dtype=np.float64)
+
+    for frame in range(1, values.shape[-1]):
+        current = values[..., frame]
+        speed = speed + derivative_alpha * ((current - previous) - speed)
+        weight = alpha(min_cutoff + beta * np.abs(speed))
+        previous = result[..., frame] = previous + weight * (current - previous)
+
+    return result
+
+
+def smooth_values(values, filter_name, strength):
+    """
+    Smooths the last axis of an array with one of the FILTERS. A strength of 0 leaves the values as they are.
+
+    Returns:
+        np.ndarray: The smoothed values.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    if not strength or values.shape[-1] < 3:
+        return values
+
+    if filter_name == 'gaussian':
+        return gaussian(values, strength)
+    if filter_name == 'savgol':
+        return savitzky_golay(values, strength)
+    if filter_name == 'one_euro':
+        return one_euro(values, strength)
+
+    raise ValueError('Unknown smoothing filter {!r}, use one of {}.'.format(filter_name, ', '.join(FILTERS)))
+
+
+def smooth_tracks(values, keys, filter_name, strength):
+    """
+    Smooths the curves of the tracks, each one over its own keyed range, all of them at once.
+    Before the filtering, the frames outside a track's keys are reflected around its first and last key,
+    so the held values out there don't drag its ends. Afterwards they hold the nearest smoothed key again.
+
+    Args:
+        values (np.ndarray): The curves, shape (tracks, frames).
+        keys (np.ndarray): Bool mask of the keyed frames, same shape.
+        filter_name (str): One of FILTERS.
+        strength (float): The strength of the filter, in frames. 0 leaves the values as they are.
+
+    Returns:
+        np.ndarray: The smoothed curves.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    if not strength or not values.size:
+        return values
+
+    keyed = np.asarray(keys, dtype=bool)
+    count = values.shape[-1]
+    first = np.argmax(keyed, axis=-1)[:, None]
+    last = count - 1 - np.argmax(keyed[:, ::-1], axis=-1)[:, None]
+    if not first.any() and (last == count - 1).all():
+        # Every track is keyed on the whole range, the usual case.
+        return smooth_values(values, filter_name, strength)
+
+    frames = np.arange(count)[None, :]
+
+    anchor = np.clip(frames, first, last)
+    mirror = np.clip(2 * anchor - frames, first, last)
+    held = np.take_along_axis(values, anchor, axis=-1)
+    extended = np.where(frames == anchor, values, 2 * held - np.take_along_axis(values, mirror, axis=-1))
+
+    smoothed = smooth_values(extended, filter_name, strength)
+    return np.take_along_axis(smoothed, anchor, axis=-1)
+
+
+def smooth_table(table, filter_name, strengths):
+    """
+    Returns a smoothed copy of a TrackTable: the x/y columns of every track, and the curves of the solved transform.
+    The table itself isn't changed, it may be shared, or a read-only motion cache.
+    The filters work on samples, the Tracker keys every frame, so a strength in samples is a strength in frames.
+
+    Args:
+        table (TrackTable): The extracted tracks.
+        filter_name (str): One of FILTERS.
+        strengths (dict): The 'position', 'rotate' and 'scale' strengths, in frames.
+
+    Returns:
+        TrackTable: The smoothed table, with its 'smoothing' set to (filter_name, strengths).
+    """
+
+    if filter_name not in FILTERS:
+        raise ValueError('Unknown smoothing filter {!r}, use one of {}.'.format(filter_name, ', '.join(FILTERS)))
+
+    values = np.array(table.values, dtype=np.float64)
+    for column, kind in KINDS.items():
+        index = table.column_index.get(column)
+        if index is not None:
+            values[:, index] = smooth_tracks(values[:, index], table.keys[:, index], filter_name,
+                                             strengths.get(kind, 0))
+
+    transform = {}
+    for knob, channels in table.transform.items():
+        strength = strengths.get(KINDS.get(knob), 0)
+        transform[knob] = [(channel[0], smooth_values(channel[1], filter_name, strength)) + tuple(channel[2:])
+                           if isinstance(channel, tuple) else channel for channel in channels]
+
+    smoothed = TrackTable(table.names, table.columns, table.frames, values, table.keys, table.flags,
+                          transform=transform, script=table.script)
+    smoothed.smoothing = (filter_name, dict(strengths))
+    return smoothed
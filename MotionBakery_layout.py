@@ -0,0 +1,178 @@
+"""
+One-pass DAG layout of the nodes MotionBakery creates.
+
+nuke.autoplace() scans the graph around each node it places, so placing many nodes in a big script gets slower
+with every node, and the placed nodes can still land on each other. Here the boxes of the nodes already in a Group
+are read once into a grid index, the positions of all the new nodes are found against it, each new node
+taking its place in the index, and the positions are set at the end.
+The nodes baked from a Tracker are laid out as one row, below the Tracker, wrapped every ROW_NODES nodes.
+"""
+
+import nuke
+
+from MotionBakery_profile import count_api_calls
+
+nuke = count_api_calls(nuke)
+
+# Nodes other nodes may sit on: backdrops are meant to be under other nodes.
+IGNORED_CLASSES = ('BackdropNode',)
+
+# Free space kept around every node, in pixels.
+MARGIN = 8
+
+# Size of the cells of the index, in pixels.
+CELL_SIZE = 256
+
+# The most nodes placed side by side, longer rows go on to the next line.
+ROW_NODES = 10
+
+
+class SpatialIndex(object):
+    """
+    Node boxes bucketed in a grid of cells, so a box is only tested against the nodes around it.
+    A box is (left, top, right, bottom), in DAG pixels.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}
+
+    def _keys(self, box):
+        left, top, right, bottom = box
+        size = self.cell_size
+        for column in range(int(left // size), int((right - 1) // size) + 1):
+            for row in range(int(top // size), int((bottom - 1) // size) + 1):
+                yield column, row
+
+    def insert(self, box):
+        for key in self._keys(box):
+            self._cells.setdefault(key, []).append(box)
+
+    def overlaps(self, box):
+        """ Returns whether a box overlaps any box of the index. """
+
+        left, top, right, bottom = box
+        for key in self._keys(box):
+            for other in self._cells.get(key, ()):
+                if left < other[2] and other[0] < right and top < other[3] and other[1] < bottom:
+                    return True
+        return False
+
+
+def grid_size():
+    """ Returns the (width, height) of the DAG grid, from the preferences. """
+
+    preferences = nuke.toNode('preferences')
+    return int(preferences.knob('GridWidth').value()), int(preferences.knob('GridHeight').value())
+
+
+def read_index(group=None, exclude=()):
+    """
+    Reads the boxes of the nodes of a Group into a SpatialIndex, in one pass.
+
+    Args:
+        group (nuke.Group, optional): The Group to read. Defaults to the current one.
+        exclude (set, optional): Nodes left out of the index, like the nodes being placed.
+
+    Returns:
+        SpatialIndex: The occupied boxes, with MARGIN around them.
+    """
+
+    index = SpatialIndex()
+    nodes = nuke.allNodes(group=group) if group is not None else nuke.allNodes()
+
+    for node in nodes:
+        if node in exclude or node.Class() in IGNORED_CLASSES:
+            continue
+
+        x_position = node.xpos()
+        y_position = node.ypos()
+        index.insert((x_position - MARGIN, y_position - MARGIN,
+                      x_position + node.screenWidth() + MARGIN, y_position + node.screenHeight() + MARGIN))
+
+    return index
+
+
+def layout_rows(rows, index, grid=None):
+    """
+    Finds the positions of rows of new nodes, each row below its parent node,
+    moved down a grid step at a time until it overlaps nothing. Placed rows are added to the index,
+    and rows longer than ROW_NODES go on below, on as many lines as needed.
+
+    Args:
+        rows (list): (parent node, new nodes) tuples.
+        index (SpatialIndex): The occupied boxes, see read_index().
+        grid (tuple, optional): The (width, height) of the DAG grid. Read from the preferences if not given.
+
+    Returns:
+        list: (node, x, y) for every new node.
+    """
+
+    grid_x, grid_y = grid or grid_size()
+    positions = []
+
+    lines = []
+    for parent, nodes in rows:
+        for start in range(0, len(nodes), ROW_NODES):
+            lines.append((parent, nodes[start:start + ROW_NODES]))
+
+    for parent, nodes in lines:
+        sizes = [(node.screenWidth(), node.screenHeight()) for node in nodes]
+        x_position = parent.xpos()
+        y_position = parent.ypos() + parent.screenHeight() + grid_y * 2
+
+        while True:
+            boxes = []
+            left = x_position
+            for width, height in sizes:
+                boxes.append((left, y_position, left + width, y_position + height))
+                left += width + grid_x
+            if not any(index.overlaps(box) for box in boxes):
+                break
+            y_position += grid_y
+
+        for node, box in zip(nodes, boxes):
+            index.insert((box[0] - MARGIN, box[1] - MARGIN, box[2] + MARGIN, box[3] + MARGIN))
+            positions.append((node, box[0], box[1]))
+
+    return positions
+
+
+def place_rows(rows, group=None):
+    """
+    Places rows of new nodes in a Group, each row below its parent node, without overlapping any node.
+    The Group is read once for all the rows.
+
+    Args:
+        rows (list): (parent node, new nodes) tuples.
+        group (nuke.Group, optional): The Group the nodes are in. Defaults to the current one.
+    """
+
+    new_nodes = set(node for parent, nodes in rows for node in nodes)
+    if not new_nodes:
+        return
+
+    index = read_index(group, exclude=new_nodes)
+    for node, x_position, y_position in layout_rows(rows, index):
+        node.setXYpos(int(x_position), int(y_position))
+
+
+def layout_grid(nodes, grid=None):
+    """
+    Places nodes in an empty Group, ROW_NODES to a line, from the top left corner.
+
+    Args:
+        nodes (list): The nodes.
+        grid (tuple, optional): The (width, height) of the DAG grid. Read from the preferences if not given.
+    """
+
+    grid_x, grid_y = grid or grid_size()
+    y_position = 0
+    for start in range(0, len(nodes), ROW_NODES):
+        x_position = 0
+        height = 0
+        for node in nodes[start:start + ROW_NODES]:
+            node.setXYpos(x_position, y_position)
+            x_position += node.screenWidth() + grid_x
+            height = max(height, node.screenHeight())
+        y_position += height + grid_y * 2
@@ -0,0 +1,72 @@
+"""
+Lazy menu registration for MotionBakery.
+
+Builds the MotionBakery menu from MotionBakery_settings without importing the baking engine.
+MotionBakery, and NumPy and nuke.rotopaint with it, is only imported the first time a command runs.
+"""
+
+import os
+
+import nuke
+
+from MotionBakery_settings import MENU_COMMANDS
+
+ICON_PATH = os.path.join(os.path.dirname(__file__), 'icons')
+
+_engine = []
+
+
+def engine():
+    """
+    Imports the MotionBakery module on first use, and prints its banner once.
+
+    Returns:
+        module: The MotionBakery module.
+    """
+
+    if not _engine:
+        import MotionBakery
+
+        nuke.tprint('\n\t >> {} | version: {}\n'.format(MotionBakery.__title__, MotionBakery.__version__))
+        _engine.append(MotionBakery)
+
+    return _engine[0]
+
+
+def bake(mode):
+    """
+    Menu command: bakes the selected Tracker in the given mode, re-bakes its nodes for 'rebake',
+    or bakes a match move of every Tracker of the script for 'all_trackers'.
+    """
+
+    if mode == 'rebake':
+        engine().rebake_selection()
+    elif mode == 'all_trackers':
+        engine().bake_script_trackers()
+    else:
+        engine().bake_selection(mode=mode)
+
+
+def register(menu_name='Nodes'):
+    """
+    Adds the MotionBakery menu and its commands, with the shortcuts set in MotionBakery_settings.
+    Does nothing in terminal sessions, where there is no menu to fill.
+
+    Args:
+        menu_name (str, optional): The Nuke menu to add the MotionBakery menu to. Defaults to 'Nodes'.
+
+    Returns:
+        nuke.Menu: The MotionBakery menu, or None in terminal sessions.
+    """
+
+    if not nuke.GUI:
+        return None
+
+    mb_menu = nuke.menu(menu_name).addMenu('MotionBakery',
+                                          icon='{}/{}.png'.format(ICON_PATH, 'motion_bakery'))
+
+    for label, mode, shortcut, icon in MENU_COMMANDS:
+        mb_menu.addCommand(label, lambda mode=mode: bake(mode), shortcut,
+                           icon='{}/{}.png'.format(ICON_PATH, icon))
+
+    return mb_menu
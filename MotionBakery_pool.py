@@ -0,0 +1,111 @@
+"""
+Parallel computation for MotionBakery batch bakes.
+
+A batch bake runs in three stages: the tracks are extracted on Nuke's main thread, as the nuke API requires,
+the math of each tracker (solves, corner ordering) runs in a concurrent.futures pool,
+and the results are written to new nodes back on the main thread, a few trackers at a time.
+Only main_thread() touches nuke, so the jobs can also run in a process pool.
+"""
+
+import concurrent.futures
+import os
+import threading
+
+from MotionBakery_profile import profiled
+from MotionBakery_solvers import convex_corners, track_homographies, track_transform
+
+
+@profiled
+def compute_bake(table, mode, reference_frame, solver='tracker', weighted=True, outlier_threshold=0.0,
+                 corner_tracks=None):
+    """
+    Does the math of one bake. It doesn't touch nuke, so it can run in any thread or process.
+
+    Args:
+        table (TrackTable): The extracted tracks.
+        mode (str or list): The bake mode, see MotionBakery.bakery(), or a list of modes.
+        reference_frame (int): The Tracker's reference frame.
+        solver (str, optional): 'tracker', 'similarity' or 'affine'. Defaults to 'tracker'.
+        weighted (bool, optional): Weigh the tracks by their tracking error when solving. Defaults to True.
+        outlier_threshold (float, optional): Rejection distance of the solve in pixels. Defaults to 0.
+        corner_tracks (list, optional): The four tracks of a 'cpin' bake, in any order.
+
+    Returns:
+        dict: 'transform' for re-solved match moves/ stabilizes, 'homography' as (frames, matrices, points),
+            or 'corners', the ordered tracks of a CornerPin. Empty when the mode has no math to do.
+            For a list of modes, the result of each mode by mode.
+    """
+
+    if isinstance(mode, (list, tuple)):
+        return dict((name, compute_bake(table, name, reference_frame, solver, weighted, outlier_threshold,
+                                        corner_tracks)) for name in mode)
+
+    if mode in ('matchmove', 'stabilize'):
+        if solver == 'tracker':
+            return {}
+        return {'transform': track_transform(table, reference_frame, affine=solver == 'affine', weighted=weighted,
+                                             outlier_threshold=outlier_threshold)}
+
+    if mode == 'homography':
+        return {'homography': track_homographies(table, reference_frame)}
+
+    if mode == 'cpin':
+        return {'corners': convex_corners(table, reference_frame, corner_tracks) if corner_tracks else []}
+
+    return {}
+
+
+def pool_workers(workers=0):
+    """ Returns the number of pool workers, one per CPU core for 0. """
+
+    return workers or os.cpu_count() or 1
+
+
+def compute_all(jobs, executor='thread', workers=0):
+    """
+    Runs compute_bake() for every job, in a pool.
+    A single job, or a single worker, runs inline with no pool at all.
+
+    Args:
+        jobs (list): One dict of compute_bake() arguments per tracker.
+        executor (str, optional): 'thread' or 'process'. Defaults to 'thread'.
+        workers (int, optional): The number of workers, 0 for one per CPU core. Defaults to 0.
+
+    Yields:
+        tuple: (job index, result), in job order, each one as soon as it's done.
+            Closing the generator cancels the jobs not started yet.
+    """
+
+    workers = min(pool_workers(workers), len(jobs))
+    if workers < 2:
+        for index, job in enumerate(jobs):
+            yield index, compute_bake(**job)
+        return
+
+    if executor == 'process':
+        pool = concurrent.futures.ProcessPoolExecutor(workers)
+    else:
+        pool = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='MotionBakery')
+
+    futures = [pool.submit(compute_bake, **job) for job in jobs]
+    try:
+        for index, future in enumerate(futures):
+            yield index, future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def main_thread(call, *args, **kwargs):
+    """
+    Calls a function on Nuke's main thread and returns its result.
+    From the main thread it's a plain call, from any other thread it goes through nuke.executeInMainThreadWithResult().
+    """
+
+    if threading.current_thread() is threading.main_thread():
+        return call(*args, **kwargs)
+
+    # Imported here, the pool's worker processes never need nuke.
+    import nuke
+    return nuke.executeInMainThreadWithResult(call, args, kwargs)
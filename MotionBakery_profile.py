@@ -0,0 +1,222 @@
+"""
+Per-phase profiling of MotionBakery bakes.
+
+Turned on with PROFILE in the settings, or the MOTIONBAKERY_PROFILE environment variable
+('1' for the default log, or the path of the log). Every finished phase is appended to a JSON-lines log:
+
+    {"phase": "customize_node", "path": "bakery/customize_node", "wall": 0.0123,
+     "counts": {"nuke.allNodes": 1, "knob.setExpression": 1, "keys": 0}, "user": "...", "host": "...",
+     "pid": 123, "time": 1767225600.0}
+
+The 'nuke.*' counts are the calls of the nuke module functions, see count_api_calls(). The 'knob.*' counts are
+the knob calls that move the tracks and the curves: toScript(), fromScript(), setExpression(), and the
+setValue() of single cells and keys. The setValue() of the settings knobs of a new node aren't counted.
+A phase's counts include the counts of the phases it contains. When profiling is off, profiled() returns
+the functions untouched and phase() a shared empty context, so the bakes run exactly as without it.
+"""
+
+import functools
+import getpass
+import json
+import os
+import socket
+import threading
+import time
+
+from MotionBakery_settings import PROFILE, PROFILE_LOG
+
+
+def _log_path():
+    value = os.environ.get('MOTIONBAKERY_PROFILE', '')
+    if value.lower() in ('', '0', 'false', 'no', 'off'):
+        return (PROFILE_LOG or _default_log()) if PROFILE else None
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return PROFILE_LOG or _default_log()
+    return value
+
+
+def _default_log():
+    return os.path.join(os.path.expanduser('~'), '.nuke', 'MotionBakery_profile.jsonl')
+
+
+LOG_PATH = _log_path()
+ENABLED = LOG_PATH is not None
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_session = {}
+
+
+class _Phase(object):
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.counts = {}
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = '/'.join([phase.name for phase in stack] + [self.name])
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+
+        if stack:
+            parent = stack[-1].counts
+            for name, amount in self.counts.items():
+                parent[name] = parent.get(name, 0) + amount
+
+        record = dict(self.fields)
+        record.update(phase=self.name, path=self.path, wall=round(wall, 6), counts=self.counts,
+                      time=round(time.time(), 3), failed=exc_info[0] is not None)
+        record.update(_session_fields())
+        _write(record)
+        return False
+
+
+class _NoPhase(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _session_fields():
+    if not _session:
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = None
+        _session.update(user=user, host=socket.gethostname(), pid=os.getpid())
+    return _session
+
+
+def _write(record):
+    line = json.dumps(record, sort_keys=True, default=str) + '\n'
+    with _write_lock:
+        try:
+            folder = os.path.dirname(LOG_PATH)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            with open(LOG_PATH, 'a') as f:
+                f.write(line)
+        except (IOError, OSError):
+            # Profiling must never break a bake.
+            pass
+
+
+def phase(name, **fields):
+    """
+    Context manager timing one phase of a bake.
+
+    Args:
+        name (str): The phase name.
+        **fields: Extra values for the log record, like the tracker name.
+
+    Returns:
+        The phase context, or a shared empty one when profiling is off.
+    """
+
+    if not ENABLED:
+        return _NO_PHASE
+    return _Phase(name, fields)
+
+
+def profiled(func):
+    """ Decorator timing every call of a function as a phase, a no-op when profiling is off. """
+
+    if not ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _Phase(func.__name__, {}):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def count(name, amount=1):
+    """ Adds to a counter of the current phase, like the number of keys written. """
+
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        counts = stack[-1].counts
+        counts[name] = counts.get(name, 0) + amount
+
+
+def annotate(**fields):
+    """ Adds values to the log record of the current phase. """
+
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].fields.update(fields)
+
+
+def count_api_calls(module, prefix='nuke.'):
+    """
+    Returns a proxy of a module, like nuke, counting each call of its functions in the current phase.
+    The module itself is left untouched, only the code using the proxy is counted. The calls of the knobs it
+    returns aren't counted, the curve and track helpers count theirs with count().
+
+        nuke = count_api_calls(nuke)
+
+    Args:
+        module (module): The module to instrument.
+        prefix (str, optional): Prefix of the counter names. Defaults to 'nuke.'.
+
+    Returns:
+        The proxy, or the module itself when profiling is off.
+    """
+
+    if not ENABLED:
+        return module
+    return _CountedModule(module, prefix)
+
+
+class _CountedModule(object):
+
+    def __init__(self, module, prefix):
+        self._module = module
+        self._prefix = prefix
+        self._wrappers = {}
+
+    def __getattr__(self, name):
+        value = getattr(self._module, name)
+        if name.startswith('_') or isinstance(value, type) or not callable(value):
+            return value
+        if type(value).__name__ not in ('function', 'builtin_function_or_method'):
+            return value
+
+        # Keyed on the function too, so a function replaced on the module is counted as the new one.
+        wrapper = self._wrappers.get(name)
+        if wrapper is None or wrapper.__wrapped__ is not value:
+            wrapper = self._wrappers[name] = _counted(value, self._prefix + name)
+        return wrapper
+
+
+def _counted(func, name):
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        count(name)
+        return func(*args, **kwargs)
+
+    return wrapper
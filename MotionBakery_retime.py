@@ -0,0 +1,137 @@
+"""
+Frame windowing and resampling of the tracks, applied once at bake time.
+
+Trackers are often tracked well past the frames a comp uses, "just in case", and every one of those keys
+is baked into the new nodes. retime_table() crops a TrackTable to a frame range, keys only every step-th
+frame of it, and conforms it to another frame rate, like 24 to 25 fps. The values of every track and column
+are interpolated at once, with one gather over the frame axis, and the solved transform curves are resampled
+with np.interp(), so the bakes copy only the keys of the window.
+
+The reference frame is always kept: the bakes are relative to it, and the solves need its keys.
+"""
+
+import numpy as np
+
+from MotionBakery_tracks import TrackTable
+
+
+def output_frame(frame, first, ratio):
+    """
+    Returns where a frame of the tracks lands after a frame rate conform.
+
+    Args:
+        frame (int): The frame, at the source rate.
+        first (int): The first frame of the window, which doesn't move.
+        ratio (float): The target rate over the source rate.
+
+    Returns:
+        int: The frame at the target rate.
+    """
+
+    return int(first + round((frame - first) * ratio))
+
+
+def _resample_curve(channel, frames, source, exact):
+    """ Returns the keys of a (frames, values[, interpolation]) curve on the output frames, or the constant. """
+
+    if not isinstance(channel, tuple):
+        return channel
+
+    curve_frames = np.asarray(channel[0], dtype=np.float64)
+    if not len(curve_frames):
+        return channel
+
+    inside = (source >= curve_frames[0]) & (source <= curve_frames[-1])
+    if exact:
+        # Same rate: the curve's own keys in the window, not interpolated ones.
+        inside &= np.isin(source, curve_frames)
+
+    values = np.interp(source[inside], curve_frames, np.asarray(channel[1], dtype=np.float64))
+    return (frames[inside].astype(np.float64), values) + tuple(channel[2:])
+
+
+def retime_table(table, first=None, last=None, step=1, source_fps=None, target_fps=None, reference_frame=None):
+    """
+    Returns a copy of a TrackTable cropped to a frame range, keyed every step-th frame, and conformed
+    to another frame rate. The table itself isn't changed, it may be shared, or a read-only motion cache.
+
+    Args:
+        table (TrackTable): The extracted tracks.
+        first (int, optional): The first frame of the window, at the source rate. Defaults to the first tracked frame.
+        last (int, optional): The last frame of the window, at the source rate. Defaults to the last tracked frame.
+        step (int, optional): Key every step-th frame of the window, from its first frame. Defaults to 1.
+        source_fps (float, optional): The frame rate of the tracks.
+        target_fps (float, optional): The frame rate to conform to, like 25 for tracks at 24 fps.
+            The first frame of the window doesn't move. Defaults to the source rate, no conform.
+        reference_frame (int, optional): The Tracker's reference frame, at the source rate. It stays keyed
+            even out of the window.
+
+    Returns:
+        TrackTable: The retimed table, with its 'window' set to the 'first', 'last', 'step', 'source_fps'
+            and 'target_fps' it was retimed with, and the 'reference_frame' on the retimed frames.
+            The first and last frames are the ones of the tracks in the window, at the source rate.
+
+    Raises:
+        ValueError: If the window has no tracked frame.
+    """
+
+    tracked = table.frames
+    if not len(tracked):
+        raise ValueError('The tracker has no tracked frames.')
+
+    first = int(tracked[0]) if first is None else max(int(first), int(tracked[0]))
+    last = int(tracked[-1]) if last is None else min(int(last), int(tracked[-1]))
+    if first > last:
+        raise ValueError('No tracked frame in the frame range, the tracks cover {}-{}.'.format(
+            int(tracked[0]), int(tracked[-1])))
+
+    step = max(int(step), 1)
+    if not source_fps or not target_fps:
+        source_fps = target_fps = source_fps or target_fps
+    ratio = float(target_fps) / source_fps if source_fps else 1.0
+
+    out_first = first
+    out_last = first + int(np.floor((last - first) * ratio + 1e-9))
+
+    low, high = out_first, out_last
+    out_reference = None
+    if reference_frame is not None:
+        out_reference = output_frame(min(max(reference_frame, int(tracked[0])), int(tracked[-1])), first, ratio)
+        low, high = min(low, out_reference), max(high, out_reference)
+
+    frames = np.arange(low, high + 1)
+    source = np.clip(first + (frames - first) / ratio, tracked[0], tracked[-1])
+
+    window = (frames >= out_first) & (frames <= out_last) & ((frames - out_first) % step == 0)
+    if out_reference is not None:
+        window |= frames == out_reference
+
+    # One gather of every track and column on the frame axis, a blend of two only when the rate changes.
+    position = source - tracked[0]
+    before = np.floor(position).astype(np.intp)
+    after = np.minimum(before + 1, len(tracked) - 1)
+    weight = position - before
+
+    exact = ratio == 1
+    values = np.take(table.values, before, axis=-1)
+    if exact:
+        keys = np.take(table.keys, before, axis=-1) & window
+    else:
+        values = values.astype(np.float64, copy=False)
+        delta = np.take(table.values, after, axis=-1)
+        delta -= values
+        delta *= weight
+        values += delta
+        keys = np.take(table.keys, before, axis=-1) & ((weight == 0) | np.take(table.keys, after, axis=-1)) & window
+
+    transform = {}
+    for knob, channels in table.transform.items():
+        transform[knob] = [_resample_curve(channel, frames[window], source[window], exact)
+                           for channel in channels]
+
+    retimed = TrackTable(table.names, table.columns, frames, values, keys, table.flags,
+                         transform=transform, script=table.script)
+    retimed.smoothing = table.smoothing
+    retimed.window = {'first': first, 'last': last, 'step': step, 'source_fps': source_fps,
+                      'target_fps': target_fps, 'reference_frame': out_reference}
+    return retimed
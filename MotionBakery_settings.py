@@ -4,13 +4,122 @@ MATCHMOVE_SHORTCUT  = 'f2'
 STABILIZE_SHORTCUT  = 'f3'
 ROTO_SHORTCUT       = 'f4'
 CORNERPIN_SHORTCUT  = 'f5'
+HOMOGRAPHY_SHORTCUT = None
+REBAKE_SHORTCUT     = None
+BAKE_ALL_SHORTCUT   = None
+PER_TRACK_SHORTCUT  = None
+TRACKERS_SHORTCUT   = None
+
+# The commands of the MotionBakery menu: (label, bake mode, shortcut, icon name).
+# Remove a line to hide a command.
+MENU_COMMANDS = (
+    ('Bake a Match Move', 'matchmove', MATCHMOVE_SHORTCUT, 'matchmove'),
+    ('Bake a Stabilize', 'stabilize', STABILIZE_SHORTCUT, 'stabilize'),
+    ('Bake a Roto|RotoPaint', 'roto', ROTO_SHORTCUT, 'roto'),
+    ('Bake a CornerPin', 'cpin', CORNERPIN_SHORTCUT, 'cornerpin'),
+    ('Bake a CornerPin (all tracks)', 'homography', HOMOGRAPHY_SHORTCUT, 'cornerpin'),
+    ('Bake a Transform per track', 'per_track', PER_TRACK_SHORTCUT, 'matchmove'),
+    ('Bake all (Transform, Roto, CornerPin)', 'all', BAKE_ALL_SHORTCUT, 'matchmove'),
+    ('Bake a Match Move of every Tracker', 'all_trackers', TRACKERS_SHORTCUT, 'matchmove'),
+    ('Re-bake derived nodes', 'rebake', REBAKE_SHORTCUT, 'matchmove'),
+)
+
+# The nodes the 'all' bake mode creates, from a single read of the Tracker.
+BAKE_ALL_MODES = ('matchmove', 'roto', 'cpin')
+
+# Create the nodes of the 'per_track' mode, one Transform per track, in a single Group node.
+PER_TRACK_GROUP = False  # True or False
 
 # Either check all tracks in the selected Track node, or keep as it is.
 MARK_ALL_TRACKS = True # True or False
 
+# Which columns to check on every track: 'T' (translate), 'R' (rotate) and/or 'S' (scale).
+MARK_COLUMNS = ('T', 'R', 'S')
+
+# Time in seconds to wait, once, for the Tracker to update its solve after marking the tracks.
+MARK_SETTLE_TIME = 0.05
+
+# How stabilize/ match move inversions are computed.
+# 'simple' matches the Tracker export, 'matrix' is exact when rotate and non-uniform scale are both animated.
+INVERSE_MODE = 'simple'  # 'simple' or 'matrix'
+
+# How the created nodes follow their reference frame.
+# 'expression' links the keys with 'curve - curve(tr_reference_frame)' expressions,
+# 'baked' writes plain reference-relative keys and re-bakes them when the reference frame changes.
+OUTPUT_MODE = 'expression'  # 'expression' or 'baked'
+
+# Where the match move/ stabilize transforms come from.
+# 'tracker' copies the Tracker's own solve, 'similarity' (translate, rotate, uniform scale) or 'affine'
+# (adds non-uniform scale and skew) fit it again from every enabled track.
+TRANSFORM_SOLVER = 'tracker'  # 'tracker', 'similarity' or 'affine'
+
+# Weigh each track by its tracking error when fitting, a track with an error of 1 is left out.
+SOLVER_WEIGHTED = True  # True or False
+
+# Tracks further than this many pixels from a first fit are left out of that frame. Set to 0 to keep every track.
+SOLVER_OUTLIER_THRESHOLD = 3.0
+
+# How the homography CornerPin (solved from every enabled track) is written.
+# 'corners' keys to1..to4 on the corners of the tracked area, 'matrix' keys the CornerPin's extra matrix.
+HOMOGRAPHY_OUTPUT = 'corners'  # 'corners' or 'matrix'
+
+# Batch bakes do the math of each tracker (solves, corner ordering) in parallel, in a 'thread' or 'process' pool.
+# Threads are the right choice inside Nuke, 'process' is for terminal sessions with many heavy solves.
+COMPUTE_EXECUTOR = 'thread'  # 'thread' or 'process'
+
+# The number of pool workers, 0 for one per CPU core.
+COMPUTE_WORKERS = 0
+
+# How many trackers are written to new nodes per call on Nuke's main thread.
+APPLY_BATCH_SIZE = 8
+
+# Run batch bakes in a background thread: Nuke stays responsive and the new nodes show up as they're baked.
+BATCH_BACKGROUND = False  # True or False
+
+# Reduce the baked keys: the Tracker keys every frame, this keeps only the keys needed to follow the curves.
+REDUCE_KEYS = False  # True or False
+
+# Largest error allowed by the key reduction, in pixels, degrees and scale factor.
+# It's stored on each new node's "Tracker settings" tab. Set to 0 to only remove redundant keys.
+REDUCE_TOLERANCE = {'position': 0.01, 'rotate': 0.01, 'scale': 0.0001}
+
+# Smooth the tracks before baking, instead of smooth() expressions evaluated on every render.
+# 'gaussian' blurs, 'savgol' fits local curves and keeps the peaks, 'one_euro' adapts to the speed of the motion.
+SMOOTH_FILTER = None  # None, 'gaussian', 'savgol' or 'one_euro'
+
+# Strength of the smoothing, in frames, for the position, rotate and scale curves. 0 leaves them as tracked.
+# It's stored on each new node's "Tracker settings" tab, and used again when the node is re-baked.
+SMOOTH_STRENGTH = {'position': 2.0, 'rotate': 2.0, 'scale': 2.0}
+
+# Only bake the keys of a frame range, instead of every tracked frame, pre and post-roll included.
+# 'script' for the script range, 'input' for the range of the Tracker's input, or a (first, last) tuple.
+BAKE_FRAME_RANGE = None  # None, 'script', 'input' or (first, last)
+
+# Key every n-th frame of the range, like 2 for every other frame. 1 keys every frame.
+BAKE_FRAME_STEP = 1
+
+# Conform the baked keys to another frame rate, like 25 in a 24 fps script. None keeps the script rate.
+# The range, step and rates are stored on each new node's "Tracker settings" tab, next to the reference frame.
+BAKE_FPS = None
+
 # Set the standard node to be created when you call for a roto node.
 STANDARD_ROTO_NODE = 'RotoPaint'  # 'Roto' or 'RotoPaint'
 
+# How the layer of a new Roto/ RotoPaint node follows the track.
+# 'linked' drives it with expressions on hidden knobs,
+# 'keyed' keys the layer directly, so shapes evaluate no expressions.
+ROTO_LAYER_MODE = 'linked'  # 'linked' or 'keyed'
+
+# Where export_motion_cache() saves the motion caches, None for a 'motion_cache' folder next to the script.
+MOTION_CACHE_FOLDER = None
+
+# Log the time, keys and nuke calls of every phase of every bake, as JSON lines.
+# The MOTIONBAKERY_PROFILE environment variable turns it on too: '1', or the path of the log.
+PROFILE = False  # True or False
+
+# The profiling log, None for ~/.nuke/MotionBakery_profile.jsonl
+PROFILE_LOG = None
+
 # This is the range to generate random color for nodes
 # Must be values between 0 and 1
 COLOR_RANGE = (0.05, 0.85)
@@ -0,0 +1,484 @@
+"""
+Transform math for MotionBakery, done with NumPy over all the frames at once.
+"""
+
+import numpy as np
+
+from MotionBakery_tracks import curve_value_at
+
+
+def key_frames(*channels):
+    """ Returns the sorted union of the key frames of the given channels. """
+
+    frames = [channel[0] for channel in channels if isinstance(channel, tuple)]
+    if not frames:
+        return np.zeros(0, dtype=np.float64)
+    return np.unique(np.concatenate(frames))
+
+
+def _map_keys(channel, func):
+    """ Applies func to the key values of an animated channel, constant channels are kept. """
+
+    if isinstance(channel, tuple):
+        return channel[0], func(channel[0], channel[1])
+    return channel
+
+
+def invert_transform_simple(transform):
+    """
+    Inverts the tracker's transform channels the same way the Tracker4 export does:
+    center += translate, scale = 1 / scale, translate and rotate negated.
+    Only the keys are changed, every channel keeps its own key frames.
+    Exact as long as the scale is uniform.
+
+    Args:
+        transform (dict): 'translate', 'rotate', 'scale' and 'center' channels, as read by read_channels().
+
+    Returns:
+        dict: The inverted channels.
+    """
+
+    translate = transform['translate']
+
+    return {
+        'translate': [_map_keys(c, lambda f, v: -v) for c in translate],
+        'rotate': [_map_keys(c, lambda f, v: -v) for c in transform['rotate']],
+        'scale': [_map_keys(c, lambda f, v: 1 / v) for c in transform['scale']],
+        'center': [_map_keys(c, lambda f, v, chan=chan: v + curve_value_at(translate[chan], f))
+                   for chan, c in enumerate(transform['center'])],
+    }
+
+
+def rotation_matrices(degrees):
+    """ Returns the (frames, 2, 2) rotation matrices for an array of angles in degrees. """
+
+    radians = np.radians(degrees)
+    cos = np.cos(radians)
+    sin = np.sin(radians)
+    return np.stack([np.stack([cos, -sin], -1), np.stack([sin, cos], -1)], -2)
+
+
+def decompose_linear(matrices):
+    """
+    Splits (frames, 2, 2) matrices into Nuke's Transform order: rotate * skewX * scale.
+
+    Returns:
+        tuple: (rotate in degrees, scale_x, scale_y, skew_x), each an array of shape (frames,).
+    """
+
+    a = matrices[:, 0, 0]
+    c = matrices[:, 1, 0]
+
+    angle = np.arctan2(c, a)
+    scale_x = np.hypot(a, c)
+
+    upper = np.matmul(rotation_matrices(-np.degrees(angle)), matrices)
+    scale_y = upper[:, 1, 1]
+    skew_x = upper[:, 0, 1] / scale_y
+
+    return np.degrees(angle), scale_x, scale_y, skew_x
+
+
+def invert_transform_matrix(transform, reference_frame):
+    """
+    Exact inverse of the transform a baked node applies, computed as 2x2 matrices over all frames.
+
+    The forward transform is taken relative to the reference frame, like the baked expressions do,
+    and its inverse is split back into translate, rotate, scale, skewX and center, so a rotation
+    combined with a non-uniform scale or a skew stays correct. Every channel is keyed on the union of the
+    tracker's key frames, and equals the identity at the reference frame.
+
+    Args:
+        transform (dict): 'translate', 'rotate', 'scale', 'center' and optionally 'skewX' channels,
+            as read by read_channels().
+        reference_frame (int): The frame where the transform is the identity.
+
+    Returns:
+        dict: The inverted channels, including 'skewX'.
+    """
+
+    translate = transform['translate']
+    rotate = transform['rotate'][0]
+    scale = transform['scale']
+    center = transform['center']
+    skew = transform.get('skewX', [0.0])[0]
+
+    frames = key_frames(*(translate + [rotate, skew] + scale + center))
+
+    def relative(channel, identity=0.0):
+        return curve_value_at(channel, frames) - curve_value_at(channel, reference_frame) + identity
+
+    trans_x = relative(translate[0])
+    trans_y = relative(translate[1])
+    center_x = curve_value_at(center[0], frames)
+    center_y = curve_value_at(center[1], frames)
+
+    scale_x = relative(scale[0], 1.0)
+    scale_y = relative(scale[1], 1.0)
+
+    inverse_scale = np.zeros((len(frames), 2, 2))
+    inverse_scale[:, 0, 0] = 1 / scale_x
+    inverse_scale[:, 1, 1] = 1 / scale_y
+
+    inverse_skew = np.tile(np.eye(2), (len(frames), 1, 1))
+    inverse_skew[:, 0, 1] = -relative(skew)
+
+    linear = np.matmul(inverse_scale, np.matmul(inverse_skew, rotation_matrices(-relative(rotate))))
+    angle, new_scale_x, new_scale_y, skew_x = decompose_linear(linear)
+
+    return {
+        'translate': [(frames, -trans_x), (frames, -trans_y)],
+        'rotate': [(frames, angle)],
+        'scale': [(frames, new_scale_x), (frames, new_scale_y)],
+        'center': [(frames, center_x + trans_x), (frames, center_y + trans_y)],
+        'skewX': [(frames, skew_x)],
+    }
+
+
+def track_points(table, reference_frame, tracks=None, weighted=False):
+    """
+    Gathers the track positions a solver fits: every enabled track keyed at the reference frame.
+
+    Args:
+        table (TrackTable): The extracted tracks, with 'track_x' and 'track_y' columns.
+        reference_frame (int): The frame the motion is solved from.
+        tracks (list, optional): The track indices to use. Defaults to every enabled track.
+        weighted (bool, optional): Whether the weights drop with the tracking error, a track with
+            an error of 1 or more is left out. Defaults to False, every key weighs 1.
+
+    Returns:
+        tuple: (track indices, (tracks, 2) positions at the reference frame, (frames, tracks, 2) positions,
+            (frames, tracks) weights, 0 where a track has no key).
+    """
+
+    col_x = table.column_index['track_x']
+    col_y = table.column_index['track_y']
+    ref_index = table.frame_index(reference_frame)
+
+    keyed = table.keys[:, col_x] & table.keys[:, col_y]
+    use = keyed[:, ref_index] & (table.flags['enable'] > 0)
+    if tracks is not None:
+        use &= np.isin(np.arange(len(table)), tracks)
+    use = np.flatnonzero(use)
+
+    source = table.values[use][:, [col_x, col_y], ref_index]
+    target = np.moveaxis(table.values[use][:, [col_x, col_y]], -1, 0)
+    weights = keyed[use].T.astype(np.float64)
+
+    if weighted and 'error' in table.column_index:
+        weights *= 1 - np.clip(table.values[use, table.column_index['error']].T, 0, 1)
+
+    return use, source, target, weights
+
+
+def _normalizing_transforms(points, weights):
+    """
+    Hartley normalization of (frames, points, 2) point sets: moves the weighted centroid of every frame
+    to the origin and scales the mean distance to sqrt(2), which keeps the DLT well conditioned.
+
+    Returns:
+        np.ndarray: The (frames, 3, 3) normalizing matrices.
+    """
+
+    total = weights.sum(1)
+    total[total == 0] = 1.0
+
+    centroid = (points * weights[..., None]).sum(1) / total[:, None]
+    distance = np.hypot(points[..., 0] - centroid[:, 0:1], points[..., 1] - centroid[:, 1:2])
+    mean_distance = (distance * weights).sum(1) / total
+    scale = np.sqrt(2) / np.where(mean_distance > 0, mean_distance, 1.0)
+
+    matrices = np.zeros((len(points), 3, 3))
+    matrices[:, 0, 0] = matrices[:, 1, 1] = scale
+    matrices[:, 0, 2] = -scale * centroid[:, 0]
+    matrices[:, 1, 2] = -scale * centroid[:, 1]
+    matrices[:, 2, 2] = 1.0
+    return matrices
+
+
+def apply_homographies(matrices, points):
+    """
+    Maps points through homographies.
+
+    Args:
+        matrices (np.ndarray): (frames, 3, 3) homographies.
+        points (np.ndarray): (points, 2) or (frames, points, 2) coordinates.
+
+    Returns:
+        np.ndarray: The (frames, points, 2) mapped coordinates.
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 2:
+        points = np.broadcast_to(points, (len(matrices),) + points.shape)
+
+    mapped = np.matmul(points, np.swapaxes(matrices[:, :2, :2], 1, 2)) + matrices[:, None, :2, 2]
+    w = np.matmul(points, matrices[:, 2, :2, None])[..., 0] + matrices[:, None, 2, 2]
+    return mapped / w[..., None]
+
+
+def solve_homographies(source, target, weights, chunk=512):
+    """
+    Least-squares homographies (normalized DLT) mapping source points to target points, for every frame at once.
+
+    The 2N x 9 DLT systems of all the frames are reduced to their 9 x 9 normal matrices with one batched
+    matmul, and solved with one batched eigendecomposition. Frames are processed in chunks, so memory stays
+    bounded for thousands of frames and hundreds of tracks.
+
+    Args:
+        source (np.ndarray): (points, 2) or (frames, points, 2) coordinates.
+        target (np.ndarray): (frames, points, 2) coordinates.
+        weights (np.ndarray): (frames, points) weights, 0 leaves a point out of a frame.
+        chunk (int, optional): The number of frames solved together. Defaults to 512.
+
+    Returns:
+        tuple: ((frames, 3, 3) homographies with h22 = 1, (frames,) bool mask of the solved frames).
+            Frames with fewer than 4 weighted points are not solved, and hold the identity.
+    """
+
+    target = np.asarray(target, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    source = np.broadcast_to(np.asarray(source, dtype=np.float64), target.shape)
+
+    n_frames, n_points = weights.shape
+    matrices = np.tile(np.eye(3), (n_frames, 1, 1))
+    solved = (weights > 0).sum(1) >= 4
+
+    for first in range(0, n_frames, chunk):
+        frames = np.flatnonzero(solved[first:first + chunk]) + first
+        if not len(frames):
+            continue
+
+        w = weights[frames]
+        src = source[frames]
+        dst = target[frames]
+
+        norm_src = _normalizing_transforms(src, w)
+        norm_dst = _normalizing_transforms(dst, w)
+        x, y = np.moveaxis(apply_homographies(norm_src, src), -1, 0)
+        u, v = np.moveaxis(apply_homographies(norm_dst, dst), -1, 0)
+
+        ones = np.ones_like(x)
+        zeros = np.zeros_like(x)
+        rows_u = np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y, -u], -1)
+        rows_v = np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y, -v], -1)
+
+        normal = (np.matmul(np.swapaxes(rows_u * w[..., None], 1, 2), rows_u) +
+                  np.matmul(np.swapaxes(rows_v * w[..., None], 1, 2), rows_v))
+
+        # The solution is the eigenvector of the smallest eigenvalue, eigh sorts them in ascending order.
+        h = np.linalg.eigh(normal)[1][:, :, 0].reshape(-1, 3, 3)
+        h = np.matmul(np.linalg.inv(norm_dst), np.matmul(h, norm_src))
+        matrices[frames] = h / h[:, 2:3, 2:3]
+
+    return matrices, solved
+
+
+def track_homographies(table, reference_frame, tracks=None):
+    """
+    Solves the homography of every frame of a TrackTable, relative to the reference frame,
+    from all the enabled tracks keyed at that frame.
+
+    Args:
+        table (TrackTable): The extracted tracks, with 'track_x' and 'track_y' columns.
+        reference_frame (int): The frame where the homography is the identity.
+        tracks (list, optional): The track indices to use. Defaults to every enabled track.
+
+    Returns:
+        tuple: (frames, (frames, 3, 3) homographies, (tracks, 2) positions of the used tracks at the
+            reference frame). Only the frames with at least 4 keyed tracks are returned.
+    """
+
+    ref_index = table.frame_index(reference_frame)
+    use, source, target, weights = track_points(table, reference_frame, tracks)
+
+    matrices, solved = solve_homographies(source, target, weights)
+    frames = table.frames[solved]
+    matrices = matrices[solved]
+
+    # Pin the reference frame to the identity, like the baked expressions do.
+    if solved[ref_index]:
+        reference = matrices[np.searchsorted(frames, table.frames[ref_index])]
+        matrices = np.matmul(matrices, np.linalg.inv(reference))
+        matrices /= matrices[:, 2:3, 2:3]
+
+    return frames, matrices, source
+
+
+# Where the 3x3 homography entries go in the row-major 4x4 matrix of a CornerPin2D 'transform_matrix',
+# the z row and column stay identity.
+MATRIX_4X4_INDEX = (0, 1, 3, 4, 5, 7, 12, 13, 15)
+
+
+def homography_matrix_channels(frames, matrices):
+    """
+    Converts per-frame homographies to the 16 channels of a CornerPin2D 'transform_matrix' knob.
+
+    Returns:
+        list: 16 channels, a (frames, values) tuple for each homography entry and constants for the z row and column.
+    """
+
+    channels = [1.0 if index in (0, 5, 10, 15) else 0.0 for index in range(16)]
+    for entry, index in enumerate(MATRIX_4X4_INDEX):
+        channels[index] = (frames, matrices[:, entry // 3, entry % 3])
+    return channels
+
+
+def matrix_channel_homographies(channels):
+    """
+    Reads the homographies back from the 16 channels of a 'transform_matrix' knob, on the union of their keys.
+
+    Returns:
+        tuple: (frames, (frames, 3, 3) homographies).
+    """
+
+    entries = [channels[index] for index in MATRIX_4X4_INDEX]
+    frames = key_frames(*entries)
+    matrices = np.stack([curve_value_at(channel, frames) for channel in entries], -1).reshape(-1, 3, 3)
+    return frames, matrices
+
+
+def _fit_linear(source, target, weights, affine=False):
+    """
+    Weighted least-squares fit of target = linear @ source + offset, for every frame at once.
+    The similarity fit is the closed 2D form of Umeyama's solution, which never returns a reflection.
+
+    Returns:
+        tuple: ((frames, 2, 2) linear parts, (frames, 2) offsets, (frames,) bool mask of the solved frames).
+    """
+
+    total = weights.sum(1)
+    safe_total = np.where(total > 0, total, 1.0)[:, None]
+
+    source_mean = (source * weights[..., None]).sum(1) / safe_total
+    target_mean = (target * weights[..., None]).sum(1) / safe_total
+    src = (source - source_mean[:, None]) * np.sqrt(weights)[..., None]
+    dst = (target - target_mean[:, None]) * np.sqrt(weights)[..., None]
+
+    if affine:
+        source_cov = np.matmul(np.swapaxes(src, 1, 2), src)
+        cross_cov = np.matmul(np.swapaxes(dst, 1, 2), src)
+        det = np.linalg.det(source_cov)
+        solved = ((weights > 0).sum(1) >= 3) & (det > 1e-9 * np.trace(source_cov, axis1=1, axis2=2) ** 2)
+        source_cov[~solved] = np.eye(2)
+        linear = np.swapaxes(np.linalg.solve(source_cov, np.swapaxes(cross_cov, 1, 2)), 1, 2)
+    else:
+        variance = (src ** 2).sum((1, 2))
+        dot = (src * dst).sum((1, 2))
+        cross = (src[..., 0] * dst[..., 1] - src[..., 1] * dst[..., 0]).sum(1)
+        solved = ((weights > 0).sum(1) >= 2) & (variance > 0)
+        variance[~solved] = 1.0
+        linear = np.stack([np.stack([dot, -cross], -1), np.stack([cross, dot], -1)], -2) / variance[:, None, None]
+
+    linear[~solved] = np.eye(2)
+    offset = target_mean - np.matmul(linear, source_mean[..., None])[..., 0]
+    offset[~solved] = 0.0
+    return linear, offset, solved
+
+
+def solve_transforms(source, target, weights, affine=False, outlier_threshold=0.0):
+    """
+    Per-frame similarity (translate, rotate, uniform scale) or affine fits mapping source points to target points,
+    batched over all the frames and tracks.
+
+    Args:
+        source (np.ndarray): (points, 2) or (frames, points, 2) coordinates.
+        target (np.ndarray): (frames, points, 2) coordinates.
+        weights (np.ndarray): (frames, points) weights, 0 leaves a point out of a frame.
+        affine (bool, optional): Fit a full affine transform instead of a similarity. Defaults to False.
+        outlier_threshold (float, optional): After a first fit, points further than this many pixels from it
+            are left out, and the frame is fitted again. 0 disables the rejection. Defaults to 0.
+
+    Returns:
+        tuple: ((frames, 2, 2) linear parts, (frames, 2) offsets, (frames,) bool mask of the solved frames).
+    """
+
+    target = np.asarray(target, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    source = np.broadcast_to(np.asarray(source, dtype=np.float64), target.shape)
+
+    linear, offset, solved = _fit_linear(source, target, weights, affine)
+
+    if outlier_threshold > 0:
+        fitted = np.matmul(source, np.swapaxes(linear, 1, 2)) + offset[:, None]
+        residual = np.hypot(*np.moveaxis(target - fitted, -1, 0))
+        inliers = np.where(residual <= outlier_threshold, weights, 0.0)
+
+        refit_linear, refit_offset, refit_solved = _fit_linear(source, target, inliers, affine)
+
+        # Frames left without enough inliers keep their first fit.
+        linear[refit_solved] = refit_linear[refit_solved]
+        offset[refit_solved] = refit_offset[refit_solved]
+
+    return linear, offset, solved
+
+
+def track_transform(table, reference_frame, affine=False, weighted=True, outlier_threshold=0.0, tracks=None):
+    """
+    Solves the match-move transform of a TrackTable from every enabled track, relative to the reference frame,
+    without going through the Tracker's own solve.
+
+    Args:
+        table (TrackTable): The extracted tracks, with 'track_x', 'track_y' and optionally 'error' columns.
+        reference_frame (int): The frame where the transform is the identity.
+        affine (bool, optional): Fit an affine transform, adding non-uniform scale and skew. Defaults to False.
+        weighted (bool, optional): Weigh the tracks by their tracking error. Defaults to True.
+        outlier_threshold (float, optional): Rejection distance in pixels, 0 to keep every track. Defaults to 0.
+        tracks (list, optional): The track indices to use. Defaults to every enabled track.
+
+    Returns:
+        dict: 'translate', 'rotate', 'scale' and 'center' channels, like TrackTable.transform,
+            plus 'skewX' for affine fits. Empty if fewer tracks than needed are keyed at the reference frame.
+    """
+
+    use, source, target, weights = track_points(table, reference_frame, tracks, weighted)
+    if len(use) < (3 if affine else 2):
+        return {}
+
+    linear, offset, solved = solve_transforms(source, target, weights, affine, outlier_threshold)
+    frames = table.frames[solved].astype(np.float64)
+    linear = linear[solved]
+    offset = offset[solved]
+
+    # Nuke's Transform applies the linear part around the center, the centroid of the tracks at the reference frame.
+    center = source.mean(0)
+    translate = offset + np.matmul(linear, center) - center
+
+    if affine:
+        rotate, scale_x, scale_y, skew_x = decompose_linear(linear)
+    else:
+        rotate = np.degrees(np.arctan2(linear[:, 1, 0], linear[:, 0, 0]))
+        scale_x = scale_y = np.hypot(linear[:, 0, 0], linear[:, 1, 0])
+
+    transform = {
+        'translate': [(frames, translate[:, 0]), (frames, translate[:, 1])],
+        'rotate': [(frames, rotate)],
+        'scale': [(frames, scale_x), (frames, scale_y)],
+        'center': [(frames, np.full(len(frames), center[0])), (frames, np.full(len(frames), center[1]))],
+    }
+    if affine:
+        transform['skewX'] = [(frames, skew_x)]
+
+    return transform
+
+
+def convex_corners(table, reference_frame, tracks):
+    """
+    Orders four tracks around their centroid at the reference frame, so they form a convex quadrilateral.
+    This is mostly the original code from Foundry's Nuke Tracker4 node.
+
+    Args:
+        table (TrackTable): The extracted tracks.
+        reference_frame (int): The frame to evaluate the track positions.
+        tracks (list): The indices of the four tracks.
+
+    Returns:
+        list: The four track indices, in order.
+    """
+
+    x = table.value_at(reference_frame, 'track_x', tracks)
+    y = table.value_at(reference_frame, 'track_y', tracks)
+
+    angles = np.pi + np.arctan2(y - y.mean(), x - x.mean())
+
+    return [tracks[index] for index in sorted(range(len(tracks)), key=angles.__getitem__)]
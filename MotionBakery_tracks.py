@@ -0,0 +1,731 @@
+"""
+Track data extraction for MotionBakery.
+
+Reads the whole 'tracks' knob of a Tracker4 node (and its solved transform knobs) in a single
+toScript() call per knob, and keeps everything in NumPy arrays, so the bake modes never need to
+go back to the knob one key at a time.
+"""
+
+import re
+
+import numpy as np
+
+from MotionBakery_profile import count
+
+
+# Tracker4 'tracks' table layout, used when the column header can't be read from the script.
+TRACK_COLUMNS = ('enable', 'name', 'track_x', 'track_y', 'offset_x', 'offset_y', 'T', 'R', 'S',
+                 'error', 'error_min', 'error_max', 'pattern_x', 'pattern_y', 'pattern_r', 'pattern_t',
+                 'search_x', 'search_y', 'search_r', 'search_t', 'key_track', 'key_search_x',
+                 'key_search_y', 'key_search_r', 'key_search_t', 'key_track_x', 'key_track_y',
+                 'key_track_r', 'key_track_t', 'key_centre_offset_x', 'key_centre_offset_y')
+
+# Columns extracted as per-frame curves by default.
+CURVE_COLUMNS = ('track_x', 'track_y', 'error')
+
+# Columns extracted as one value per track.
+FLAG_COLUMNS = ('enable', 'T', 'R', 'S')
+
+TRANSFORM_KNOBS = ('translate', 'rotate', 'scale', 'center')
+
+# A whole curve is a single token: curves never contain nested braces.
+_TOKEN_RE = re.compile(r'\{curve[^{}]*\}|[{}]|"(?:[^"\\]|\\.)*"|[^\s{}"]+')
+
+
+def parse_curve(text):
+    """
+    Parses a Nuke curve script, like '{curve x1 10 11 x5 12}', into key frames and values.
+
+    Tangent tokens and per key interpolation flags are skipped, only the key positions are kept.
+    A flag set for the whole curve, like the 'L' in '{curve L x1 0 x10 5}', is kept.
+
+    Args:
+        text (str): The curve script, with or without the enclosing braces.
+
+    Returns:
+        tuple: (frames, values) as float arrays, plus the interpolation flag if the curve starts with one.
+    """
+
+    tokens = text.strip('{} \n\t').split()[1:]
+
+    if tokens and len(tokens[0]) == 1 and tokens[0].isalpha() and tokens[0] != 'x':
+        curve = parse_curve('curve ' + ' '.join(tokens[1:]))
+        return curve[0], curve[1], tokens[0]
+
+    # Fast path, what Tracker4 writes: a single start frame followed by one value per frame.
+    if tokens and tokens[0][0] == 'x' and not any(tok[0].isalpha() for tok in tokens[1:]):
+        values = np.array(tokens[1:], dtype=np.float64)
+        frames = float(tokens[0][1:]) + np.arange(len(values), dtype=np.float64)
+        return frames, values
+
+    frames = []
+    values = []
+    frame = 1.0
+    for tok in tokens:
+        if tok[0] == 'x':
+            frame = float(tok[1:])
+        elif tok[0].isalpha():
+            continue
+        else:
+            frames.append(frame)
+            values.append(float(tok))
+            frame += 1.0
+
+    return np.array(frames, dtype=np.float64), np.array(values, dtype=np.float64)
+
+
+def parse_script(text):
+    """
+    Parses a knob script into nested lists. Braced groups become lists, curves stay as strings.
+
+    Args:
+        text (str): The knob script, as returned by knob.toScript().
+
+    Returns:
+        list: The top level items of the script.
+    """
+
+    root = []
+    stack = [root]
+    for match in _TOKEN_RE.finditer(text):
+        tok = match.group(0)
+        if tok == '{':
+            group = []
+            stack[-1].append(group)
+            stack.append(group)
+        elif tok == '}':
+            if len(stack) > 1:
+                stack.pop()
+        elif tok[0] == '"':
+            stack[-1].append(tok[1:-1])
+        else:
+            stack[-1].append(tok)
+
+    return root
+
+
+def _parse_spans(text):
+    """ Same as parse_script(), but every token is kept as a (token, start, end) tuple. """
+
+    root = []
+    stack = [root]
+    for match in _TOKEN_RE.finditer(text):
+        tok = match.group(0)
+        if tok == '{':
+            group = []
+            stack[-1].append(group)
+            stack.append(group)
+        elif tok == '}':
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            stack[-1].append((tok, match.start(), match.end()))
+
+    return root
+
+
+def set_track_columns(script, values):
+    """
+    Sets columns of every track in a 'tracks' script, e.g. to check T, R and S for all tracks at once.
+    Only the edited cells change, the rest of the script is kept as it is.
+
+    Args:
+        script (str): The output of tracker_node['tracks'].toScript().
+        values (dict): Column name to its new value, like {'T': True, 'R': True}.
+
+    Returns:
+        tuple: (new_script, changed_cells, total_tracks).
+            total_tracks is -1 if the script has no readable track table.
+    """
+
+    items = _parse_spans(script)
+    while len(items) == 1 and isinstance(items[0], list):
+        items = items[0]
+
+    if len(items) < 3 or not isinstance(items[1], list) or not isinstance(items[2], list):
+        return script, 0, -1
+
+    header = [[tok[0] for tok in spec] for spec in items[1] if isinstance(spec, list)]
+    layout = _column_names(header) or list(TRACK_COLUMNS)
+    position = dict((name, index) for index, name in enumerate(layout))
+
+    edits = []
+    rows = [row for row in items[2] if isinstance(row, list)]
+    for row in rows:
+        for column, value in values.items():
+            col = position.get(column)
+            if col is None or col >= len(row) or isinstance(row[col], list):
+                continue
+
+            tok, start, end = row[col]
+            new_tok = str(int(value)) if isinstance(value, bool) else repr(float(value))
+            if is_curve(tok) or _cell_value(tok) != float(value):
+                edits.append((start, end, new_tok))
+
+    if not edits:
+        return script, 0, len(rows)
+
+    edits.sort()
+    chunks = []
+    last = 0
+    for start, end, new_tok in edits:
+        chunks.append(script[last:start])
+        chunks.append(new_tok)
+        last = end
+    chunks.append(script[last:])
+
+    return ''.join(chunks), len(edits), len(rows)
+
+
+def is_curve(item):
+    return isinstance(item, str) and item.startswith('{curve')
+
+
+def read_channels(text):
+    """
+    Reads every channel of a knob script into either a constant or a curve.
+
+    Args:
+        text (str): The knob script, as returned by knob.toScript().
+
+    Returns:
+        list: One item per channel, a float for constant channels or a (frames, values) tuple,
+            as returned by parse_curve().
+    """
+
+    items = parse_script(text)
+
+    # Array knobs may come wrapped in an extra pair of braces.
+    while len(items) == 1 and isinstance(items[0], list):
+        items = items[0]
+
+    channels = []
+    for item in items:
+        if is_curve(item):
+            channels.append(parse_curve(item))
+        else:
+            channels.append(float(item))
+
+    return channels
+
+
+def is_animated(channels):
+    return any(isinstance(chan, tuple) for chan in channels)
+
+
+def curve_value_at(channel, frame):
+    """
+    Evaluates a channel read by read_channels() at a frame, or an array of frames,
+    holding the first and last keys.
+    """
+
+    if isinstance(channel, tuple):
+        if not len(channel[0]):
+            return np.zeros_like(frame, dtype=np.float64) if np.ndim(frame) else 0.0
+        values = np.interp(frame, channel[0], channel[1])
+        return values if np.ndim(frame) else float(values)
+    return np.full(np.shape(frame), channel, dtype=np.float64) if np.ndim(frame) else channel
+
+
+def _column_names(header):
+    names = []
+    for spec in header:
+        if isinstance(spec, list) and len(spec) > 3:
+            names.append(spec[3])
+    return names
+
+
+def _cell_value(cell):
+    """ Returns a constant cell as float, the last key of an animated one, or nan. """
+
+    if is_curve(cell):
+        values = parse_curve(cell)[1]
+        return float(values[-1]) if len(values) else np.nan
+
+    try:
+        return float(cell)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class TrackTable(object):
+    """
+    Dense, columnar copy of a Tracker4 'tracks' knob.
+
+    Attributes:
+        names (list): The track names, in track order.
+        name_index (dict): Track name to track index.
+        columns (list): The curve columns held in 'values', in order.
+        column_index (dict): Column name to its position on the second axis of 'values'.
+        frames (np.ndarray): The integer frames covered by the table, shape (frames,).
+        values (np.ndarray): Column values, shape (tracks, columns, frames).
+            Frames between keys are linearly interpolated, frames outside the keys hold the nearest key.
+        keys (np.ndarray): Bool mask of the frames with a key, same shape as 'values'.
+        flags (dict): One float array per flag column ('enable', 'T', 'R', 'S'), shape (tracks,).
+        transform (dict): The tracker's solved knobs ('translate', 'rotate', 'scale', 'center'),
+            each one a list of channels as returned by read_channels().
+        script (str): The 'tracks' script the table was built from.
+        smoothing (tuple): The (filter, strengths) the table was smoothed with, see MotionBakery_filters,
+            or None.
+        window (dict): The frame range, step and frame rates the table was retimed with, see MotionBakery_retime,
+            or None.
+    """
+
+    def __init__(self, names, columns, frames, values, keys, flags, transform=None, script=''):
+        self.names = list(names)
+        self.name_index = {}
+        for index, name in enumerate(self.names):
+            self.name_index.setdefault(name, index)
+
+        self.columns = list(columns)
+        self.column_index = dict((name, index) for index, name in enumerate(self.columns))
+
+        self.frames = frames
+        self.values = values
+        self.keys = keys
+        self.flags = flags
+        self.transform = transform or {}
+        self.script = script
+        self.smoothing = None
+        self.window = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_script(cls, script, columns=CURVE_COLUMNS):
+        """
+        Builds a TrackTable from the script of a Tracker4 'tracks' knob.
+
+        Args:
+            script (str): The output of tracker_node['tracks'].toScript().
+            columns (tuple, optional): The columns to extract as curves.
+
+        Returns:
+            TrackTable: The extracted table.
+        """
+
+        items = parse_script(script)
+        while len(items) == 1 and isinstance(items[0], list):
+            items = items[0]
+
+        layout = list(TRACK_COLUMNS)
+        rows = []
+        if len(items) >= 3 and isinstance(items[1], list) and isinstance(items[2], list):
+            layout = _column_names(items[1]) or layout
+            rows = [row for row in items[2] if isinstance(row, list)]
+
+        position = dict((name, index) for index, name in enumerate(layout))
+        name_col = position.get('name', 1)
+
+        names = []
+        curves = []
+        first_frame = None
+        last_frame = None
+        for row in rows:
+            names.append(str(row[name_col]) if name_col < len(row) else '')
+
+            row_curves = []
+            for column in columns:
+                cell = row[position[column]] if position.get(column, len(row)) < len(row) else None
+                if is_curve(cell):
+                    curve = parse_curve(cell)
+                    if len(curve[0]):
+                        low = int(np.floor(curve[0][0]))
+                        high = int(np.ceil(curve[0][-1]))
+                        first_frame = low if first_frame is None else min(first_frame, low)
+                        last_frame = high if last_frame is None else max(last_frame, high)
+                    row_curves.append(curve)
+                else:
+                    row_curves.append(_cell_value(cell))
+            curves.append(row_curves)
+
+        if first_frame is None:
+            frames = np.zeros(0, dtype=np.int64)
+        else:
+            frames = np.arange(first_frame, last_frame + 1, dtype=np.int64)
+
+        values = np.full((len(rows), len(columns), len(frames)), np.nan, dtype=np.float64)
+        keys = np.zeros(values.shape, dtype=bool)
+
+        for track, row_curves in enumerate(curves):
+            for col, curve in enumerate(row_curves):
+                if isinstance(curve, tuple):
+                    if not len(curve[0]):
+                        continue
+                    values[track, col] = np.interp(frames, curve[0], curve[1])
+                    keys[track, col, np.rint(curve[0]).astype(np.int64) - frames[0]] = True
+                else:
+                    values[track, col] = curve
+
+        flags = {}
+        for column in FLAG_COLUMNS:
+            col = position.get(column)
+            flags[column] = np.array([_cell_value(row[col]) if col is not None and col < len(row) else np.nan
+                                      for row in rows], dtype=np.float64)
+
+        return cls(names, columns, frames, values, keys, flags, script=script)
+
+    @classmethod
+    def from_node(cls, tracker_node, columns=CURVE_COLUMNS, transform=True, script=None):
+        """
+        Builds a TrackTable from a Tracker4 node, with one toScript() call per knob.
+
+        Args:
+            tracker_node (nuke.Node): The Tracker4 node.
+            columns (tuple, optional): The 'tracks' columns to extract as curves.
+            transform (bool, optional): Whether to read the solved transform knobs too. Defaults to True.
+            script (str, optional): The 'tracks' script, if it was already read. Read from the node if not given.
+
+        Returns:
+            TrackTable: The extracted table.
+        """
+
+        if script is None:
+            script = tracker_node['tracks'].toScript()
+            count('knob.toScript')
+
+        table = cls.from_script(script, columns=columns)
+        store_track_index(tracker_node, table)
+
+        if transform:
+            table.read_transform(tracker_node)
+
+        return table
+
+    @classmethod
+    def from_transform(cls, tracker_node, script=None):
+        """
+        Builds a TrackTable of the tracker's solved transform alone, for the bakes that copy it as it is.
+        No track curve is parsed: the names, enabled flags and frames come from the cached track_index(),
+        and the table has no curve columns.
+
+        Args:
+            tracker_node (nuke.Node): The Tracker4 node.
+            script (str, optional): The 'tracks' script, if it was already read.
+
+        Returns:
+            TrackTable: The table, with the 'transform' read and 'values' of shape (tracks, 0, frames).
+        """
+
+        index = track_index(tracker_node, script)
+
+        tracked = index.key_ranges[~np.isnan(index.key_ranges[:, 0])]
+        if len(tracked):
+            frames = np.arange(int(np.floor(tracked[:, 0].min())), int(np.ceil(tracked[:, 1].max())) + 1,
+                               dtype=np.int64)
+        else:
+            frames = np.zeros(0, dtype=np.int64)
+
+        shape = (len(index), 0, len(frames))
+        flags = dict((column, np.full(len(index), np.nan)) for column in FLAG_COLUMNS)
+        flags['enable'] = index.enabled.astype(np.float64)
+
+        table = cls(index.names, (), frames, np.zeros(shape), np.zeros(shape, dtype=bool), flags,
+                    script=script or '')
+        table.read_transform(tracker_node)
+        return table
+
+    def read_transform(self, tracker_node):
+        """
+        (Re)reads the tracker's solved 'translate', 'rotate', 'scale' and 'center' knobs.
+        """
+
+        for knob in TRANSFORM_KNOBS:
+            self.transform[knob] = read_channels(tracker_node[knob].toScript())
+            count('knob.toScript')
+
+    def frame_index(self, frame):
+        """ Returns the position of a frame on the frame axis, clamped to the table range. """
+
+        if not len(self.frames):
+            raise IndexError('TrackTable has no keyed frames.')
+        return int(np.clip(int(round(frame)) - self.frames[0], 0, len(self.frames) - 1))
+
+    def column(self, name):
+        """ Returns a (tracks, frames) view of a curve column. """
+
+        return self.values[:, self.column_index[name]]
+
+    def value_at(self, frame, column, tracks=None):
+        """
+        Returns the value of a column at a frame, for every track or for the given track indices.
+        """
+
+        values = self.values[:, self.column_index[column], self.frame_index(frame)]
+        if tracks is not None:
+            values = values[list(tracks)]
+        return values
+
+    def key_curve(self, track, column):
+        """
+        Returns the keys of one track column.
+
+        Args:
+            track (int or str): The track index or name.
+            column (str): The column name, like 'track_x'.
+
+        Returns:
+            tuple: (frames, values) arrays with only the keyed frames.
+        """
+
+        if not isinstance(track, int):
+            track = self.name_index[track]
+
+        col = self.column_index[column]
+        mask = self.keys[track, col]
+        return self.frames[mask], self.values[track, col, mask]
+
+
+_FRAME_RE = re.compile(r'\sx(-?[\d.]+)')
+
+# Like _TOKEN_RE, but only the start of a curve is matched, its body is skipped with str.find().
+_INDEX_TOKEN_RE = re.compile(r'\{curve|[{}]|"(?:[^"\\]|\\.)*"|[^\s{}"]+')
+
+# Everything a run of plain key values is made of.
+_VALUE_CHARS = b'0123456789.-+e '
+
+
+def curve_key_range(text):
+    """
+    Returns the first and last key frames of a curve script without converting its values:
+    only the frame markers are read, and the values after the last marker are counted.
+
+    Args:
+        text (str): The curve script, like '{curve x1 10 11 x5 12}'.
+
+    Returns:
+        tuple: (first, last) frames as floats, or None if the curve has no keys.
+    """
+
+    body = text.find('curve') + 5
+    first = last = _FRAME_RE.search(text, body)
+
+    position = text.rfind(' x')
+    if first is not None and position > first.start():
+        last = _FRAME_RE.match(text, position)
+
+    # Without a frame marker the keys start at frame 1.
+    frame = float(last.group(1)) if last else 1.0
+    count = _count_values(text, last.end() if last else body)
+    if not count:
+        return None
+
+    return (float(first.group(1)) if first else 1.0), frame + count - 1
+
+
+def _count_values(text, position):
+    """ Counts the key values of a curve script from a position to its end, skipping flags. """
+
+    tail = text[position:len(text.rstrip('} \n\t'))]
+
+    # Nuke writes plain values with single spaces: each value is preceded by exactly one.
+    if not tail.encode('ascii', 'replace').translate(None, _VALUE_CHARS) and '  ' not in tail:
+        return tail.count(' ')
+
+    return sum(1 for tok in tail.split() if not tok[0].isalpha())
+
+
+def _scan_script(text):
+    """
+    Parses a knob script into nested lists like parse_script(), but curve bodies are never tokenized:
+    each curve is jumped over and kept as its script string.
+    """
+
+    root = []
+    stack = [root]
+    position = 0
+    search = _INDEX_TOKEN_RE.search
+
+    while True:
+        match = search(text, position)
+        if match is None:
+            return root
+
+        tok = match.group(0)
+        position = match.end()
+
+        if tok == '{curve':
+            end = text.find('}', position)
+            position = len(text) if end < 0 else end + 1
+            stack[-1].append(text[match.start():position])
+        elif tok == '{':
+            group = []
+            stack[-1].append(group)
+            stack.append(group)
+        elif tok == '}':
+            if len(stack) > 1:
+                stack.pop()
+        elif tok[0] == '"':
+            stack[-1].append(tok[1:-1])
+        else:
+            stack[-1].append(tok)
+
+
+class TrackIndex(object):
+    """
+    Light metadata of a Tracker4 'tracks' knob, read without converting any curve value.
+
+    Attributes:
+        names (list): The track names, in track order.
+        enabled (np.ndarray): Bool per track, whether the track is enabled.
+        key_ranges (np.ndarray): (tracks, 2) first and last keyed frame of each track's position, nan if not tracked.
+        state (int): Hash of the 'tracks' script the index was built from.
+    """
+
+    def __init__(self, names, enabled, key_ranges, state=None):
+        self.names = list(names)
+        self.enabled = enabled
+        self.key_ranges = key_ranges
+        self.state = state
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_script(cls, script):
+        """
+        Builds the index of a 'tracks' script. The tokenizer jumps over curve bodies,
+        and only their frame markers are read.
+
+        Args:
+            script (str): The output of tracker_node['tracks'].toScript().
+
+        Returns:
+            TrackIndex: The index.
+        """
+
+        items = _scan_script(script)
+        while len(items) == 1 and isinstance(items[0], list):
+            items = items[0]
+
+        if len(items) < 3 or not isinstance(items[1], list) or not isinstance(items[2], list):
+            # No readable table, the quoted track names are the best there is.
+            names = re.findall(r'"([^"]+)"', script)
+            return cls(names, np.ones(len(names), dtype=bool), np.full((len(names), 2), np.nan), hash(script))
+
+        layout = _column_names(items[1]) or list(TRACK_COLUMNS)
+        position = dict((name, index) for index, name in enumerate(layout))
+        rows = [row for row in items[2] if isinstance(row, list)]
+
+        def cell(row, column):
+            col = position.get(column, len(row))
+            return row[col] if col < len(row) else None
+
+        names = []
+        enabled = []
+        key_ranges = []
+        for row in rows:
+            names.append(str(cell(row, 'name')))
+            enabled.append(_cell_value(cell(row, 'enable')) > 0)
+
+            first, last = np.nan, np.nan
+            for column in ('track_x', 'track_y'):
+                value = cell(row, column)
+                key_range = curve_key_range(value) if is_curve(value) else None
+                if key_range:
+                    first = min(first, key_range[0]) if first == first else key_range[0]
+                    last = max(last, key_range[1]) if last == last else key_range[1]
+            key_ranges.append((first, last))
+
+        return cls(names, np.array(enabled, dtype=bool), np.array(key_ranges, dtype=np.float64).reshape(-1, 2),
+                   hash(script))
+
+    @classmethod
+    def from_table(cls, table):
+        """ Builds the index of an already extracted TrackTable, for free. """
+
+        enabled = table.flags['enable'] > 0
+        key_ranges = np.full((len(table), 2), np.nan)
+
+        position = [table.column_index[column] for column in ('track_x', 'track_y') if column in table.column_index]
+        if position and len(table.frames):
+            keyed = table.keys[:, position].any(1)
+            tracked = keyed.any(1)
+            key_ranges[tracked, 0] = table.frames[keyed[tracked].argmax(1)]
+            key_ranges[tracked, 1] = table.frames[len(table.frames) - 1 - keyed[tracked, ::-1].argmax(1)]
+
+        return cls(table.names, enabled, key_ranges, hash(table.script))
+
+
+# Track indices by node name, dropped when their node's 'tracks' knob changes.
+_TRACK_INDICES = {}
+
+# Whether track_index() caches the indices, see enable_index_cache().
+_CACHE_INDICES = False
+
+
+def enable_index_cache(enabled=True):
+    """
+    Turns the cache of track_index() on or off, it's off by default.
+    A cached index is only as fresh as the callbacks calling invalidate_track_index(), so MotionBakery turns
+    the cache on in GUI sessions only: Nuke doesn't run the knobChanged callbacks in terminal sessions,
+    like the command line and farm workers, and a cache there could keep the tracks of an older state.
+    Even in the GUI, Nuke doesn't reliably run them on undo: an undone tracking keeps its index
+    until the tracks change again, or the script is reloaded.
+
+    Args:
+        enabled (bool, optional): Cache the indices. Defaults to True.
+    """
+
+    global _CACHE_INDICES
+    _CACHE_INDICES = enabled
+    _TRACK_INDICES.clear()
+
+
+def track_index(tracker_node, script=None):
+    """
+    Returns the TrackIndex of a Tracker4 node. With the cache on, it's cached until invalidate_track_index() is
+    called for the node, which MotionBakery does from a knobChanged callback, so a cached index costs no toScript()
+    call. With the cache off, see enable_index_cache(), it's built from the node's tracks on every call.
+
+    Args:
+        tracker_node (nuke.Node): The Tracker4 node.
+        script (str, optional): The node's current 'tracks' script, if it was already read.
+            The cached index is kept if it was built from the same script.
+
+    Returns:
+        TrackIndex: The index.
+    """
+
+    if not _CACHE_INDICES:
+        if script is None:
+            script = tracker_node['tracks'].toScript()
+            count('knob.toScript')
+        return TrackIndex.from_script(script)
+
+    key = tracker_node.fullName()
+    index = _TRACK_INDICES.get(key)
+
+    if script is None:
+        if index is not None:
+            return index
+        script = tracker_node['tracks'].toScript()
+        count('knob.toScript')
+
+    if index is None or index.state != hash(script):
+        index = TrackIndex.from_script(script)
+        _TRACK_INDICES[key] = index
+
+    return index
+
+
+def store_track_index(tracker_node, table):
+    """ Caches the index of a TrackTable just read from a node, unless an index of the same script is cached. """
+
+    if not _CACHE_INDICES:
+        return
+
+    key = tracker_node.fullName()
+    index = _TRACK_INDICES.get(key)
+    if index is None or index.state != hash(table.script):
+        _TRACK_INDICES[key] = TrackIndex.from_table(table)
+
+
+def invalidate_track_index(tracker_node=None):
+    """ Drops the cached index of a node, or of every node if None. """
+
+    if tracker_node is None:
+        _TRACK_INDICES.clear()
+    else:
+        _TRACK_INDICES.pop(tracker_node.fullName(), None)
@@ -0,0 +1,201 @@
+"""
+Headless benchmarks for MotionBakery.
+
+Runs bakery() and bake_selection() in every mode, and with lists of modes, against the pure-Python nuke stand-in,
+on synthetic Tracker4 nodes, and reports wall time, nuke API call counts and peak memory.
+A list of modes is named like '[matchmove,cpin]'.
+
+    python benchmarks/bench_bakery.py                        # standard sizes, prints a table
+    python benchmarks/bench_bakery.py --sizes quick --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_bakery.py --sizes quick --compare benchmarks/baseline.json
+
+With --compare, the exit code is 1 when any run makes more API calls than the baseline,
+or is slower than the baseline by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'standin'))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import nuke  # noqa: E402  the stand-in
+import MotionBakery  # noqa: E402
+import synthetic  # noqa: E402
+
+
+MODES = ('matchmove', 'stabilize', 'roto', 'cpin', 'homography', 'per_track', 'all', ('matchmove',),
+         ('matchmove', 'cpin'))
+ENTRY_POINTS = ('bakery', 'bake_selection')
+
+# (tracks, frames)
+SIZES = {
+    'quick': [(4, 100), (50, 1000), (200, 3000)],
+    'standard': [(4, 100), (50, 1000), (200, 3000), (1000, 1000), (100, 10000)],
+    'full': [(4, 100), (50, 1000), (200, 3000), (1000, 1000), (100, 10000), (1000, 10000)],
+}
+
+
+def mode_name(mode):
+    """ Returns the name of a mode in the results, '[matchmove,cpin]' for a list of modes. """
+
+    if isinstance(mode, (list, tuple)):
+        return '[{}]'.format(','.join(mode))
+    return mode
+
+
+def run_once(tracker, entry, mode):
+    if isinstance(mode, tuple):
+        mode = list(mode)
+
+    if entry == 'bake_selection':
+        tracker.setSelected(True)
+        MotionBakery.bake_selection(mode=mode)
+    else:
+        MotionBakery.bakery(tracker, mode=mode)
+
+
+def clean(tracker):
+    """ Removes every node but the tracker, and resets its marks. """
+
+    for node in nuke.allNodes():
+        if node is not tracker:
+            nuke.delete(node)
+
+    tracker.setSelected(False)
+    synthetic.reset_marks(tracker)
+
+
+def bench(n_tracks, n_frames, entry, mode, tracker, memory=True):
+    clean(tracker)
+    nuke.reset_calls()
+
+    start = time.perf_counter()
+    run_once(tracker, entry, mode)
+    wall = time.perf_counter() - start
+
+    result = {
+        'tracks': n_tracks,
+        'frames': n_frames,
+        'entry': entry,
+        'mode': mode_name(mode),
+        'wall': round(wall, 4),
+        'calls': nuke.total_calls(),
+        'knob_changed': nuke.CALLS['knobChanged'],
+        'top_calls': dict(nuke.CALLS.most_common(5)),
+    }
+
+    if memory:
+        clean(tracker)
+        tracemalloc.start()
+        run_once(tracker, entry, mode)
+        result['peak_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return result
+
+
+def key(result):
+    return '{entry}/{mode}/{tracks}x{frames}'.format(**result)
+
+
+def run(sizes, modes=MODES, entries=ENTRY_POINTS, memory=True, log=print):
+    results = []
+    for n_tracks, n_frames in sizes:
+        nuke.clear()
+        tracker = synthetic.make_tracker(n_tracks, n_frames)
+
+        # Untimed warm-up, so the one-off setup of the tracker (color group, label) isn't counted in any run.
+        MotionBakery.bakery(tracker, mode='cpin')
+
+        for entry in entries:
+            for mode in modes:
+                result = bench(n_tracks, n_frames, entry, mode, tracker, memory)
+                results.append(result)
+                log('{:<40} {:>9.3f}s {:>9} calls {:>7} knobChanged {:>10} KB'.format(
+                    key(result), result['wall'], result['calls'], result['knob_changed'],
+                    result.get('peak_kb', '-')))
+
+    return results
+
+
+def compare(results, baseline, threshold, slack=0.05):
+    """
+    Returns the runs that regressed against a baseline: more API calls, or slower than
+    baseline * threshold + slack seconds.
+    """
+
+    previous = dict((key(result), result) for result in baseline['results'])
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+
+        reasons = []
+        if result['calls'] > old['calls']:
+            reasons.append('calls {} -> {}'.format(old['calls'], result['calls']))
+        if result['wall'] > old['wall'] * threshold + slack:
+            reasons.append('wall {:.3f}s -> {:.3f}s'.format(old['wall'], result['wall']))
+
+        if reasons:
+            regressions.append((key(result), reasons))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', choices=sorted(SIZES), default='standard')
+    parser.add_argument('--modes', nargs='+', choices=[mode_name(mode) for mode in MODES],
+                        default=[mode_name(mode) for mode in MODES])
+    parser.add_argument('--entries', nargs='+', choices=ENTRY_POINTS, default=list(ENTRY_POINTS))
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory pass')
+    parser.add_argument('--output', help='write all the results to this JSON file')
+    parser.add_argument('--save-baseline', metavar='JSON', help='save the results as the new baseline')
+    parser.add_argument('--compare', metavar='JSON', help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='slowdown factor flagged as a regression (default 1.5)')
+    args = parser.parse_args(argv)
+
+    modes = [mode for mode in MODES if mode_name(mode) in args.modes]
+    results = run(SIZES[args.sizes], modes, args.entries, not args.no_memory)
+
+    report = {
+        'meta': {
+            'version': MotionBakery.__version__,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'sizes': args.sizes,
+        },
+        'results': results,
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        for name, reasons in regressions:
+            print('REGRESSION {}: {}'.format(name, ', '.join(reasons)))
+
+        if regressions:
+            return 1
+        print('No regressions against {}'.format(args.compare))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
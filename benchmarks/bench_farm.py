@@ -0,0 +1,75 @@
+"""
+Farm batch baking with MotionBakery_cli, against the nuke stand-in.
+
+Writes a few synthetic stand-in scripts, each with some Tracker4 nodes, then bakes them all
+with the command line tool, once per worker count, and reports the wall time of each run.
+With several modes, the first one is also baked alone, the single mode path of the batches.
+
+    python benchmarks/bench_farm.py
+    python benchmarks/bench_farm.py --scripts 16 --trackers 4 --workers 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STANDIN = os.path.join(HERE, 'standin')
+sys.path.insert(0, STANDIN)
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import nuke  # noqa: E402  the stand-in
+import MotionBakery_cli  # noqa: E402
+import synthetic  # noqa: E402
+
+
+def write_scripts(folder, n_scripts, n_trackers, n_tracks, n_frames):
+    """ Writes the synthetic stand-in scripts, returns their paths. """
+
+    paths = []
+    for index in range(n_scripts):
+        nuke.clear()
+        for tracker in range(n_trackers):
+            synthetic.make_tracker(n_tracks, n_frames, seed=index * n_trackers + tracker)
+
+        path = os.path.join(folder, 'shot{:03d}.nk'.format(index + 1))
+        nuke.scriptSaveAs(path)
+        paths.append(path)
+
+    nuke.clear()
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scripts', type=int, default=8)
+    parser.add_argument('--trackers', type=int, default=2, help='Tracker4 nodes per script')
+    parser.add_argument('--tracks', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--modes', nargs='+', default=['matchmove', 'cpin'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    folder = tempfile.mkdtemp(prefix='motionbakery_farm_')
+    write_scripts(folder, args.scripts, args.trackers, args.tracks, args.frames)
+
+    runs = [args.modes[:1], args.modes] if len(args.modes) > 1 else [args.modes]
+    failed = False
+    for modes in runs:
+        for workers in args.workers:
+            start = time.perf_counter()
+            code = MotionBakery_cli.main([os.path.join(folder, 'shot*.nk'), '--nuke-path', STANDIN, '--workers',
+                                          str(workers), '--output-dir', os.path.join(folder, 'baked'), '--modes']
+                                         + modes)
+            failed = failed or code != 0
+            print('{} - {} workers: {:.2f}s{}'.format(' '.join(modes), workers, time.perf_counter() - start,
+                                                      '' if code == 0 else ' (FAILED)'))
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
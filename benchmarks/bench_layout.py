@@ -0,0 +1,89 @@
+"""
+DAG placement of baked nodes in a big script, against the nuke stand-in.
+
+Fills a script with filler nodes and some Tracker4 nodes, creates a few nodes per Tracker,
+then places them once with nuke.autoplace() per node and once with the one-pass MotionBakery_layout,
+and reports the wall time and the overlapping nodes of each.
+
+    python benchmarks/bench_layout.py
+    python benchmarks/bench_layout.py --nodes 20000 --trackers 100 --per-tracker 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'standin'))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import nuke  # noqa: E402  the stand-in
+import MotionBakery_layout  # noqa: E402
+
+
+def make_script(n_nodes, n_trackers, per_tracker, seed=0):
+    """ Creates the filler nodes and the trackers, returns the (tracker, new nodes) rows. """
+
+    nuke.clear()
+    rng = random.Random(seed)
+    width = int((n_nodes * 2000) ** 0.5)
+
+    for index in range(n_nodes):
+        node = nuke.nodes.Transform()
+        node.setXYpos(rng.randrange(0, width), rng.randrange(0, width // 2))
+
+    rows = []
+    for index in range(n_trackers):
+        tracker = nuke.nodes.Tracker4()
+        tracker.setXYpos(rng.randrange(0, width), rng.randrange(0, width // 2))
+        nodes = []
+        for _ in range(per_tracker):
+            node = nuke.nodes.Transform()
+            node.setXYpos(tracker.xpos() + 160, tracker.ypos() + 40)
+            nodes.append(node)
+        rows.append((tracker, nodes))
+
+    return rows
+
+
+def overlaps(rows):
+    """ Returns how many new nodes overlap another node. """
+
+    boxes = [(node, node.xpos(), node.ypos(), node.xpos() + node.screenWidth(), node.ypos() + node.screenHeight())
+             for node in nuke.allNodes()]
+    found = 0
+    for tracker, nodes in rows:
+        for node in nodes:
+            left, top = node.xpos(), node.ypos()
+            right, bottom = left + node.screenWidth(), top + node.screenHeight()
+            found += any(other is not node and left < box_right and box_left < right and top < box_bottom
+                         and box_top < bottom for other, box_left, box_top, box_right, box_bottom in boxes)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=10000, help='filler nodes in the script')
+    parser.add_argument('--trackers', type=int, default=50)
+    parser.add_argument('--per-tracker', type=int, default=3, help='new nodes per Tracker')
+    args = parser.parse_args(argv)
+
+    rows = make_script(args.nodes, args.trackers, args.per_tracker)
+    start = time.perf_counter()
+    for tracker, nodes in rows:
+        for node in nodes:
+            nuke.autoplace(node)
+    print('autoplace: {:.3f}s, {} overlapping'.format(time.perf_counter() - start, overlaps(rows)))
+
+    rows = make_script(args.nodes, args.trackers, args.per_tracker)
+    start = time.perf_counter()
+    MotionBakery_layout.place_rows(rows, nuke.root())
+    print('layout:    {:.3f}s, {} overlapping'.format(time.perf_counter() - start, overlaps(rows)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
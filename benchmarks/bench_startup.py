@@ -0,0 +1,62 @@
+"""
+Startup cost of MotionBakery's menu.py, against the nuke stand-in.
+
+Each case runs in a fresh interpreter, so nothing is cached between runs. 'menu.py' is what Nuke runs at
+startup now. 'eager engine import' is what it paid before the lazy registration, when menu.py imported
+MotionBakery, NumPy and nuke.rotopaint at launch.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+CASES = (
+    ('menu.py', "exec(open('menu.py').read())"),
+    ('eager engine import', "import MotionBakery; exec(open('menu.py').read())"),
+    ('first bake command', "exec(open('menu.py').read()); import MotionBakery_menu; MotionBakery_menu.engine()"),
+)
+
+# The stand-in nuke module is imported before the clock starts, Nuke itself is already loaded at startup.
+TEMPLATE = """
+import sys, time
+sys.path[:0] = [{standin!r}, {root!r}]
+import nuke
+start = time.perf_counter()
+{code}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure(code, runs):
+    """ Returns the run times, in milliseconds, of code in fresh interpreters. """
+
+    script = TEMPLATE.format(standin=os.path.join(HERE, 'standin'), root=ROOT, code=code)
+    times = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT)
+        times.append(float(output.decode().split()[-1]))
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters per case (default 10)')
+    args = parser.parse_args(argv)
+
+    for name, code in CASES:
+        times = measure(code, args.runs)
+        print('{:<24} median {:>8.2f} ms   min {:>8.2f} ms'.format(name, statistics.median(times), min(times)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Stand-in for _curvelib: just enough of AnimCurve to hold keys or an expression.
+"""
+
+import bisect
+
+from nuke import CALLS, api
+
+kConstantInterpolation = 0
+kLinearInterpolation = 1
+kSmoothInterpolation = 2
+
+
+class AnimCurveKey(object):
+
+    def __init__(self, time, value):
+        self.time = float(time)
+        self.value = float(value)
+        self.interpolationType = 0
+
+
+class AnimCurve(object):
+
+    def __init__(self, *args):
+        CALLS['AnimCurve'] += 1
+        self.expressionString = 'curve'
+        self.useExpression = False
+        self._times = []
+        self._values = []
+
+    @api
+    def addKey(self, time, value=None, *args):
+        if isinstance(time, AnimCurveKey):
+            time, value = time.time, time.value
+        time = float(time)
+        i = bisect.bisect_left(self._times, time)
+        if i < len(self._times) and self._times[i] == time:
+            self._values[i] = float(value)
+        else:
+            self._times.insert(i, time)
+            self._values.insert(i, float(value))
+
+    @api
+    def getNumberOfKeys(self):
+        return len(self._times)
+
+    @api
+    def getKey(self, index):
+        return AnimCurveKey(self._times[index], self._values[index])
+
+    @api
+    def removeAllKeys(self):
+        self._times = []
+        self._values = []
+
+    @api
+    def evaluate(self, time):
+        if not self._times:
+            return 0.0
+        if time <= self._times[0]:
+            return self._values[0]
+        if time >= self._times[-1]:
+            return self._values[-1]
+        i = bisect.bisect_right(self._times, time)
+        t0, t1 = self._times[i - 1], self._times[i]
+        v0, v1 = self._values[i - 1], self._values[i]
+        return v0 + (v1 - v0) * (time - t0) / (t1 - t0)
+
+    @api
+    def constantValue(self):
+        return self._values[0] if self._times else 0.0
@@ -0,0 +1,1504 @@
+"""
+Pure-Python stand-in for the parts of the nuke API used by MotionBakery.
+
+It only models what the bake code touches: nodes with knobs, animated channels with keys,
+the Tracker4 'tracks' table and a few module level helpers. Every public API call is counted
+in CALLS, so benchmarks can report how much knob traffic a bake generates.
+It is not a renderer, expressions are stored but never evaluated.
+"""
+
+import bisect
+from array import array
+import collections
+import functools
+import pickle
+import re
+
+
+CALLS = collections.Counter()
+
+# Interactive session, so menu.py registers its commands.
+GUI = True
+
+STARTLINE = 0x1000
+INVISIBLE = 0x400
+DISABLED = 0x80
+NO_ANIMATION = 0x100
+ENDLINE = 0x2000
+TABBEGINGROUP = 0x01
+TABENDGROUP = 0x02
+
+_state = {
+    'frame': 1,
+    'first_frame': 1,
+    'last_frame': 100,
+    'fps': 24.0,
+    'messages': [],
+    'script': None,
+}
+
+_nodes = []
+_by_name = {}
+_context = []
+
+
+def api(func):
+    """ Counts a call to a stand-in API function under its qualified name. """
+
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        CALLS[name] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def reset_calls():
+    CALLS.clear()
+
+
+def total_calls():
+    return sum(CALLS.values())
+
+
+# ---------------------------------------------------------------------------------------------
+# Curves
+
+
+class _Curve(object):
+    """ A channel's keys, kept sorted by frame. Evaluated linearly between keys. """
+
+    def __init__(self):
+        self.frames = []
+        self.values = []
+        self.expression = None
+        self.interpolation = None
+
+    def set(self, frame, value):
+        frame = float(frame)
+        i = bisect.bisect_left(self.frames, frame)
+        if i < len(self.frames) and self.frames[i] == frame:
+            self.values[i] = float(value)
+        else:
+            self.frames.insert(i, frame)
+            self.values.insert(i, float(value))
+
+    def value_at(self, frame):
+        if not self.frames:
+            return 0.0
+        if frame <= self.frames[0]:
+            return self.values[0]
+        if frame >= self.frames[-1]:
+            return self.values[-1]
+        i = bisect.bisect_right(self.frames, frame)
+        f0, f1 = self.frames[i - 1], self.frames[i]
+        v0, v1 = self.values[i - 1], self.values[i]
+        return v0 + (v1 - v0) * (frame - f0) / (f1 - f0)
+
+    def to_script(self):
+        parts = ['curve'] + ([self.interpolation] if self.interpolation else [])
+        count = len(self.frames)
+        if count and self.frames[-1] - self.frames[0] == count - 1:
+            # Keys on consecutive frames, Nuke's compact form.
+            parts.append('x{:g}'.format(self.frames[0]))
+            parts.extend(map(repr, self.values))
+            return '{' + ' '.join(parts) + '}'
+
+        expected = None
+        for frame, value in zip(self.frames, self.values):
+            if frame != expected:
+                parts.append('x{:g}'.format(frame))
+            parts.append(repr(value))
+            expected = frame + 1
+        return '{' + ' '.join(parts) + '}'
+
+    @classmethod
+    def from_script(cls, text):
+        curve = cls()
+        body = text.strip()[1:-1].split()
+        if not body or body[0] != 'curve':
+            curve.expression = text.strip()[1:-1]
+            return curve
+        body = body[1:]
+        if body and len(body[0]) == 1 and body[0].isalpha() and body[0] != 'x':
+            curve.interpolation = body[0]
+            body = body[1:]
+
+        if body and body[0][0] == 'x' and not any(tok[0].isalpha() for tok in body[1:]):
+            start = float(body[0][1:])
+            curve.values = array('d', map(float, body[1:]))
+            curve.frames = array('d', [start + i for i in range(len(curve.values))])
+            return curve
+
+        frame = 1.0
+        for tok in body:
+            if tok[0] == 'x':
+                frame = float(tok[1:])
+            elif tok[0].isalpha():
+                continue
+            else:
+                curve.frames.append(frame)
+                curve.values.append(float(tok))
+                frame += 1.0
+        return curve
+
+
+class AnimationKey(object):
+
+    def __init__(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+
+
+class AnimationCurve(object):
+
+    def __init__(self, knob=None, index=0, view=None, curve=None):
+        self._knob = knob
+        self._index = index
+        self._curve = curve if curve is not None else _Curve()
+
+    @api
+    def keys(self):
+        return [AnimationKey(f, v) for f, v in zip(self._curve.frames, self._curve.values)]
+
+    @api
+    def addKey(self, keys):
+        if isinstance(keys, AnimationKey):
+            keys = [keys]
+        for key in keys:
+            self._curve.set(key.x, key.y)
+
+    @api
+    def clear(self):
+        self._curve.frames = []
+        self._curve.values = []
+
+    @api
+    def evaluate(self, t):
+        return self._curve.value_at(t)
+
+    @api
+    def setExpression(self, expression):
+        self._curve.expression = expression
+
+    @api
+    def expression(self):
+        return self._curve.expression or 'curve'
+
+    @api
+    def knobIndex(self):
+        return self._index
+
+
+# ---------------------------------------------------------------------------------------------
+# Script parsing, a tiny subset of the Tcl-like format knobs are saved with.
+
+_TOKEN_RE = re.compile(r'\{curve[^{}]*\}|[{}]|"(?:[^"\\]|\\.)*"|[^\s{}"]+')
+
+
+def _parse(text):
+    root = []
+    stack = [root]
+    for match in _TOKEN_RE.finditer(text):
+        tok = match.group(0)
+        if tok == '{':
+            group = []
+            stack[-1].append(group)
+            stack.append(group)
+        elif tok == '}':
+            if len(stack) > 1:
+                stack.pop()
+        elif tok[0] == '"':
+            stack[-1].append(tok[1:-1])
+        else:
+            stack[-1].append(tok)
+    return root
+
+
+def _quote(text):
+    return '"{}"'.format(str(text).replace('"', '\\"'))
+
+
+# ---------------------------------------------------------------------------------------------
+# Knobs
+
+
+class Knob(object):
+
+    def __init__(self, name, label=None, *args):
+        self._name = name
+        self._label = label if label is not None else name
+        self._flags = 0
+        self._visible = True
+        self._enabled = True
+        self.node = None
+
+    @api
+    def name(self):
+        return self._name
+
+    @api
+    def label(self):
+        return self._label
+
+    @api
+    def setFlag(self, flag):
+        self._flags |= flag
+
+    @api
+    def clearFlag(self, flag):
+        self._flags &= ~flag
+
+    @api
+    def getFlag(self, flag):
+        return bool(self._flags & flag)
+
+    @api
+    def setVisible(self, visible):
+        self._visible = bool(visible)
+
+    @api
+    def setEnabled(self, enabled):
+        self._enabled = bool(enabled)
+
+    @api
+    def setTooltip(self, text):
+        pass
+
+    @api
+    def isAnimated(self, *args):
+        return False
+
+    @api
+    def hasExpression(self, *args):
+        return False
+
+    @api
+    def toScript(self, *args):
+        return ''
+
+    @api
+    def fromScript(self, text):
+        pass
+
+    def _reset(self):
+        pass
+
+
+class Tab_Knob(Knob):
+    pass
+
+
+class Text_Knob(Knob):
+
+    def __init__(self, name, label=None, text=''):
+        Knob.__init__(self, name, label)
+        self._text = text
+
+    @api
+    def value(self):
+        return self._text
+
+    @api
+    def setValue(self, text):
+        self._text = text
+
+
+class PyScript_Knob(Knob):
+
+    def __init__(self, name, label=None, command=''):
+        Knob.__init__(self, name, label)
+        self._command = command
+
+    @api
+    def value(self):
+        return self._command
+
+    @api
+    def setValue(self, command):
+        self._command = command
+
+    @api
+    def execute(self):
+        _context.append(self.node)
+        try:
+            exec(self._command, {'nuke': _module()})
+        finally:
+            _context.pop()
+
+
+class String_Knob(Knob):
+
+    def __init__(self, name, label=None, value=''):
+        Knob.__init__(self, name, label)
+        self._value = str(value)
+        self._default = self._value
+
+    @api
+    def value(self):
+        return self._value
+
+    @api
+    def getValue(self):
+        return self._value
+
+    @api
+    def getText(self):
+        return self._value
+
+    @api
+    def setValue(self, value):
+        self._value = str(value)
+        _knob_changed(self)
+
+    @api
+    def toScript(self, *args):
+        return _quote(self._value)
+
+    @api
+    def fromScript(self, text):
+        items = _parse(text)
+        self._value = str(items[0]) if items else ''
+
+    def _reset(self):
+        self._value = self._default
+
+
+class Multiline_Eval_String_Knob(String_Knob):
+    pass
+
+
+class File_Knob(String_Knob):
+    pass
+
+
+class Enumeration_Knob(Knob):
+
+    def __init__(self, name, label=None, values=()):
+        Knob.__init__(self, name, label)
+        self._values = list(values)
+        self._index = 0
+
+    @api
+    def values(self):
+        return list(self._values)
+
+    @api
+    def value(self):
+        return self._values[self._index] if self._values else ''
+
+    @api
+    def getValue(self):
+        return float(self._index)
+
+    @api
+    def enumName(self, index):
+        return self._values[int(index)]
+
+    @api
+    def setValue(self, value):
+        if isinstance(value, str):
+            if value in self._values:
+                self._index = self._values.index(value)
+        else:
+            self._index = int(value)
+        _knob_changed(self)
+
+    @api
+    def toScript(self, *args):
+        return self.value()
+
+    def _reset(self):
+        self._index = 0
+
+
+class Array_Knob(Knob):
+    """ A knob with a fixed number of float channels, each one constant or animated. """
+
+    def __init__(self, name, label=None, channels=1, default=0.0):
+        Knob.__init__(self, name, label)
+        if not isinstance(default, (list, tuple)):
+            default = [default] * channels
+        self._default = [float(v) for v in default]
+        self._values = list(self._default)
+        self._curves = [None] * channels
+
+    def _chan(self, chan):
+        return 0 if chan is None or chan < 0 else chan
+
+    def _value(self, chan, frame):
+        curve = self._curves[chan]
+        if curve is not None and curve.frames:
+            return curve.value_at(frame)
+        return self._values[chan]
+
+    @api
+    def arraySize(self):
+        return len(self._values)
+
+    @api
+    def value(self, chan=None, *args):
+        if chan is None and len(self._values) > 1:
+            return [self._value(i, _state['frame']) for i in range(len(self._values))]
+        return self._value(self._chan(chan), _state['frame'])
+
+    @api
+    def getValue(self, chan=None, *args):
+        if chan is None and len(self._values) > 1:
+            return [self._value(i, _state['frame']) for i in range(len(self._values))]
+        return self._value(self._chan(chan), _state['frame'])
+
+    @api
+    def getValueAt(self, frame, chan=None, *args):
+        return self._value(self._chan(chan), frame)
+
+    @api
+    def setValue(self, value, chan=None, *args):
+        if chan is None and isinstance(value, (list, tuple)):
+            for i, v in enumerate(value[:len(self._values)]):
+                self._set(v, i)
+        elif chan is None:
+            for i in range(len(self._values)):
+                self._set(value, i)
+        else:
+            self._set(value, chan)
+        _knob_changed(self)
+        return True
+
+    def _set(self, value, chan):
+        curve = self._curves[chan]
+        if curve is not None:
+            curve.set(_state['frame'], value)
+        else:
+            self._values[chan] = float(value)
+
+    @api
+    def setValueAt(self, value, frame, chan=None, *args):
+        chan = self._chan(chan)
+        if self._curves[chan] is None:
+            self._curves[chan] = _Curve()
+        self._curves[chan].set(frame, value)
+        _knob_changed(self)
+        return True
+
+    @api
+    def setAnimated(self, chan=None, *args):
+        channels = range(len(self._values)) if chan is None or chan < 0 else [chan]
+        for i in channels:
+            if self._curves[i] is None:
+                self._curves[i] = _Curve()
+        return True
+
+    @api
+    def clearAnimated(self, chan=None, *args):
+        channels = range(len(self._values)) if chan is None or chan < 0 else [chan]
+        for i in channels:
+            self._curves[i] = None
+        return True
+
+    @api
+    def isAnimated(self, chan=None, *args):
+        if chan is None or chan < 0:
+            return any(curve is not None for curve in self._curves)
+        return self._curves[chan] is not None
+
+    @api
+    def hasExpression(self, chan=None, *args):
+        if chan is None or chan < 0:
+            return any(curve is not None and curve.expression for curve in self._curves)
+        return bool(self._curves[chan] is not None and self._curves[chan].expression)
+
+    @api
+    def setExpression(self, expression, chan=None, *args):
+        channels = range(len(self._values)) if chan is None or chan < 0 else [chan]
+        for i in channels:
+            if self._curves[i] is None:
+                self._curves[i] = _Curve()
+            self._curves[i].expression = expression
+        return True
+
+    @api
+    def getNumKeys(self, chan=None, *args):
+        curve = self._curves[self._chan(chan)]
+        return len(curve.frames) if curve is not None else 0
+
+    @api
+    def getKeyTime(self, index, chan=None, *args):
+        return self._curves[self._chan(chan)].frames[index]
+
+    @api
+    def animation(self, chan, *args):
+        if self._curves[chan] is None:
+            return None
+        return AnimationCurve(self, chan, curve=self._curves[chan])
+
+    @api
+    def animations(self, *args):
+        return [AnimationCurve(self, i, curve=curve) for i, curve in enumerate(self._curves) if curve is not None]
+
+    @api
+    def copyAnimations(self, curves, *args):
+        for anim in curves:
+            curve = _Curve()
+            curve.frames = list(anim._curve.frames)
+            curve.values = list(anim._curve.values)
+            curve.expression = anim._curve.expression
+            self._curves[anim._index] = curve
+
+    @api
+    def toScript(self, *args):
+        parts = []
+        for value, curve in zip(self._values, self._curves):
+            if curve is None:
+                parts.append(repr(value))
+            elif curve.expression and curve.expression != 'curve' and not curve.frames:
+                parts.append('{' + curve.expression + '}')
+            else:
+                parts.append(curve.to_script())
+        return ' '.join(parts)
+
+    @api
+    def fromScript(self, text):
+        items = _parse(text)
+        while len(items) == 1 and isinstance(items[0], list):
+            items = items[0]
+        if len(items) == 1 and len(self._values) > 1:
+            items = items * len(self._values)
+        for chan, item in enumerate(items[:len(self._values)]):
+            if isinstance(item, str) and item.startswith('{'):
+                expression = self._curves[chan].expression if self._curves[chan] is not None else None
+                self._curves[chan] = _Curve.from_script(item)
+                if expression and not self._curves[chan].expression:
+                    self._curves[chan].expression = expression
+            elif isinstance(item, list):
+                self._curves[chan] = _Curve()
+                self._curves[chan].expression = ' '.join(str(i) for i in item)
+            else:
+                self._curves[chan] = None
+                self._values[chan] = float(item)
+        _knob_changed(self)
+        return True
+
+    def _reset(self):
+        self._values = list(self._default)
+        self._curves = [None] * len(self._values)
+
+
+class Double_Knob(Array_Knob):
+
+    def __init__(self, name, label=None, default=0.0):
+        Array_Knob.__init__(self, name, label, 1, default)
+
+
+class Int_Knob(Array_Knob):
+
+    def __init__(self, name, label=None, default=0):
+        Array_Knob.__init__(self, name, label, 1, default)
+
+    @api
+    def value(self, *args):
+        return int(Array_Knob.value.__wrapped__(self, *args))
+
+    @api
+    def getValue(self, *args):
+        return int(Array_Knob.getValue.__wrapped__(self, *args))
+
+
+class Boolean_Knob(Int_Knob):
+    pass
+
+
+class XY_Knob(Array_Knob):
+
+    def __init__(self, name, label=None, default=(0.0, 0.0)):
+        Array_Knob.__init__(self, name, label, 2, default)
+
+
+class WH_Knob(Array_Knob):
+
+    def __init__(self, name, label=None, default=(1.0, 1.0)):
+        Array_Knob.__init__(self, name, label, 2, default)
+
+
+class Color_Knob(Array_Knob):
+
+    def __init__(self, name, label=None, default=(0.0, 0.0, 0.0)):
+        Array_Knob.__init__(self, name, label, 3, default)
+
+
+class IArray_Knob(Array_Knob):
+    pass
+
+
+class Link_Knob(Knob):
+
+    def __init__(self, name, label=None):
+        Knob.__init__(self, name, label)
+        self._link = ''
+
+    @api
+    def setLink(self, link):
+        self._link = link
+
+    @api
+    def getLink(self):
+        return self._link
+
+
+class Table_Knob(Knob):
+    """
+    The Tracker4 'tracks' knob: a table of rows by a fixed set of columns, addressed by a flat
+    index 'row * columns + column', like Nuke does.
+    """
+
+    COLUMNS = (('enable', 5, 'e'), ('name', 3, 'name'), ('track_x', 2, 'track_x'),
+               ('track_y', 2, 'track_y'), ('offset_x', 2, 'offset_x'), ('offset_y', 2, 'offset_y'),
+               ('T', 4, 'T'), ('R', 4, 'R'), ('S', 4, 'S'), ('error', 2, 'error'),
+               ('error_min', 1, 'error_min'), ('error_max', 1, 'error_max'),
+               ('pattern_x', 1, 'pattern_x'), ('pattern_y', 1, 'pattern_y'),
+               ('pattern_r', 1, 'pattern_r'), ('pattern_t', 1, 'pattern_t'),
+               ('search_x', 1, 'search_x'), ('search_y', 1, 'search_y'),
+               ('search_r', 1, 'search_r'), ('search_t', 1, 'search_t'),
+               ('key_track', 1, 'key_track'), ('key_search_x', 1, 'key_search_x'),
+               ('key_search_y', 1, 'key_search_y'), ('key_search_r', 1, 'key_search_r'),
+               ('key_search_t', 1, 'key_search_t'), ('key_track_x', 1, 'key_track_x'),
+               ('key_track_y', 1, 'key_track_y'), ('key_track_r', 1, 'key_track_r'),
+               ('key_track_t', 1, 'key_track_t'), ('key_centre_offset_x', 1, 'keycentreoffsetX'),
+               ('key_centre_offset_y', 1, 'keycentreoffsetY'))
+
+    def __init__(self, name, label=None):
+        Knob.__init__(self, name, label)
+        self.rows = []
+
+    @property
+    def n_columns(self):
+        return len(self.COLUMNS)
+
+    def add_row(self, cells):
+        """ Appends a track. Cells are floats, strings or _Curve objects, one per column. """
+
+        self.rows.append(list(cells))
+
+    def _cell(self, index):
+        row, col = divmod(int(index), self.n_columns)
+        return row, col
+
+    @api
+    def getValueAt(self, frame, index, *args):
+        row, col = self._cell(index)
+        cell = self.rows[row][col]
+        if isinstance(cell, _Curve):
+            return cell.value_at(frame)
+        return float(cell) if not isinstance(cell, str) else 0.0
+
+    @api
+    def getValue(self, index=0, *args):
+        return self.getValueAt.__wrapped__(self, _state['frame'], index)
+
+    @api
+    def setValue(self, value, index=0, *args):
+        row, col = self._cell(index)
+        cell = self.rows[row][col]
+        if isinstance(cell, _Curve):
+            cell.set(_state['frame'], value)
+        else:
+            self.rows[row][col] = float(value)
+        _knob_changed(self)
+        return True
+
+    @api
+    def setValueAt(self, value, frame, index=0, *args):
+        row, col = self._cell(index)
+        cell = self.rows[row][col]
+        if not isinstance(cell, _Curve):
+            cell = self.rows[row][col] = _Curve()
+        cell.set(frame, value)
+        _knob_changed(self)
+        return True
+
+    @api
+    def getNumKeys(self, index=0, *args):
+        row, col = self._cell(index)
+        cell = self.rows[row][col]
+        return len(cell.frames) if isinstance(cell, _Curve) else 0
+
+    @api
+    def getKeyTime(self, key, index=0, *args):
+        row, col = self._cell(index)
+        return self.rows[row][col].frames[key]
+
+    @api
+    def isAnimated(self, index=None, *args):
+        if index is None:
+            return any(isinstance(cell, _Curve) for row in self.rows for cell in row)
+        row, col = self._cell(index)
+        return isinstance(self.rows[row][col], _Curve)
+
+    @api
+    def toScript(self, *args):
+        lines = ['{{ 1 {} {} }}'.format(self.n_columns, len(self.rows))]
+        lines.append('{ ' + ' \n'.join('{{ {} 1 20 {} {} 1 }}'.format(kind, name, label)
+                                       for name, kind, label in self.COLUMNS) + ' \n} ')
+        rows = []
+        for row in self.rows:
+            cells = []
+            for col, cell in enumerate(row):
+                if isinstance(cell, _Curve):
+                    cells.append(cell.to_script())
+                elif self.COLUMNS[col][0] == 'name':
+                    cells.append(_quote(cell))
+                elif cell is None:
+                    cells.append('{}')
+                else:
+                    cells.append('{:g}'.format(cell))
+            rows.append(' { ' + ' '.join(cells) + ' }')
+        lines.append('{ \n' + ' \n'.join(rows) + ' \n}')
+        return '{ ' + ' \n'.join(lines) + ' \n}'
+
+    @api
+    def fromScript(self, text):
+        items = _parse(text)
+        while len(items) == 1 and isinstance(items[0], list):
+            items = items[0]
+        rows = []
+        for row in items[2]:
+            cells = []
+            for col, item in enumerate(row):
+                if isinstance(item, list):
+                    cells.append(None)
+                elif item.startswith('{curve'):
+                    cells.append(_Curve.from_script(item))
+                elif self.COLUMNS[col][0] == 'name':
+                    cells.append(item)
+                else:
+                    cells.append(float(item))
+            rows.append(cells)
+        self.rows = rows
+        _knob_changed(self)
+        return True
+
+
+class _Layer(object):
+
+    def __init__(self, curves_knob):
+        self.name = 'Layer1'
+        self.children = []
+
+    def append(self, item):
+        self.children.append(item)
+
+
+class Curves_Knob(Knob):
+
+    def __init__(self, name, label=None):
+        Knob.__init__(self, name, label)
+        from nuke import rotopaint
+        self.rootLayer = rotopaint.Layer(self)
+        self.rootLayer.name = 'Root'
+
+    @api
+    def changed(self):
+        pass
+
+    @api
+    def toElement(self, path):
+        for item in self.rootLayer:
+            if item.name == path:
+                return item
+        return None
+
+
+# ---------------------------------------------------------------------------------------------
+# Nodes
+
+_MOTION_KNOBS = lambda: [Enumeration_Knob('filter', 'filter', ['Impulse', 'Cubic', 'Keys', 'Simon', 'Rifman',
+                                                                'Mitchell', 'Parzen', 'Notch', 'Lanczos4',
+                                                                'Lanczos6', 'Sinc4']),
+                         Double_Knob('motionblur', 'motionblur'),
+                         Double_Knob('shutter', 'shutter', 0.5),
+                         Enumeration_Knob('shutteroffset', 'shutter offset', ['centred', 'start', 'end',
+                                                                              'custom'])]
+
+_NODE_KNOBS = {
+    'Transform': lambda: [XY_Knob('translate'), Double_Knob('rotate'), WH_Knob('scale'),
+                          Double_Knob('skewX'), Double_Knob('skewY'), XY_Knob('center'),
+                          Boolean_Knob('invert_matrix')] + _MOTION_KNOBS(),
+    'CornerPin2D': lambda: [XY_Knob('to1'), XY_Knob('to2'), XY_Knob('to3'), XY_Knob('to4'),
+                            XY_Knob('from1'), XY_Knob('from2'), XY_Knob('from3'), XY_Knob('from4'),
+                            Array_Knob('transform_matrix', 'extra matrix', 16,
+                                       [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]),
+                            Boolean_Knob('invert')] + _MOTION_KNOBS(),
+    'Roto': lambda: [Curves_Knob('curves'), Double_Knob('motionblur'),
+                     Double_Knob('motionblur_shutter', default=0.5),
+                     Enumeration_Knob('motionblur_shutter_offset_type', 'shutter offset',
+                                      ['centred', 'start', 'end', 'custom']),
+                     Int_Knob('reference_frame')],
+    'Tracker4': lambda: [Table_Knob('tracks'), XY_Knob('translate'), Double_Knob('rotate'),
+                         WH_Knob('scale'), XY_Knob('center'),
+                         Enumeration_Knob('transform', 'transform', ['none', 'stabilize', 'match-move',
+                                                                     'remove-jitter', 'add-jitter']),
+                         Int_Knob('reference_frame', default=1), String_Knob('selected_tracks')]
+                        + _MOTION_KNOBS(),
+    'Axis2': lambda: [XY_Knob('translate2d', 'translate'), Array_Knob('translate', 'translate', 3),
+                      Array_Knob('rotate', 'rotate', 3), Array_Knob('scaling', 'scale', 3, 1.0)],
+    'Group': lambda: [],
+    'Input': lambda: [],
+    'Output': lambda: [],
+    'NoOp': lambda: [],
+    'Dot': lambda: [],
+    'Read': lambda: [File_Knob('file'), Int_Knob('first', default=1), Int_Knob('last', default=100)],
+    'Write': lambda: [File_Knob('file')],
+    'Preferences': lambda: [Int_Knob('GridWidth', default=110), Int_Knob('GridHeight', default=24)],
+    'Root': lambda: [Int_Knob('first_frame', default=1), Int_Knob('last_frame', default=100),
+                     Double_Knob('fps', default=24.0), File_Knob('name')],
+}
+_NODE_KNOBS['RotoPaint'] = _NODE_KNOBS['Roto']
+_NODE_KNOBS['Axis'] = _NODE_KNOBS['Axis2']
+_NODE_KNOBS['Axis3'] = _NODE_KNOBS['Axis2']
+_NODE_KNOBS['Tracker3'] = _NODE_KNOBS['Tracker4']
+
+
+class Node(object):
+
+    def __init__(self, node_class, parent=None):
+        self._class = node_class
+        self._knobs = collections.OrderedDict()
+        self._name = ''
+        self._x = 0
+        self._y = 0
+        self._selected = False
+        self._inputs = []
+        self._parent = parent
+        self._children = []
+
+        for knob in [String_Knob('name'), Multiline_Eval_String_Knob('label'),
+                     Int_Knob('tile_color'), Int_Knob('xpos'), Int_Knob('ypos'),
+                     Boolean_Knob('disable'), Boolean_Knob('selected'),
+                     String_Knob('knobChanged'), String_Knob('onCreate')]:
+            self._add(knob)
+
+        for knob in _NODE_KNOBS.get(node_class, lambda: [])():
+            self._add(knob)
+
+    def _add(self, knob):
+        knob.node = self
+        self._knobs[knob._name] = knob
+
+    @api
+    def Class(self):
+        return self._class
+
+    @api
+    def name(self):
+        return self._name
+
+    @api
+    def fullName(self):
+        if self._parent is not None and self._parent is not _root:
+            return '{}.{}'.format(self._parent.fullName.__wrapped__(self._parent), self._name)
+        return self._name
+
+    @api
+    def setName(self, name, uncollide=False, updateExpressions=False):
+        siblings = _children_of(self._parent)
+        taken = set(node._name for node in siblings if node is not self)
+        if uncollide and name in taken or uncollide and name.endswith('_'):
+            base = name
+            index = 1
+            while '{}{}'.format(base, index) in taken:
+                index += 1
+            name = '{}{}'.format(base, index)
+        elif name in taken:
+            raise ValueError('{} already exists'.format(name))
+        _by_name.pop(self._name, None)
+        self._name = name
+        self._knobs['name']._value = name
+        if self._parent is _root or self._parent is None:
+            _by_name[name] = self
+
+    @api
+    def knob(self, name):
+        if isinstance(name, int):
+            return list(self._knobs.values())[name]
+        return self._knobs.get(name)
+
+    @api
+    def knobs(self):
+        return dict(self._knobs)
+
+    @api
+    def allKnobs(self):
+        return list(self._knobs.values())
+
+    @api
+    def numKnobs(self):
+        return len(self._knobs)
+
+    def __getitem__(self, name):
+        CALLS['Node.__getitem__'] += 1
+        try:
+            return self._knobs[name]
+        except KeyError:
+            raise NameError('knob {} does not exist'.format(name))
+
+    @api
+    def addKnob(self, knob):
+        knob.node = self
+        self._knobs[knob._name] = knob
+        return True
+
+    @api
+    def removeKnob(self, knob):
+        self._knobs.pop(knob._name, None)
+
+    @api
+    def xpos(self):
+        return self._x
+
+    @api
+    def ypos(self):
+        return self._y
+
+    @api
+    def setXpos(self, x):
+        self._x = int(x)
+
+    @api
+    def setYpos(self, y):
+        self._y = int(y)
+
+    @api
+    def setXYpos(self, x, y):
+        self._x = int(x)
+        self._y = int(y)
+
+    @api
+    def screenWidth(self):
+        return 80
+
+    @api
+    def screenHeight(self):
+        return 18
+
+    @api
+    def setSelected(self, selected):
+        self._selected = bool(selected)
+
+    @api
+    def isSelected(self):
+        return self._selected
+
+    @api
+    def resetKnobsToDefault(self):
+        for knob in self._knobs.values():
+            if knob._name not in ('name', 'xpos', 'ypos', 'selected'):
+                knob._reset()
+
+    @api
+    def setInput(self, index, node):
+        while len(self._inputs) <= index:
+            self._inputs.append(None)
+        self._inputs[index] = node
+        return True
+
+    @api
+    def input(self, index):
+        return self._inputs[index] if index < len(self._inputs) else None
+
+    @api
+    def inputs(self):
+        return len(self._inputs)
+
+    @api
+    def firstFrame(self):
+        source = self._inputs[0] if self._inputs else None
+        return source.firstFrame.__wrapped__(source) if source is not None else int(_root['first_frame'].value())
+
+    @api
+    def lastFrame(self):
+        source = self._inputs[0] if self._inputs else None
+        return source.lastFrame.__wrapped__(source) if source is not None else int(_root['last_frame'].value())
+
+    @api
+    def dependent(self, what=None, forceEvaluate=True):
+        return [node for node in _all_nodes() if self in node._inputs]
+
+    @api
+    def forceValidate(self):
+        pass
+
+    @api
+    def begin(self):
+        _context.append(self)
+        return self
+
+    @api
+    def end(self):
+        if _context and _context[-1] is self:
+            _context.pop()
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, *args):
+        self.end()
+
+    @api
+    def nodes(self):
+        return list(self._children)
+
+    @api
+    def node(self, name):
+        for node in self._children:
+            if node._name == name:
+                return node
+        return None
+
+    def __repr__(self):
+        return '<{} {}>'.format(self._class, self._name)
+
+
+def _children_of(parent):
+    if parent is None or parent is _root:
+        return _nodes
+    return parent._children
+
+
+def _all_nodes():
+    return list(_nodes)
+
+
+_knob_changed_callbacks = []
+_callback_context = []
+
+
+def _knob_changed(knob):
+    """ Counts the knobChanged handling Nuke runs after every knob write, and runs the knobChanged callbacks. """
+
+    CALLS['knobChanged'] += 1
+
+    node = knob.node
+    for call, args, kwargs, node_class in _knob_changed_callbacks:
+        if node is not None and node_class in ('*', node._class):
+            _callback_context.append((node, knob))
+            try:
+                call(*args, **kwargs)
+            finally:
+                _callback_context.pop()
+
+
+@api
+def addKnobChanged(call, args=(), kwargs={}, nodeClass='*', node=None):
+    _knob_changed_callbacks.append((call, args, kwargs, nodeClass))
+
+
+@api
+def removeKnobChanged(call, args=(), kwargs={}, nodeClass='*', node=None):
+    _knob_changed_callbacks.remove((call, args, kwargs, nodeClass))
+
+
+_on_destroy_callbacks = []
+
+
+@api
+def addOnDestroy(call, args=(), kwargs={}, nodeClass='*'):
+    _on_destroy_callbacks.append((call, args, kwargs, nodeClass))
+
+
+@api
+def addOnScriptLoad(call, args=(), kwargs={}, nodeClass='Root'):
+    pass
+
+
+@api
+def addOnScriptClose(call, args=(), kwargs={}, nodeClass='Root'):
+    pass
+
+
+@api
+def thisKnob():
+    return _callback_context[-1][1] if _callback_context else None
+
+
+class _NodeFactory(object):
+
+    def __getattr__(self, node_class):
+        def create(**kwargs):
+            CALLS['nodes.{}'.format(node_class)] += 1
+            return _create(node_class, kwargs)
+        return create
+
+
+nodes = _NodeFactory()
+
+
+def _create(node_class, kwargs=None, inpanel=False):
+    parent = _context[-1] if _context else _root
+    node = Node(node_class, parent)
+    siblings = _children_of(parent)
+    siblings.append(node)
+    index = 1
+    taken = set(n._name for n in siblings)
+    while '{}{}'.format(node_class, index) in taken:
+        index += 1
+    node._name = '{}{}'.format(node_class, index)
+    node._knobs['name']._value = node._name
+    if parent is _root:
+        _by_name[node._name] = node
+    for key, value in (kwargs or {}).items():
+        if key == 'name':
+            node.setName.__wrapped__(node, value)
+        elif key in node._knobs:
+            node._knobs[key].setValue.__wrapped__(node._knobs[key], value)
+    return node
+
+
+@api
+def createNode(node_class, knobs='', inpanel=True):
+    return _create(node_class, None, inpanel)
+
+
+@api
+def toNode(name):
+    if name == 'preferences':
+        return _preferences
+    if name == 'root':
+        return _root
+    if '.' in name:
+        group, rest = name.split('.', 1)
+        parent = _by_name.get(group)
+        return parent.node.__wrapped__(parent, rest) if parent is not None else None
+    return _by_name.get(name)
+
+
+@api
+def allNodes(filter=None, group=None, recurseGroups=False):
+    if group is not None and group is not _root:
+        result = list(group._children)
+    else:
+        result = list(_nodes)
+    if recurseGroups:
+        pending = [n for n in result if n._class == 'Group']
+        while pending:
+            group_node = pending.pop()
+            result.extend(group_node._children)
+            pending.extend(n for n in group_node._children if n._class == 'Group')
+    if filter:
+        result = [node for node in result if node._class == filter]
+    return result
+
+
+@api
+def selectedNodes(filter=None):
+    result = [node for node in reversed(_nodes) if node._selected]
+    if filter:
+        result = [node for node in result if node._class == filter]
+    return result
+
+
+@api
+def selectedNode():
+    for node in reversed(_nodes):
+        if node._selected:
+            return node
+    raise ValueError('no node selected')
+
+
+@api
+def delete(node):
+    for call, args, kwargs, node_class in _on_destroy_callbacks:
+        if node_class in ('*', node._class):
+            _callback_context.append((node, None))
+            try:
+                call(*args, **kwargs)
+            finally:
+                _callback_context.pop()
+
+    siblings = _children_of(node._parent)
+    if node in siblings:
+        siblings.remove(node)
+    if _by_name.get(node._name) is node:
+        del _by_name[node._name]
+
+
+@api
+def thisNode():
+    if _callback_context:
+        return _callback_context[-1][0]
+    return _context[-1] if _context else _root
+
+
+@api
+def thisGroup():
+    for node in reversed(_context):
+        if node._class == 'Group':
+            return node
+    return _root
+
+
+@api
+def root():
+    return _root
+
+
+@api
+def frame(value=None):
+    if value is not None:
+        _state['frame'] = value
+    return _state['frame']
+
+
+@api
+def autoplace(node):
+    siblings = _children_of(node._parent)
+    occupied = set((n._x // 100, n._y // 30) for n in siblings if n is not node)
+    while (node._x // 100, node._y // 30) in occupied:
+        node._y += 30
+
+
+@api
+def autoplaceSnap(node):
+    pass
+
+
+@api
+def zoom(*args):
+    pass
+
+
+@api
+def message(text):
+    _state['messages'].append(('message', text))
+
+
+@api
+def critical(text):
+    _state['messages'].append(('critical', text))
+
+
+@api
+def ask(text):
+    _state['messages'].append(('ask', text))
+    return True
+
+
+@api
+def tprint(*args):
+    pass
+
+
+@api
+def tcl(*args):
+    return ''
+
+
+@api
+def updateUI():
+    pass
+
+
+@api
+def executing():
+    return False
+
+
+@api
+def env_get(key, default=None):
+    return _env.get(key, default)
+
+
+_env = {'gui': False, 'NukeVersionMajor': 13}
+env = _env
+
+
+def executeInMainThread(call, args=(), kwargs=None):
+    CALLS['executeInMainThread'] += 1
+    call(*args, **(kwargs or {}))
+
+
+def executeInMainThreadWithResult(call, args=(), kwargs=None):
+    CALLS['executeInMainThreadWithResult'] += 1
+    return call(*args, **(kwargs or {}))
+
+
+class Undo(object):
+
+    depth = 0
+    groups = []
+
+    def __init__(self, name=None):
+        self._name = name
+
+    @classmethod
+    def name(cls, name):
+        pass
+
+    def __enter__(self):
+        Undo.depth += 1
+        Undo.groups.append(self._name)
+        return self
+
+    def __exit__(self, *args):
+        Undo.depth -= 1
+
+    @staticmethod
+    def begin(name=None):
+        Undo.depth += 1
+        Undo.groups.append(name)
+
+    @staticmethod
+    def end():
+        Undo.depth -= 1
+
+    @staticmethod
+    def cancel():
+        Undo.depth -= 1
+
+    @staticmethod
+    def disable():
+        pass
+
+    @staticmethod
+    def enable():
+        pass
+
+
+class ProgressTask(object):
+
+    cancel_after = None
+
+    def __init__(self, name=''):
+        self._name = name
+        self.progress = 0
+        self.updates = 0
+
+    def setMessage(self, message):
+        self.message = message
+
+    def setProgress(self, progress):
+        self.progress = progress
+        self.updates += 1
+
+    def isCancelled(self):
+        return ProgressTask.cancel_after is not None and self.updates > ProgressTask.cancel_after
+
+
+class _Menu(object):
+
+    def __init__(self, name=''):
+        self.name = name
+        self.items = collections.OrderedDict()
+
+    def addMenu(self, name, **kwargs):
+        return self.items.setdefault(name, _Menu(name))
+
+    def addCommand(self, name, command=None, shortcut=None, icon=None, **kwargs):
+        self.items[name] = (command, shortcut, icon)
+
+    def findItem(self, name):
+        return self.items.get(name)
+
+    def addSeparator(self):
+        pass
+
+
+_menus = {}
+
+
+def menu(name):
+    return _menus.setdefault(name, _Menu(name))
+
+
+def pluginAddPath(path, addToSysPath=True):
+    pass
+
+
+@api
+def scriptClear():
+    clear()
+
+
+@api
+def scriptName():
+    return _state['script'] or ''
+
+
+# Stand-in scripts are pickles of the node graph, not real .nk files.
+
+class _ScriptPickler(pickle.Pickler):
+
+    def persistent_id(self, obj):
+        if obj is _root:
+            return 'root'
+        if obj is _preferences:
+            return 'preferences'
+        return None
+
+
+class _ScriptUnpickler(pickle.Unpickler):
+
+    def persistent_load(self, pid):
+        return _root if pid == 'root' else _preferences
+
+
+@api
+def scriptSaveAs(filename=None, overwrite=-1):
+    _state['script'] = filename
+    _root._knobs['name']._value = filename
+    with open(filename, 'wb') as f:
+        _ScriptPickler(f, protocol=2).dump((_nodes, _state['first_frame'], _state['last_frame'], _state['fps']))
+
+
+@api
+def scriptSave(filename=None):
+    scriptSaveAs.__wrapped__(filename or _state['script'])
+    return True
+
+
+@api
+def scriptOpen(filename):
+    clear()
+    with open(filename, 'rb') as f:
+        nodes, _state['first_frame'], _state['last_frame'], _state['fps'] = _ScriptUnpickler(f).load()
+    _nodes.extend(nodes)
+    for node in nodes:
+        _by_name[node._name] = node
+    _state['script'] = filename
+    _root._knobs['name']._value = filename
+
+
+@api
+def scriptClose():
+    clear()
+
+
+_root = Node('Root')
+_root._name = 'root'
+_preferences = Node('Preferences')
+_preferences._name = 'preferences'
+
+
+def clear():
+    """ Empties the stand-in script. """
+
+    del _nodes[:]
+    _by_name.clear()
+    del _context[:]
+    _state['messages'] = []
+    _state['frame'] = 1
+    _state['script'] = None
+    _root._knobs['name']._value = ''
+    Undo.depth = 0
+    Undo.groups = []
+    ProgressTask.cancel_after = None
+
+
+def messages():
+    return list(_state['messages'])
+
+
+def _module():
+    import nuke
+    return nuke
@@ -0,0 +1,69 @@
+"""
+Stand-in for nuke.rotopaint: layers holding a transform made of _curvelib.AnimCurve channels.
+"""
+
+from nuke import CALLS, api
+
+
+class AnimCTransform(object):
+
+    def __init__(self):
+        self.translation = [None, None, None]
+        self.rotation = [None, None, None]
+        self.scale = [None, None, None]
+        self.pivot = [None, None, None]
+
+    @api
+    def setTranslationAnimCurve(self, index, curve):
+        self.translation[index] = curve
+
+    @api
+    def getTranslationAnimCurve(self, index):
+        return self.translation[index]
+
+    @api
+    def setRotationAnimCurve(self, index, curve):
+        self.rotation[index] = curve
+
+    @api
+    def getRotationAnimCurve(self, index):
+        return self.rotation[index]
+
+    @api
+    def setScaleAnimCurve(self, index, curve):
+        self.scale[index] = curve
+
+    @api
+    def getScaleAnimCurve(self, index):
+        return self.scale[index]
+
+    @api
+    def setPivotPointAnimCurve(self, index, curve):
+        self.pivot[index] = curve
+
+    @api
+    def getPivotPointAnimCurve(self, index):
+        return self.pivot[index]
+
+
+class Layer(object):
+
+    def __init__(self, curves_knob=None):
+        CALLS['rotopaint.Layer'] += 1
+        self.name = 'Layer1'
+        self._children = []
+        self._transform = AnimCTransform()
+
+    @api
+    def getTransform(self):
+        return self._transform
+
+    @api
+    def append(self, item):
+        self._children.append(item)
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def __len__(self):
+        return len(self._children)
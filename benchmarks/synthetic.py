@@ -0,0 +1,129 @@
+"""
+Synthetic Tracker4 nodes for the benchmarks, built on the nuke stand-in.
+
+Every track follows the same similarity motion (translate, rotate and scale around a center)
+plus a little jitter, and the tracker's solved 'translate', 'rotate', 'scale' and 'center'
+curves are that motion, so solvers and bakes have meaningful data to work on.
+"""
+
+from array import array
+
+import numpy as np
+
+import nuke
+
+
+def motion(n_frames, first_frame=1, seed=0):
+    """
+    Returns the per-frame similarity motion of a synthetic shot.
+
+    Returns:
+        dict: 'frames', 'translate' (frames, 2), 'rotate' (frames,) in degrees, 'scale' (frames,)
+            and 'center' (2,), all NumPy arrays.
+    """
+
+    rng = np.random.RandomState(seed)
+    frames = np.arange(first_frame, first_frame + n_frames, dtype=np.float64)
+    t = (frames - first_frame) / max(n_frames - 1, 1)
+
+    translate = np.stack([300 * t + 20 * np.sin(t * 7), -150 * t + 15 * np.cos(t * 5)], -1)
+    translate += rng.normal(0, 0.05, translate.shape)
+    rotate = 8 * np.sin(t * 3) + rng.normal(0, 0.01, len(frames))
+    scale = 1 + 0.15 * t + rng.normal(0, 0.0002, len(frames))
+
+    return {'frames': frames, 'translate': translate, 'rotate': rotate, 'scale': scale,
+            'center': np.array([1024.0, 778.0])}
+
+
+def _curve(frames, values, decimals=4):
+    curve = nuke._Curve()
+    curve.frames = array('d', frames.tobytes())
+    curve.values = array('d', np.round(values, decimals).tobytes())
+    return curve
+
+
+def make_tracker(n_tracks=4, n_frames=100, first_frame=1, seed=0, transform='match-move'):
+    """
+    Creates a Tracker4 stand-in node with n_tracks tracks keyed on every frame.
+
+    Args:
+        n_tracks (int, optional): The number of tracks. Defaults to 4.
+        n_frames (int, optional): The number of tracked frames. Defaults to 100.
+        first_frame (int, optional): The first tracked frame. Defaults to 1.
+        seed (int, optional): Random seed, the same seed gives the same tracker. Defaults to 0.
+        transform (str, optional): The tracker's 'transform' mode. Defaults to 'match-move'.
+
+    Returns:
+        nuke.Node: The Tracker4 node.
+    """
+
+    rng = np.random.RandomState(seed + 1)
+    shot = motion(n_frames, first_frame, seed)
+    frames = shot['frames']
+    ref_index = n_frames // 2
+
+    # Positions of the features at the reference frame, spread over a 2K plate.
+    points = np.stack([rng.uniform(100, 1948, n_tracks), rng.uniform(100, 1456, n_tracks)], -1)
+
+    # Forward motion relative to the reference frame.
+    angle = np.radians(shot['rotate'] - shot['rotate'][ref_index])
+    scale = shot['scale'] / shot['scale'][ref_index]
+    offset = shot['translate'] - shot['translate'][ref_index]
+    center = shot['center']
+
+    cos = (np.cos(angle) * scale)[:, None]
+    sin = (np.sin(angle) * scale)[:, None]
+    rel_x = points[:, 0][None, :] - center[0]
+    rel_y = points[:, 1][None, :] - center[1]
+    track_x = cos * rel_x - sin * rel_y + center[0] + offset[:, 0:1]
+    track_y = sin * rel_x + cos * rel_y + center[1] + offset[:, 1:2]
+    track_x += rng.normal(0, 0.1, track_x.shape)
+    track_y += rng.normal(0, 0.1, track_y.shape)
+    error = np.abs(rng.normal(0, 0.01, track_x.shape))
+
+    node = nuke.nodes.Tracker4()
+    table = node['tracks']
+    columns = [name for name, kind, label in table.COLUMNS]
+
+    for track in range(n_tracks):
+        cells = []
+        for name in columns:
+            if name == 'enable':
+                cells.append(1.0)
+            elif name == 'name':
+                cells.append('track {}'.format(track + 1))
+            elif name == 'track_x':
+                cells.append(_curve(frames, track_x[:, track]))
+            elif name == 'track_y':
+                cells.append(_curve(frames, track_y[:, track]))
+            elif name == 'error':
+                cells.append(_curve(frames, error[:, track]))
+            elif name in ('pattern_x', 'pattern_y'):
+                cells.append(-32.0)
+            elif name in ('pattern_r', 'pattern_t'):
+                cells.append(32.0)
+            elif name in ('search_x', 'search_y'):
+                cells.append(-22.0)
+            elif name in ('search_r', 'search_t'):
+                cells.append(22.0)
+            else:
+                cells.append(0.0)
+        table.add_row(cells)
+
+    node['translate']._curves = [_curve(frames, offset[:, 0]), _curve(frames, offset[:, 1])]
+    node['rotate']._curves = [_curve(frames, np.degrees(angle))]
+    node['scale']._curves = [_curve(frames, scale), _curve(frames, scale)]
+    node['center']._curves = [_curve(frames, np.full(n_frames, center[0])),
+                              _curve(frames, np.full(n_frames, center[1]))]
+
+    node['transform'].setValue(transform)
+    node['reference_frame'].setValue(int(frames[ref_index]))
+
+    return node
+
+
+def reset_marks(tracker_node):
+    """ Unchecks T, R and S on every track, so each run pays for marking them again. """
+
+    for row in tracker_node['tracks'].rows:
+        row[6] = row[7] = row[8] = 0.0